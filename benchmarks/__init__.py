@@ -0,0 +1,6 @@
+import os
+import sys
+
+PROJECT_PATH = os.getcwd()
+SOURCE_PATH = os.path.join(PROJECT_PATH, "src/bulle_planning_model")
+sys.path.append(SOURCE_PATH)
@@ -0,0 +1,130 @@
+"""Compare the ways of turning a Bestellungen export into monthly JSON files.
+
+Writes a synthetic export shaped like the shop system's (orders of a few
+rows, pickup dates over two and a half years) and times read_file,
+streaming through iter_orders and the column parser, checking that all
+three write the same files.
+
+Run from the project root:
+
+    python -m benchmarks.bench_bestellungen [--rows 300000]
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+import argparse
+import csv
+import json
+import random
+import tempfile
+
+from loguru import logger
+
+from benchmarks.bench_records import best_of
+from extractors.bestellungs_extractor.bestellungs_extractor import BestellungsExtractor
+
+
+ARTICLES = [
+    ("Nussbrot", 520),
+    ("Dinkelbrot", 610),
+    ("Roggenbrot", 480),
+    ("Brezel", 95),
+    ("Laugenstange", 110),
+    ("Croissant", 160),
+    ("Zimtschnecke", 240),
+    ("Apfelkuchen", 320),
+]
+QUANTITIES = ["1", "1", "1", "2", "2", "3", "4", "6", "0.5", "1.5"]
+
+
+def write_export(csv_path: Path, rows: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    start = date(2023, 4, 1)
+    order_id = 100000
+    written = 0
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "abholdatum", "artikelname", "artikelanzahl", "artikelpreis"])
+        while written < rows:
+            order_id += 1
+            pickup_date = start + timedelta(days=rng.randrange(886))
+            for _ in range(min(rng.randint(1, 6), rows - written)):
+                article_name, price_cents = rng.choice(ARTICLES)
+                writer.writerow(
+                    [order_id, pickup_date, article_name, rng.choice(QUANTITIES), price_cents]
+                )
+                written += 1
+
+
+def in_memory(extractor: BestellungsExtractor, csv_path: Path, output_dir: Path):
+    orders_by_month = defaultdict(list)
+    for order in extractor.read_file(csv_path):
+        orders_by_month[order.pickup_date.strftime("%Y-%m")].append(order)
+    for month_key, month_orders in orders_by_month.items():
+        extractor.convert_to_json(month_orders, output_dir / f"bestellungen_{month_key}.json")
+
+
+def streaming(extractor: BestellungsExtractor, csv_path: Path, output_dir: Path):
+    extractor.convert_to_monthly_json(extractor.iter_orders(csv_path), output_dir)
+
+
+def columnar(extractor: BestellungsExtractor, csv_path: Path, output_dir: Path):
+    extractor.convert_columns_to_monthly_json(extractor.read_columns(csv_path), output_dir)
+
+
+def parse_only(extractor: BestellungsExtractor, csv_path: Path, _):
+    extractor.read_file(csv_path)
+
+
+def parse_columns_only(extractor: BestellungsExtractor, csv_path: Path, _):
+    columns = extractor.read_columns(csv_path)
+    columns.order_sums()
+    columns.month_partitions()
+
+
+def load_outputs(output_dir: Path):
+    outputs = {}
+    for path in sorted(output_dir.iterdir()):
+        with open(path, "r", encoding="utf-8") as f:
+            outputs[path.name] = json.load(f)
+    return outputs
+
+
+def main(rows: int, runs: int):
+    logger.remove()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        csv_path = temp_dir / "bestellungen.csv"
+        write_export(csv_path, rows)
+
+        outputs = {}
+        for name, func in (
+            ("parse read_file", parse_only),
+            ("parse columns + group-bys", parse_columns_only),
+            ("in memory", in_memory),
+            ("streaming", streaming),
+            ("columnar", columnar),
+        ):
+            output_dir = temp_dir / name.replace(" ", "_")
+            output_dir.mkdir()
+            extractor = BestellungsExtractor()
+            seconds = best_of(runs, lambda: func(extractor, csv_path, output_dir))
+            print(f"{name:28} {seconds:7.2f} s {rows / seconds:11,.0f} rows/s")
+            if any(output_dir.iterdir()):
+                outputs[name] = load_outputs(output_dir)
+
+        reference = outputs["in memory"]
+        for name, output in outputs.items():
+            if output != reference:
+                print(f"{name} wrote different monthly files than in memory")
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=300000, help="Rows in the synthetic export")
+    parser.add_argument("--runs", type=int, default=1, help="Best of this many runs")
+    args = parser.parse_args()
+    raise SystemExit(main(args.rows, args.runs))
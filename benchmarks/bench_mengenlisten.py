@@ -0,0 +1,127 @@
+"""Benchmark the Mengenlisten pipeline offline with a replaying AI client.
+
+Every synthetic PDF gets the recorded response of the test Mengenliste,
+moved to its own date. The replay client waits --latency seconds per
+request like the real service would, so the runs show what concurrency,
+batching under a rate limit, retries and the response cache do to
+wall-clock time, and the run without latency shows the parsing throughput.
+
+Run from the project root:
+
+    python -m benchmarks.bench_mengenlisten [--files 200] [--latency 0.2] [--requests-per-minute 600]
+"""
+from datetime import date, timedelta
+from pathlib import Path
+import argparse
+import json
+import tempfile
+import time
+
+from loguru import logger
+
+from extractors.mengenlisten_extractor.mengenlisten_extractor import MengenlistenExtractor
+from extractors.mengenlisten_extractor.rate_limiter import TokenBucketRateLimiter
+from extractors.mengenlisten_extractor.replay_client import ReplayClient
+from extractors.mengenlisten_extractor.response_cache import ResponseCache
+from extractors.mengenlisten_extractor.retry_policy import RetryPolicy
+
+
+RECORDING = (
+    Path(__file__).parent.parent
+    / "tests/test_files/recordings/Mengenliste-2024-11-08.pdf.json"
+)
+
+
+def make_files(temp_dir: Path, count: int):
+    """Write placeholder PDFs and the response each one should get."""
+    with open(RECORDING, "r", encoding="utf-8") as f:
+        recorded = json.loads(json.load(f)["response"])
+
+    file_paths = []
+    responses = {}
+    for i in range(count):
+        report_date = date(2024, 1, 1) + timedelta(days=i)
+        file_path = temp_dir / f"Mengenliste-{report_date}.pdf"
+        file_path.write_bytes(f"%PDF-1.4 {report_date}".encode())
+        file_paths.append(file_path)
+        responses[file_path.name] = json.dumps(
+            dict(recorded, report_date=str(report_date)), ensure_ascii=False
+        )
+    return file_paths, responses
+
+
+def timed_run(client: ReplayClient, file_paths, workers: int, batch_size: int = 1):
+    extractor = MengenlistenExtractor(ai_client=client)
+    start = time.perf_counter()
+    extracted = sum(
+        mengenliste is not None
+        for _, mengenliste in extractor.read_files(
+            file_paths, max_workers=workers, batch_size=batch_size
+        )
+    )
+    return time.perf_counter() - start, extracted
+
+
+def report(name: str, seconds: float, extracted: int, total: int):
+    print(
+        f"{name:32} {seconds:7.2f} s {extracted / seconds:9.1f} files/s "
+        f"({extracted}/{total} extracted)"
+    )
+
+
+def main(files: int, latency: float, workers: int, requests_per_minute: float):
+    logger.remove()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_paths, responses = make_files(Path(temp_dir), files)
+
+        seconds, extracted = timed_run(ReplayClient(responses=responses), file_paths, 1)
+        report("parsing only", seconds, extracted, files)
+
+        for worker_count in sorted({1, workers}):
+            client = ReplayClient(responses=responses, latency=latency, jitter=latency / 2)
+            seconds, extracted = timed_run(client, file_paths, worker_count)
+            report(f"{worker_count} workers", seconds, extracted, files)
+
+        for batch_size in (1, 5):
+            client = ReplayClient(
+                responses=responses,
+                latency=latency,
+                jitter=latency / 2,
+                rate_limiter=TokenBucketRateLimiter(requests_per_minute, burst=workers),
+            )
+            seconds, extracted = timed_run(client, file_paths, workers, batch_size)
+            report(f"{requests_per_minute:.0f}/min, batches of {batch_size}", seconds, extracted, files)
+
+        client = ReplayClient(
+            responses=responses,
+            latency=latency,
+            jitter=latency / 2,
+            transient_error_rate=0.1,
+            retry_policy=RetryPolicy(base_delay=latency),
+        )
+        seconds, extracted = timed_run(client, file_paths, workers)
+        report(f"{workers} workers, 10% transient", seconds, extracted, files)
+        print(f"{'':32} {client.requests} requests for {files} files")
+
+        cache = ResponseCache(Path(temp_dir) / "cache")
+        for name in ("cold cache", "warm cache"):
+            client = ReplayClient(
+                responses=responses, cache=cache, latency=latency, jitter=latency / 2
+            )
+            seconds, extracted = timed_run(client, file_paths, workers)
+            report(f"{workers} workers, {name}", seconds, extracted, files)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=200, help="Number of synthetic PDFs")
+    parser.add_argument(
+        "--latency", type=float, default=0.2, help="Seconds the replayed service takes per request"
+    )
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent requests")
+    parser.add_argument(
+        "--requests-per-minute", type=float, default=600, help="Rate limit for the batching runs"
+    )
+    args = parser.parse_args()
+    main(args.files, args.latency, args.workers, args.requests_per_minute)
@@ -0,0 +1,163 @@
+"""Throughput of FiskalExtractor on a synthetic journal, with regression checks.
+
+Generates a journal with benchmarks.journal_generator and reports
+transactions/s and MB/s for every parser and reader. Exits with status 1
+when a configuration finds the wrong transactions, when single_pass is
+slower than legacy, or when a configuration is slower than the saved
+baseline by more than the tolerance.
+
+Run from the project root:
+
+    python -m benchmarks.bench_parser [--size-mb 20] [--baseline benchmarks/parser_baseline.json]
+    python -m benchmarks.bench_parser --save-baseline benchmarks/parser_baseline.json
+"""
+from pathlib import Path
+from typing import Dict, List, Optional
+import argparse
+import json
+import sys
+import tempfile
+
+from loguru import logger
+
+from benchmarks.bench_records import best_of
+from benchmarks.journal_generator import JournalGenerator, JournalStats
+from extractors.fiskal_extractor.fiskal_extractor import FiskalExtractor
+
+
+CONFIGURATIONS = [
+    (parser, reader) for parser in FiskalExtractor.PARSERS for reader in FiskalExtractor.READERS
+]
+
+
+def check_result(name: str, extractor: FiskalExtractor, transactions, stats: JournalStats) -> List[str]:
+    """Everything the generator wrote has to come back out, to the cent."""
+    failures = []
+    found = (
+        len(transactions),
+        sum(len(transaction.items) for transaction in transactions),
+        sum(transaction.total_gross_cents for transaction in transactions),
+        extractor.unparsed_count,
+    )
+    expected = (
+        stats.transactions,
+        stats.line_items,
+        stats.total_gross_cents,
+        stats.cancellations,
+    )
+    if found != expected:
+        failures.append(
+            f"{name}: found (transactions, items, cents, unparsed) {found}, expected {expected}"
+        )
+    return failures
+
+
+def run(journal_path: Path, stats: JournalStats, runs: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    size_mb = stats.size_bytes / 1024 / 1024
+    for parser, reader in CONFIGURATIONS:
+        seconds = best_of(
+            runs, lambda: FiskalExtractor(parser=parser, reader=reader).read_file(journal_path)
+        )
+        results[f"{parser}/{reader}"] = {
+            "transactions_per_s": stats.transactions / seconds,
+            "mb_per_s": size_mb / seconds,
+        }
+    return results
+
+
+def check_regressions(
+    results: Dict[str, Dict[str, float]],
+    baseline: Optional[Dict[str, Dict[str, float]]],
+    tolerance: float,
+) -> List[str]:
+    failures = []
+    for reader in FiskalExtractor.READERS:
+        single_pass = results[f"single_pass/{reader}"]["mb_per_s"]
+        legacy = results[f"legacy/{reader}"]["mb_per_s"]
+        if single_pass < legacy * (1 - tolerance):
+            failures.append(
+                f"single_pass/{reader} ({single_pass:.1f} MB/s) is slower than "
+                f"legacy/{reader} ({legacy:.1f} MB/s)"
+            )
+
+    for name, expected in (baseline or {}).items():
+        if name not in results:
+            continue
+        measured = results[name]["mb_per_s"]
+        if measured < expected["mb_per_s"] * (1 - tolerance):
+            failures.append(
+                f"{name}: {measured:.1f} MB/s, baseline {expected['mb_per_s']:.1f} MB/s "
+                f"(tolerance {tolerance:.0%})"
+            )
+    return failures
+
+
+def main(
+    size_mb: float,
+    seed: int,
+    runs: int,
+    tolerance: float,
+    baseline_path: Optional[Path] = None,
+    save_baseline_path: Optional[Path] = None,
+) -> int:
+    logger.remove()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        journal_path = Path(temp_dir) / "Fiskaljournal.txt"
+        stats = JournalGenerator(seed=seed).write(
+            journal_path, size_bytes=int(size_mb * 1024 * 1024)
+        )
+        print(
+            f"{stats.size_bytes / 1024 / 1024:.1f} MB, {stats.transactions} transactions, "
+            f"{stats.cancellations} cancellations, {stats.line_items} line items"
+        )
+
+        failures = []
+        for parser, reader in CONFIGURATIONS:
+            extractor = FiskalExtractor(parser=parser, reader=reader)
+            transactions = extractor.read_file(journal_path)
+            failures.extend(check_result(f"{parser}/{reader}", extractor, transactions, stats))
+
+        results = run(journal_path, stats, runs)
+
+    for name, result in results.items():
+        print(
+            f"{name:20} {result['transactions_per_s']:10.0f} transactions/s "
+            f"{result['mb_per_s']:8.1f} MB/s"
+        )
+
+    baseline = None
+    if baseline_path and baseline_path.exists():
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    failures.extend(check_regressions(results, baseline, tolerance))
+
+    if save_baseline_path:
+        with open(save_baseline_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {save_baseline_path}")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        return 1
+
+    print("✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=20, help="Size of the generated journal")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--runs", type=int, default=3, help="Best of this many runs")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="Allowed slowdown before failing"
+    )
+    parser.add_argument("--baseline", type=Path, default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", type=Path, default=None, help="Write the results as baseline")
+    args = parser.parse_args()
+    sys.exit(
+        main(args.size_mb, args.seed, args.runs, args.tolerance, args.baseline, args.save_baseline)
+    )
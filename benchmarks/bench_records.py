@@ -0,0 +1,87 @@
+"""Compare the slotted records with pydantic validation on the parsing hot path.
+
+Run from the project root:
+
+    python -m benchmarks.bench_records [--repeat 200]
+"""
+from pathlib import Path
+import argparse
+import tempfile
+import time
+
+from loguru import logger
+
+from extractors.fiskal_extractor.fiskal_extractor import FiskalExtractor
+from extractors.fiskal_extractor.records import LineItemRecord, TransactionRecord
+
+
+TEST_JOURNAL = Path(__file__).parent.parent / "tests/test_files/Fiskaljournal.txt"
+
+
+def best_of(runs: int, func) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def copy_records(transactions):
+    return [
+        TransactionRecord(
+            uuid=transaction.uuid,
+            date=transaction.date,
+            bill_number=transaction.bill_number,
+            items=[
+                LineItemRecord(
+                    article_number=item.article_number,
+                    article_id=item.article_id,
+                    quantity=item.quantity,
+                    category=item.category,
+                    category_number=item.category_number,
+                    price_cents=item.price_cents,
+                )
+                for item in transaction.items
+            ],
+            total_gross_cents=transaction.total_gross_cents,
+        )
+        for transaction in transactions
+    ]
+
+
+def main(repeat: int, runs: int):
+    logger.remove()
+
+    journal_text = TEST_JOURNAL.read_text(encoding="utf-8")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        journal_path = Path(temp_dir) / "Fiskaljournal.txt"
+        journal_path.write_text(journal_text * repeat, encoding="utf-8")
+
+        transactions = FiskalExtractor().read_file(journal_path)
+        item_count = sum(len(transaction.items) for transaction in transactions)
+        print(f"{len(transactions)} transactions, {item_count} line items")
+
+        records = best_of(runs, lambda: FiskalExtractor().read_file(journal_path))
+        strict = best_of(
+            runs, lambda: FiskalExtractor(strict=True).read_file(journal_path)
+        )
+        plain = best_of(runs, lambda: copy_records(transactions))
+        models = best_of(
+            runs, lambda: [transaction.to_model() for transaction in transactions]
+        )
+
+    print(f"read_file, records:          {records * 1000:8.1f} ms")
+    print(f"read_file, strict (pydantic): {strict * 1000:8.1f} ms")
+    print(f"speedup:                     {strict / records:8.2f}x")
+    print(f"building records alone:      {plain * 1000:8.1f} ms")
+    print(f"building models alone:       {models * 1000:8.1f} ms")
+    print(f"speedup:                     {models / plain:8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200, help="Copies of the test journal")
+    parser.add_argument("--runs", type=int, default=5, help="Best of this many runs")
+    args = parser.parse_args()
+    main(args.repeat, args.runs)
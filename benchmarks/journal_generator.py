@@ -0,0 +1,322 @@
+"""Deterministic generator for synthetic FiscalToText journals.
+
+The same seed always produces the same journal, byte for byte. Besides
+receipts with one or more line items the journal contains the noise of a
+real register export: the TSE header of every register start, drawer
+openings, Tisch-0-Bon pre-receipts and cancellations with a negative
+total.
+
+Run from the project root:
+
+    python -m benchmarks.journal_generator journal.txt --size-mb 50 [--seed 1]
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+import argparse
+import random
+
+
+WIDTH = 80
+REGISTER_SERIAL = "2345034"
+CERTIFICATE_SERIAL = "E57DE2C777143B964EFDECBEC816461D907C234A7D9C9244E18271D5650A6350"
+
+# (article number, name, Warengruppe, Warengruppe number, unit price in cents, halves sold)
+ARTICLES = [
+    (71, "Roggenmischbrot", "Brot", 1, 490, True),
+    (78, "Nussbrot", "Brot", 1, 540, True),
+    (72, "Dinkelvollkornbrot", "Brot", 1, 560, True),
+    (75, "Sauerteigbrot", "Brot", 1, 520, True),
+    (11, "Weizenbrötchen", "Brötchen", 2, 45, False),
+    (12, "Körnerbrötchen", "Brötchen", 2, 65, False),
+    (13, "Laugenbrezel", "Brötchen", 2, 85, False),
+    (14, "Croissant", "Brötchen", 2, 150, False),
+    (31, "Apfelkuchen (Stück)", "Kuchen", 3, 320, False),
+    (32, "Käsekuchen (Stück)", "Kuchen", 3, 340, False),
+    (48, "Osterbrot", "Teilchen", 5, 1100, False),
+    (51, "Zimtschnecke", "Teilchen", 5, 290, False),
+    (52, "Franzbrötchen", "Teilchen", 5, 270, False),
+    (61, "Kaffee", "Getränke", 6, 250, False),
+    (62, "Cappuccino", "Getränke", 6, 350, False),
+]
+OPERATORS = ["VERKAUF I (#1)", "VERKAUF II (#2)", "CHEF (#15)"]
+PAYMENTS = ["BAR (#1)", "EC KARTE (#2)"]
+
+
+@dataclass
+class JournalStats:
+    """What a correct parser has to find in a generated journal."""
+    transactions: int = 0
+    cancellations: int = 0
+    line_items: int = 0
+    total_gross_cents: int = 0
+    size_bytes: int = 0
+
+
+class JournalGenerator:
+    def __init__(
+        self,
+        seed: int = 0,
+        start: datetime = datetime(2023, 4, 1),
+        cancellation_rate: float = 0.01,
+        drawer_rate: float = 0.05,
+        pre_receipt_rate: float = 0.7,
+    ):
+        self.random = random.Random(seed)
+        self.start = start
+        self.cancellation_rate = cancellation_rate
+        self.drawer_rate = drawer_rate
+        self.pre_receipt_rate = pre_receipt_rate
+        self.stats = JournalStats()
+
+        self._bill_number = 0
+        self._sequence_number = 257081
+        self._transaction_number = 256045
+        self._signature_counter = 565153
+
+    def write(
+        self,
+        output_path: Path,
+        transactions: Optional[int] = None,
+        size_bytes: Optional[int] = None,
+    ) -> JournalStats:
+        """Write until the number of Rechnung blocks or the file size is reached."""
+        if transactions is None and size_bytes is None:
+            raise ValueError("Either transactions or size_bytes is required")
+
+        with open(output_path, "w", encoding="utf-8", newline="\n") as f:
+            for text in self.iter_events():
+                f.write(text)
+                self.stats.size_bytes += len(text.encode("utf-8"))
+                receipts = self.stats.transactions + self.stats.cancellations
+                if transactions is not None and receipts >= transactions:
+                    break
+                if size_bytes is not None and self.stats.size_bytes >= size_bytes:
+                    break
+        return self.stats
+
+    def iter_events(self) -> Iterator[str]:
+        """Yield the journal as text, one register event at a time, day after day."""
+        yield "FiscalToText-Main 1.6.1\n\n\nFiskaljournal-Typ: Deutschland mit Signatur (12)\n\n\n"
+
+        day = self.start
+        while True:
+            now = day.replace(hour=6, minute=30) + timedelta(
+                seconds=self.random.randint(0, 600)
+            )
+            yield self._register_start(now)
+
+            closing = day.replace(hour=18, minute=30)
+            while now < closing:
+                now += timedelta(seconds=self.random.randint(20, 300))
+
+                if self.random.random() < self.drawer_rate:
+                    yield self._drawer_opening(now)
+                    continue
+
+                items = self._pick_items()
+                cancelled = self.random.random() < self.cancellation_rate
+                operator = self.random.choice(OPERATORS)
+                if not cancelled and self.random.random() < self.pre_receipt_rate:
+                    yield self._pre_receipt(now - timedelta(seconds=10), operator, items)
+                yield self._receipt(now, operator, items, cancelled)
+
+            day += timedelta(days=1)
+
+    def _pick_items(self) -> List[Tuple[tuple, str, int]]:
+        """Line items as (article, printed quantity, line total in cents)."""
+        items = []
+        for article in self.random.sample(ARTICLES, self.random.choice([1, 1, 1, 2, 2, 3, 4, 6])):
+            _, _, _, _, unit_cents, halves = article
+            if halves and self.random.random() < 0.4:
+                items.append((article, "0.5", unit_cents // 2))
+            else:
+                count = self.random.choice([1, 1, 1, 2, 3, 4, 6, 10])
+                items.append((article, str(count), unit_cents * count))
+        return items
+
+    def _register_start(self, now: datetime) -> str:
+        self._bill_number += 1
+        return "\n".join(
+            [
+                _row(f"Registrierung starten (#{self._bill_number})", _timestamp(now)),
+                f"  Kasse: 1 ({REGISTER_SERIAL} / 6.4.2.1 30.11.20 15:52)",
+                "  Bediener: CHEF (#15)",
+                f"  Seriennummer: {REGISTER_SERIAL}",
+                f"  Sequenznummer: {self.random.randint(100, 9999)}",
+                "  TSE-Daten:",
+                "    Status: In Betrieb",
+                "    Signaturalgorithmus: ecdsa-plain-SHA384",
+                "    Zeitformat: unixTime",
+                f"  Zertifikat-Seriennummer: {CERTIFICATE_SERIAL}",
+                f"  Signaturzertifikat: {self._base64(1200)}",
+                f"  Öffentl. Schlüssel: {self._base64(128)}",
+                "  Währung (ISO Code): EUR (978)",
+                "  Filialdaten:",
+                "    Name: BULLE Bäckerei",
+                "    Straße: Birkenstraße 55",
+                "    Ort: Düsseldorf",
+                "",
+                f"  Letzte Beleg-Sequenznummer: {self._sequence_number}",
+                "  Beleg nicht gedruckt",
+                "",
+                _row("  Bar gezahlt (Gesamt)", _amount(self.random.randint(10**7, 10**8), True)),
+                _row("  Unbar gezahlt (Gesamt)", _amount(self.random.randint(10**7, 10**8), True)),
+                "",
+                "",
+                "",
+            ]
+        )
+
+    def _drawer_opening(self, now: datetime) -> str:
+        return "\n".join(
+            [
+                _row("Schubladenöffnung", _timestamp(now)),
+                "  Kasse: 1",
+                f"    Bediener: {self.random.choice(OPERATORS)}",
+                "    Info-Daten: Lade 1 (#1)",
+                "    Info-Wert: Kein Verkauf (#4)",
+                "",
+                "",
+                "",
+            ]
+        )
+
+    def _pre_receipt(self, now: datetime, operator: str, items) -> str:
+        self._bill_number += 1
+        lines = [
+            _row(f"Tisch-0-Bon (#{self._bill_number})", _timestamp(now)),
+            f"  Kasse: 1 ({REGISTER_SERIAL})",
+            f"  Bediener: {operator}",
+            f"  Seriennummer: {REGISTER_SERIAL}",
+            "  TSE-Daten:",
+            f"    Start: {_timestamp(now - timedelta(hours=2))}",
+            "  Währung (ISO Code): EUR (978)",
+            "  Kundendaten:",
+            "    (Nicht eingegeben)",
+            "",
+        ]
+        lines.extend(self._item_lines(items, 1))
+        lines.extend(["", "", ""])
+        return "\n".join(lines)
+
+    def _receipt(self, now: datetime, operator: str, items, cancelled: bool) -> str:
+        self._bill_number += 1
+        self._sequence_number += 1
+        self._transaction_number += 1
+        self._signature_counter += 2
+        sign = -1 if cancelled else 1
+
+        total = sum(cents for _, _, cents in items) * sign
+        if cancelled:
+            self.stats.cancellations += 1
+        else:
+            self.stats.transactions += 1
+            self.stats.line_items += len(items)
+            self.stats.total_gross_cents += total
+
+        tse_start = now - timedelta(hours=2, seconds=self.random.randint(5, 30))
+        lines = [
+            _row(f"Rechnung (#{self._bill_number})", _timestamp(now)),
+            f"  Kasse: 1 ({REGISTER_SERIAL})",
+            f"  Bediener: {operator}",
+            f"  UUID: {self.random.getrandbits(128):032X}",
+            f"  Seriennummer: {REGISTER_SERIAL}",
+            f"  Beleg-Sequenznummer: {self._sequence_number}",
+            "  TSE-Daten:",
+            "    Status: In Betrieb",
+            f"    Start: {_timestamp(tse_start)}",
+            f"    Stopp: {_timestamp(tse_start + timedelta(seconds=14))}",
+            f"    Transaktion: {self._transaction_number}",
+            f"    Signaturzähler: {self._signature_counter}",
+            "    Prozesstyp: Kassenbeleg-V1",
+            f"    Transaktionstyp: {'Storno' if cancelled else 'Beleg'}",
+            "    Signaturalgorithmus: ecdsa-plain-SHA384",
+            "    Zeitformat: unixTime",
+            f"  Zertifikat-Seriennummer: {CERTIFICATE_SERIAL}",
+            "  Währung (ISO Code): EUR (978)",
+            "  Kundendaten:",
+            "    (Nicht eingegeben)",
+            "",
+        ]
+        lines.extend(self._item_lines(items, sign))
+        lines.extend(
+            [
+                "",
+                _row(f"          {self.random.choice(PAYMENTS)}", _amount(total)),
+                "",
+                f"  Signatur: {self.random.getrandbits(768):0192X}",
+                "",
+                "",
+                "",
+            ]
+        )
+        return "\n".join(lines)
+
+    def _item_lines(self, items, sign: int) -> List[str]:
+        lines = []
+        for article, quantity, cents in items:
+            number, name, category, category_number, _, _ = article
+            prefix = "-" if sign < 0 else ""
+            lines.extend(
+                [
+                    _row(f"  {prefix}{quantity}x {name} (#{number})", _amount(cents * sign)),
+                    f"    Warengruppe: {category} (#{category_number})",
+                    f"    Steuer 2: {_amount(cents * sign)}",
+                    "    Außer Haus",
+                ]
+            )
+
+        total = sum(cents for _, _, cents in items) * sign
+        net = total * 100 // 107
+        lines.extend(
+            [
+                _row("          Verkauf", _amount(total)),
+                _row("          Verkauf Netto", _amount(net)),
+                _row("", "-------------"),
+                _row("          Summe Brutto", _amount(total)),
+                "",
+                _row("          Steuer 2 (7%)", _amount(total - net)),
+                f"            Umsatz Brutto: {_amount(total)}",
+            ]
+        )
+        return lines
+
+    def _base64(self, length: int) -> str:
+        alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+        return "".join(self.random.choices(alphabet, k=length))
+
+
+def _row(left: str, right: str) -> str:
+    return left + " " * max(1, WIDTH - len(left) - len(right)) + right
+
+
+def _timestamp(moment: datetime) -> str:
+    return moment.strftime("%d.%m.%Y %H:%M:%S")
+
+
+def _amount(cents: int, thousands: bool = False) -> str:
+    sign = "-" if cents < 0 else ""
+    euros, cents = divmod(abs(cents), 100)
+    euros_text = f"{euros:,}".replace(",", ".") if thousands else str(euros)
+    return f"{sign}{euros_text},{cents:02d}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output", type=Path, help="Journal file to write")
+    parser.add_argument("--size-mb", type=float, default=None, help="Target file size")
+    parser.add_argument("--transactions", type=int, default=None, help="Number of Rechnung blocks")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    size_bytes = int(args.size_mb * 1024 * 1024) if args.size_mb else None
+    if size_bytes is None and args.transactions is None:
+        size_bytes = 10 * 1024 * 1024
+
+    stats = JournalGenerator(seed=args.seed).write(args.output, args.transactions, size_bytes)
+    print(
+        f"Wrote {stats.size_bytes / 1024 / 1024:.1f} MB with {stats.transactions} "
+        f"transactions and {stats.cancellations} cancellations to {args.output}"
+    )
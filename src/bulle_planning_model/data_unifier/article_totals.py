@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional
+
+from data_unifier.master_article_data import MasterArticleData
+from extractors.money import cents_to_decimal
+
+
+@dataclass(slots=True)
+class ArticleTotals:
+    """Running totals of one master article for one day, money in integer cents.
+
+    Order lines with fractional quantities are not whole cents; they are
+    summed exactly in order_cents and rounded once in total_cents.
+    """
+    master_name: str
+    sales_cents: int = 0
+    order_cents: Decimal = Decimal("0")
+    quantity: Decimal = Decimal("0")
+    leftover: Optional[float] = None
+    sold_out_time: Optional[str] = None
+
+    def total_cents(self) -> int:
+        return self.sales_cents + int(self.order_cents.to_integral_value(ROUND_HALF_UP))
+
+    def to_model(self) -> MasterArticleData:
+        return MasterArticleData(
+            master_name=self.master_name,
+            total_sales=cents_to_decimal(self.total_cents()),
+            total_quantity=self.quantity,
+            leftover=self.leftover,
+            sold_out_time=self.sold_out_time,
+        )
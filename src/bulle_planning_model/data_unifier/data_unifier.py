@@ -1,37 +1,63 @@
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Mapping, Optional, Tuple, Union
 from decimal import Decimal
-from datetime import datetime
+from datetime import date, datetime, timedelta
 import json
 
 from data_unifier.consolidated_product_data import ConsolidatedProductData
-from data_unifier.master_article_data import MasterArticleData
+from data_unifier.article_totals import ArticleTotals
 from data_unifier.article_lookup_table import ArticleLookupTable
-from extractors.fiskal_extractor.transaction import Transaction
-from extractors.fiskal_extractor.line_item import LineItem
+from data_unifier.mengenlisten_store import MengenlistenStore
+from extractors.fiskal_extractor.records import LineItemRecord, TransactionRecord
+from extractors.fiskal_extractor.columnar_store import (
+    FISKAL_COLUMNS_SUFFIX,
+    SECONDS_PER_DAY,
+    FiskalColumns,
+    quantity_to_decimal,
+)
 from extractors.mengenlisten_extractor.mengenliste import Mengenliste
-from extractors.bestellungs_extractor.order import Order
-from extractors.bestellungs_extractor.line_item import LineItem as BestellungLineItem
+from extractors.money import cents_to_decimal, parse_cents, round_cents
+from extractors.symbol_table import ARTICLE_NAMES
+from extractors.bestellungs_extractor.records import (
+    LineItemRecord as BestellungLineItemRecord,
+    OrderRecord,
+)
 
 
 class DataUnifier:
     def __init__(self):
         self.lookup_table: ArticleLookupTable = self._load_lookup_table()
+        # Master name per ARTICLE_NAMES id, None for unmapped articles
+        self._master_by_article_id: List[Optional[str]] = []
 
     def _load_lookup_table(self) -> ArticleLookupTable:
         return ArticleLookupTable.from_file()
 
+    def _master_name(self, article_id: int) -> Optional[str]:
+        masters = self._master_by_article_id
+        if article_id >= len(masters):
+            # Resolve names interned since the last call once, then index
+            variant_to_master = self.lookup_table.variant_to_master
+            masters.extend(
+                variant_to_master.get(name)
+                for name in ARTICLE_NAMES.names[len(masters):]
+            )
+        return masters[article_id]
+
     def unify_monthly_data(
-        self, fiskal_extract_path: Path, mengenlisten_dir_path: Path, bestellungen_extract_path: Path = None
+        self,
+        fiskal_extract_path: Path,
+        mengenlisten: Union[Path, Mapping[str, Mengenliste]],
+        bestellungen_extract_path: Path = None,
     ) -> Tuple[Dict[str, ConsolidatedProductData], Dict[str, Dict[str, List[str]]]]:
-        with open(fiskal_extract_path, "r", encoding="utf-8") as f:
-            transactions_data = json.load(f)
-
-        transactions = self._parse_fiskal_transactions(transactions_data)
-
-        fiskal_by_date = self._group_fiskal_by_date(transactions)
-
-        mengenlisten_by_date = self._load_mengenlisten_directory(mengenlisten_dir_path)
+        """mengenlisten is either a directory of extracts or Mengenlisten by
+        date, e.g. MengenlistenStore.for_month()."""
+        fiskal_by_date = self._load_fiskal_by_date(fiskal_extract_path)
+
+        if isinstance(mengenlisten, Path):
+            mengenlisten_by_date = self._load_mengenlisten_directory(mengenlisten)
+        else:
+            mengenlisten_by_date = mengenlisten
         
         bestellungen_by_date = {}
         if bestellungen_extract_path and bestellungen_extract_path.exists():
@@ -43,22 +69,19 @@ class DataUnifier:
         consolidated_data = {}
         all_unmapped_data = {}
         for date_str in all_dates:
-            date_transactions = fiskal_by_date.get(date_str, [])
             mengenliste = mengenlisten_by_date.get(date_str)
             date_bestellungen = bestellungen_by_date.get(date_str, [])
 
-            master_articles, unmapped_fiskal = self._process_fiskal_transactions(
-                date_transactions
-            )
+            article_totals, unmapped_fiskal = fiskal_by_date.get(date_str, ({}, []))
 
             unmapped_mengenlisten = []
             if mengenliste:
                 unmapped_mengenlisten = self._merge_mengenlisten_data(
-                    mengenliste, master_articles
+                    mengenliste, article_totals
                 )
 
             unmapped_bestellungen = self._process_bestellungen_transactions(
-                date_bestellungen, master_articles
+                date_bestellungen, article_totals
             )
 
             # Store unmapped items for caller to handle
@@ -69,21 +92,117 @@ class DataUnifier:
                     "unmapped_bestellungen_items": unmapped_bestellungen,
                 }
 
-            total_revenue = sum(
-                article.total_sales for article in master_articles.values()
+            total_revenue_cents = sum(
+                totals.total_cents() for totals in article_totals.values()
             )
 
             consolidated_data[date_str] = ConsolidatedProductData(
                 date=date_str,
-                total_revenue=total_revenue,
-                master_articles=master_articles,
+                total_revenue=cents_to_decimal(total_revenue_cents),
+                master_articles={
+                    master_name: totals.to_model()
+                    for master_name, totals in article_totals.items()
+                },
             )
 
         return consolidated_data, all_unmapped_data
 
+    def _load_fiskal_by_date(
+        self, fiskal_extract_path: Path
+    ) -> Dict[str, Tuple[Dict[str, ArticleTotals], List[str]]]:
+        """Aggregate a fiskal extract into master article totals and unmapped items per date"""
+        if fiskal_extract_path.suffix == FISKAL_COLUMNS_SUFFIX:
+            with FiskalColumns.open(fiskal_extract_path) as columns:
+                return self._process_fiskal_columns(columns)
+
+        with open(fiskal_extract_path, "r", encoding="utf-8") as f:
+            transactions_data = json.load(f)
+
+        transactions = self._parse_fiskal_transactions(transactions_data)
+
+        return {
+            date_str: self._process_fiskal_transactions(date_transactions)
+            for date_str, date_transactions in self._group_fiskal_by_date(
+                transactions
+            ).items()
+        }
+
+    def _process_fiskal_columns(
+        self, columns: FiskalColumns
+    ) -> Dict[str, Tuple[Dict[str, ArticleTotals], List[str]]]:
+        """Aggregate a columnar fiskal store without building pydantic models"""
+        # Resolve each dictionary id to its master name once, not once per row
+        master_by_article_id = [
+            self._master_name(ARTICLE_NAMES.intern(name)) for name in columns.articles
+        ]
+
+        sales_cents: Dict[str, Dict[str, int]] = {}
+        quantities: Dict[str, Dict[str, Decimal]] = {}
+        unmapped: Dict[str, List[str]] = {}
+        date_by_day: Dict[int, str] = {}
+        quantity_cache: Dict[float, Decimal] = {}
+
+        # Every day with a transaction, also those whose transactions have no items
+        for day in columns.days:
+            date_str = date_by_day[day] = (
+                date(1970, 1, 1) + timedelta(days=day)
+            ).strftime("%Y-%m-%d")
+            sales_cents[date_str] = {}
+            quantities[date_str] = {}
+            unmapped[date_str] = []
+
+        timestamps = columns.column("timestamp")
+        article_ids = columns.column("article_id")
+        quantity_column = columns.column("quantity")
+        price_cents = columns.column("price_cents")
+
+        for row in range(columns.rows):
+            date_str = date_by_day[timestamps[row] // SECONDS_PER_DAY]
+
+            article_id = article_ids[row]
+            master_name = master_by_article_id[article_id]
+            if master_name is None:
+                article_name = columns.articles[article_id]
+                if article_name not in unmapped[date_str]:
+                    unmapped[date_str].append(article_name)
+                continue
+
+            quantity = quantity_column[row]
+            quantity_decimal = quantity_cache.get(quantity)
+            if quantity_decimal is None:
+                quantity_decimal = quantity_cache[quantity] = quantity_to_decimal(
+                    quantity
+                )
+
+            date_sales = sales_cents[date_str]
+            date_quantities = quantities[date_str]
+            if master_name in date_sales:
+                date_sales[master_name] += price_cents[row]
+                date_quantities[master_name] += quantity_decimal
+            else:
+                date_sales[master_name] = price_cents[row]
+                date_quantities[master_name] = Decimal("0") + quantity_decimal
+
+        # Release the column views before the caller unmaps the store
+        del timestamps, article_ids, quantity_column, price_cents
+
+        fiskal_by_date = {}
+        for date_str, date_sales in sales_cents.items():
+            article_totals = {
+                master_name: ArticleTotals(
+                    master_name=master_name,
+                    sales_cents=cents,
+                    quantity=quantities[date_str][master_name],
+                )
+                for master_name, cents in date_sales.items()
+            }
+            fiskal_by_date[date_str] = (article_totals, unmapped[date_str])
+
+        return fiskal_by_date
+
     def _parse_fiskal_transactions(
         self, transactions_data: List[dict]
-    ) -> List[Transaction]:
+    ) -> List[TransactionRecord]:
         transactions = []
         for txn_data in transactions_data:
             # Convert date and time strings to datetime
@@ -95,31 +214,31 @@ class DataUnifier:
             items = []
             for sale in txn_data["sales"]:
                 article = sale["article"]
-                line_item = LineItem(
+                line_item = LineItemRecord(
                     article_number=int(article["article_number"]),
-                    article_name=article["article_name"],
+                    article_id=ARTICLE_NAMES.intern(article["article_name"]),
                     quantity=Decimal(article["quantity"]),
                     category=article["category"],
                     category_number=int(article["category_number"]),
-                    price=Decimal(article["price"]),
+                    price_cents=parse_cents(article["price"]),
                 )
                 items.append(line_item)
 
             # Create transaction
-            transaction = Transaction(
+            transaction = TransactionRecord(
                 uuid=txn_data["UUID"],
                 date=dt,
                 bill_number=int(txn_data["bill_number"]),
                 items=items,
-                total_gross=Decimal(txn_data["sum"]),
+                total_gross_cents=parse_cents(txn_data["sum"]),
             )
             transactions.append(transaction)
 
         return transactions
 
     def _group_fiskal_by_date(
-        self, transactions: List[Transaction]
-    ) -> Dict[str, List[Transaction]]:
+        self, transactions: List[TransactionRecord]
+    ) -> Dict[str, List[TransactionRecord]]:
         fiskal_by_date = {}
         for transaction in transactions:
             date_str = transaction.date.strftime("%Y-%m-%d")
@@ -131,27 +250,9 @@ class DataUnifier:
     def _load_mengenlisten_directory(
         self, mengenlisten_dir_path: Path
     ) -> Dict[str, Mengenliste]:
-        mengenlisten_by_date = {}
-
-        if not mengenlisten_dir_path.exists():
-            return mengenlisten_by_date
-
-        for json_file in mengenlisten_dir_path.glob("*.json"):
-            try:
-                with open(json_file, "r", encoding="utf-8") as f:
-                    mengenliste_data = json.load(f)
-
-                for date_str, mengenliste_dict in mengenliste_data.items():
-                    # Add missing report_date field from the date_str key
-                    mengenliste_dict["report_date"] = date_str
-                    mengenliste = Mengenliste(**mengenliste_dict)
-                    mengenlisten_by_date[date_str] = mengenliste
-            except Exception as e:
-                print(f"Warning: Could not load mengenliste file {json_file}: {e}")
+        return MengenlistenStore(mengenlisten_dir_path).all()
 
-        return mengenlisten_by_date
-
-    def _parse_bestellungen_data(self, bestellungen_path: Path) -> List[Order]:
+    def _parse_bestellungen_data(self, bestellungen_path: Path) -> List[OrderRecord]:
         """Parse bestellungen JSON extract and return list of Order objects"""
         with open(bestellungen_path, "r", encoding="utf-8") as f:
             bestellungen_data = json.load(f)
@@ -165,25 +266,26 @@ class DataUnifier:
             # Parse line items
             line_items = []
             for item_data in order_data["sales"]:
-                line_item = BestellungLineItem(
-                    article_name=item_data["article_name"],
+                line_item = BestellungLineItemRecord(
+                    article_id=ARTICLE_NAMES.intern(item_data["article_name"]),
                     quantity=Decimal(str(item_data["quantity"])),
-                    price=Decimal(str(item_data["price"]))
+                    # Extracts store euros as floats
+                    price_cents=round_cents(Decimal(str(item_data["price"])))
                 )
                 line_items.append(line_item)
             
             # Create Order
-            order = Order(
+            order = OrderRecord(
                 id=order_id,
                 pickup_date=pickup_date,
                 sales=line_items,
-                sum=Decimal(str(order_data["sum"]))
+                sum_cents=round_cents(Decimal(str(order_data["sum"])))
             )
             orders.append(order)
             
         return orders
 
-    def _group_bestellungen_by_date(self, orders: List[Order]) -> Dict[str, List[Order]]:
+    def _group_bestellungen_by_date(self, orders: List[OrderRecord]) -> Dict[str, List[OrderRecord]]:
         """Group orders by pickup date"""
         bestellungen_by_date = {}
         for order in orders:
@@ -194,87 +296,75 @@ class DataUnifier:
         return bestellungen_by_date
 
     def _process_bestellungen_transactions(
-        self, orders: List[Order], master_articles: Dict[str, MasterArticleData]
+        self, orders: List[OrderRecord], article_totals: Dict[str, ArticleTotals]
     ) -> List[str]:
-        """Process bestellungen orders and update master articles, return unmapped items"""
+        """Process bestellungen orders and update article totals, return unmapped items"""
         unmapped_items = []
         
         for order in orders:
             for item in order.sales:
-                article_name = item.article_name
+                master_name = self._master_name(item.article_id)
                 
-                if article_name in self.lookup_table.variant_to_master:
-                    master_name = self.lookup_table.variant_to_master[article_name]
-                    
+                if master_name is not None:
                     # Create master article entry if it doesn't exist
-                    if master_name not in master_articles:
-                        master_articles[master_name] = MasterArticleData(
-                            master_name=master_name,
-                            total_sales=Decimal("0"),
-                            total_quantity=Decimal("0"),
-                        )
+                    if master_name not in article_totals:
+                        article_totals[master_name] = ArticleTotals(master_name)
                     
                     # Add bestellungen data to sales quantities
-                    master_articles[master_name].total_quantity += item.quantity
-                    master_articles[master_name].total_sales += item.price * item.quantity
+                    totals = article_totals[master_name]
+                    totals.quantity += item.quantity
+                    # Exact, rounded once per article and day
+                    totals.order_cents += item.price_cents * item.quantity
                     
                 else:
+                    article_name = item.article_name
                     if article_name not in unmapped_items:
                         unmapped_items.append(article_name)
         
         return unmapped_items
 
     def _process_fiskal_transactions(
-        self, transactions: List[Transaction]
-    ) -> Tuple[Dict[str, MasterArticleData], List[str]]:
-        master_articles = {}
+        self, transactions: List[TransactionRecord]
+    ) -> Tuple[Dict[str, ArticleTotals], List[str]]:
+        article_totals = {}
         unmapped_items = []
 
         for transaction in transactions:
             for item in transaction.items:
-                article_name = item.article_name
+                master_name = self._master_name(item.article_id)
 
-                if article_name in self.lookup_table.variant_to_master:
-                    master_name = self.lookup_table.variant_to_master[article_name]
+                if master_name is not None:
+                    if master_name not in article_totals:
+                        article_totals[master_name] = ArticleTotals(master_name)
 
-                    if master_name not in master_articles:
-                        master_articles[master_name] = MasterArticleData(
-                            master_name=master_name,
-                            total_sales=Decimal("0"),
-                            total_quantity=Decimal("0"),
-                        )
-
-                    master_articles[master_name].total_sales += item.price
-                    master_articles[master_name].total_quantity += item.quantity
+                    totals = article_totals[master_name]
+                    totals.sales_cents += item.price_cents
+                    totals.quantity += item.quantity
 
                 else:
+                    article_name = item.article_name
                     if article_name not in unmapped_items:
                         unmapped_items.append(article_name)
 
-        return master_articles, unmapped_items
+        return article_totals, unmapped_items
 
     def _merge_mengenlisten_data(
-        self, mengenliste: Mengenliste, master_articles: Dict[str, MasterArticleData]
+        self, mengenliste: Mengenliste, article_totals: Dict[str, ArticleTotals]
     ) -> List[str]:
         unmapped_items = []
 
         for entry in mengenliste.articles:
             article_name = entry.article_name
+            master_name = self._master_name(ARTICLE_NAMES.intern(article_name))
 
-            if article_name in self.lookup_table.variant_to_master:
-                master_name = self.lookup_table.variant_to_master[article_name]
-
+            if master_name is not None:
                 # Create master article entry if it doesn't exist (mengenlisten-only article)
-                if master_name not in master_articles:
-                    master_articles[master_name] = MasterArticleData(
-                        master_name=master_name,
-                        total_sales=Decimal("0"),
-                        total_quantity=Decimal("0"),
-                    )
+                if master_name not in article_totals:
+                    article_totals[master_name] = ArticleTotals(master_name)
 
                 # Update with mengenlisten data
-                master_articles[master_name].leftover = entry.leftover
-                master_articles[master_name].sold_out_time = entry.sold_out
+                article_totals[master_name].leftover = entry.leftover
+                article_totals[master_name].sold_out_time = entry.sold_out
 
             else:
                 if article_name not in unmapped_items:
@@ -0,0 +1,100 @@
+from bisect import bisect_left, bisect_right
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+import json
+import re
+
+from extractors.mengenlisten_extractor.mengenliste import Mengenliste
+
+
+DATE_FILE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+class MengenlistenStore:
+    """Date index over the Mengenlisten extracts in one directory.
+
+    Extracts named YYYY-MM-DD.json are indexed by name and only parsed
+    when a month or range containing their date is asked for; any other
+    JSON file is parsed up front to learn its dates. Every file is parsed
+    at most once and its Mengenlisten are kept, so one store serves a whole
+    run without copying or re-reading files.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.files_parsed = 0
+        # Date (YYYY-MM-DD) to the file holding it
+        self._files: Dict[str, Path] = {}
+        self._loaded: Dict[str, Mengenliste] = {}
+        self._parsed_files: Set[Path] = set()
+
+        if directory.exists():
+            for json_file in sorted(directory.glob("*.json")):
+                if DATE_FILE_PATTERN.match(json_file.stem):
+                    self._files[json_file.stem] = json_file
+                else:
+                    for date_str in self._parse_file(json_file):
+                        self._files[date_str] = json_file
+        # Sorted, so months and ranges are found by bisection
+        self._dates: List[str] = sorted(self._files)
+
+    def __len__(self) -> int:
+        return len(self._dates)
+
+    def dates(self) -> List[str]:
+        return list(self._dates)
+
+    def months(self) -> List[str]:
+        """Months (YYYY-MM) with at least one Mengenliste."""
+        return sorted({date_str[:7] for date_str in self._dates})
+
+    def get(self, date_str: str) -> Optional[Mengenliste]:
+        json_file = self._files.get(date_str)
+        if json_file is None:
+            return None
+        if json_file not in self._parsed_files:
+            self._parse_file(json_file)
+        return self._loaded.get(date_str)
+
+    def for_month(self, month_key: str) -> Dict[str, Mengenliste]:
+        """Mengenlisten of one month (YYYY-MM) by date."""
+        return self._between(f"{month_key}-01", f"{month_key}-31")
+
+    def for_range(self, start: date, end: date) -> Dict[str, Mengenliste]:
+        """Mengenlisten from start to end, both included, by date."""
+        return self._between(start.isoformat(), end.isoformat())
+
+    def all(self) -> Dict[str, Mengenliste]:
+        return self._between(self._dates[0], self._dates[-1]) if self._dates else {}
+
+    def _between(self, first: str, last: str) -> Dict[str, Mengenliste]:
+        # ISO dates sort like the days they name
+        mengenlisten_by_date = {}
+        start = bisect_left(self._dates, first)
+        end = bisect_right(self._dates, last)
+        for date_str in self._dates[start:end]:
+            mengenliste = self.get(date_str)
+            if mengenliste is not None:
+                mengenlisten_by_date[date_str] = mengenliste
+        return mengenlisten_by_date
+
+    def _parse_file(self, json_file: Path) -> List[str]:
+        """Load every Mengenliste in a file and return their dates."""
+        self._parsed_files.add(json_file)
+        self.files_parsed += 1
+
+        date_strs = []
+        try:
+            with open(json_file, "r", encoding="utf-8") as f:
+                mengenliste_data = json.load(f)
+
+            for date_str, mengenliste_dict in mengenliste_data.items():
+                # Add missing report_date field from the date_str key
+                mengenliste_dict["report_date"] = date_str
+                self._loaded[date_str] = Mengenliste(**mengenliste_dict)
+                date_strs.append(date_str)
+        except Exception as e:
+            print(f"Warning: Could not load mengenliste file {json_file}: {e}")
+
+        return date_strs
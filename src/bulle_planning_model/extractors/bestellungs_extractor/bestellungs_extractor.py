@@ -1,100 +1,340 @@
 import csv
+import hashlib
 import json
-from typing import Dict, List, Optional
+from typing import Dict, Generator, Iterable, List, Optional, Tuple
 from pathlib import Path
 from decimal import Decimal
-from datetime import datetime
+from datetime import date, datetime
 from collections import defaultdict
 from loguru import logger
-import chardet
 
-from extractors.bestellungs_extractor.order import Order
-from extractors.bestellungs_extractor.line_item import LineItem
+from extractors.bestellungs_extractor.records import LineItemRecord, OrderRecord
 from extractors.bestellungs_extractor.metadata import ExtractMetadata
+from extractors.bestellungs_extractor.month_spool import MonthSpool
+from extractors.bestellungs_extractor.month_state import MonthState
+from extractors.bestellungs_extractor.order_columns import OrderColumns
+from extractors.bestellungs_extractor.order_watermark import OrderWatermark
+from extractors.encoding_detector.encoding_detector import EncodingDetector
+from extractors.extraction_result import ExtractionResult
+from extractors.money import cents_to_decimal, multiply_cents
+from extractors.symbol_table import ARTICLE_NAMES
 
 
 class BestellungsExtractor:
-    def __init__(self):
-        self.metadata: Optional[ExtractMetadata] = None
+    # Bump whenever the monthly JSON extracts change so the manifest re-extracts
+    VERSION = "1"
 
-    def _convert_price_to_euros(self, cents: int) -> Decimal:
-        """Convert price from cents to euros"""
-        return Decimal(cents) / Decimal(100)
+    def __init__(
+        self,
+        encoding_detector: Optional[EncodingDetector] = None,
+        strict: bool = False,
+    ):
+        # strict validates every order against the pydantic models
+        self.encoding_detector = encoding_detector or EncodingDetector()
+        self.strict = strict
+        self.metadata: Optional[ExtractMetadata] = None
 
     def _detect_encoding(self, file_path: Path) -> str:
         """Detect file encoding"""
-        with open(file_path, "rb") as file:
-            raw_data = file.read(10000)
-            result = chardet.detect(raw_data)
-            return result["encoding"] or "utf-8"
+        return self.encoding_detector.detect(file_path)
 
-    def read_file(self, file_path: Path) -> List[Order]:
+    def read_file(self, file_path: Path) -> List[OrderRecord]:
         """Read CSV file and return list of Order objects"""
+        result = self.extract(file_path)
+        self.metadata = result.metadata
+        return result.records
+
+    def extract(self, file_path: Path) -> ExtractionResult[OrderRecord]:
+        """Read a CSV export without touching the extractor's state."""
         logger.info(f"Processing orders from {file_path}")
 
-        encoding = self._detect_encoding(file_path)
         orders_dict: Dict[str, Dict] = defaultdict(
             lambda: {"id": None, "pickup_date": None, "line_items": []}
         )
+        for order_id, pickup_date, line_item in self._iter_rows(file_path):
+            orders_dict[order_id]["id"] = order_id
+            orders_dict[order_id]["pickup_date"] = pickup_date
+            orders_dict[order_id]["line_items"].append(line_item)
 
-        with open(file_path, "r", encoding=encoding) as csvfile:
-            reader = csv.DictReader(csvfile)
+        orders = [
+            self._make_order(order_data["id"], order_data["pickup_date"], order_data["line_items"])
+            for order_data in orders_dict.values()
+        ]
 
-            for row in reader:
-                order_id = row["id"]
-                pickup_date = datetime.strptime(row["abholdatum"], "%Y-%m-%d").date()
-                article_name = row["artikelname"]
-                quantity = Decimal(row["artikelanzahl"])
-                price_euros = self._convert_price_to_euros(int(row["artikelpreis"]))
-
-                orders_dict[order_id]["id"] = order_id
-                orders_dict[order_id]["pickup_date"] = pickup_date
-                orders_dict[order_id]["line_items"].append(
-                    LineItem(
-                        article_name=article_name, quantity=quantity, price=price_euros
-                    )
-                )
+        metadata = ExtractMetadata(source_file=str(file_path), total_orders=len(orders))
 
-        orders = []
-        for order_data in orders_dict.values():
-            total_sum = sum(
-                item.price * item.quantity for item in order_data["line_items"]
-            )
-            order = Order(
-                id=order_data["id"],
-                pickup_date=order_data["pickup_date"],
-                sales=order_data["line_items"],
-                sum=total_sum,
-            )
-            orders.append(order)
+        logger.info(f"Processed {len(orders)} orders")
+        return ExtractionResult(source_file=file_path, records=orders, metadata=metadata)
+
+    def iter_orders(self, file_path: Path) -> Generator[OrderRecord, None, None]:
+        """Yield each order as soon as its last row has been read.
+
+        The rows of an order follow each other in the export, so only the
+        current order is held in memory. An order whose rows are split up
+        is yielded once per run of rows; convert_to_monthly_json merges
+        the parts again. self.metadata, counting the yielded parts, is set
+        at the end.
+        """
+        logger.info(f"Streaming orders from {file_path}")
+
+        order_count = 0
+        order_id, pickup_date, line_items = None, None, []
+        for row_order_id, row_pickup_date, line_item in self._iter_rows(file_path):
+            if row_order_id != order_id:
+                if line_items:
+                    order_count += 1
+                    yield self._make_order(order_id, pickup_date, line_items)
+                order_id, line_items = row_order_id, []
+            pickup_date = row_pickup_date
+            line_items.append(line_item)
 
+        if line_items:
+            order_count += 1
+            yield self._make_order(order_id, pickup_date, line_items)
+
+        self.metadata = ExtractMetadata(source_file=str(file_path), total_orders=order_count)
+        logger.info(f"Streamed {order_count} orders")
+
+    def read_columns(self, file_path: Path) -> OrderColumns:
+        """Read the export into typed column arrays instead of order records.
+
+        Much cheaper per row than read_file for large exports; see
+        OrderColumns. Strict validation does not apply here.
+        """
+        logger.info(f"Reading order columns from {file_path}")
+
+        columns = OrderColumns.from_csv(file_path, self._detect_encoding(file_path))
         self.metadata = ExtractMetadata(
-            source_file=str(file_path), total_orders=len(orders)
+            source_file=str(file_path), total_orders=len(columns.order_ids)
         )
 
-        logger.info(f"Processed {len(orders)} orders")
-        return orders
+        logger.info(f"Read {len(columns)} rows of {len(columns.order_ids)} orders")
+        return columns
 
-    def convert_to_json(self, orders: List[Order], output_path: Path) -> None:
+    def convert_to_json(self, orders: List[OrderRecord], output_path: Path) -> None:
         """Convert orders to JSON format and save to file"""
-        json_data = {}
-
-        for order in orders:
-            json_data[order.id] = {
-                "pickup_date": order.pickup_date.strftime("%Y-%m-%d"),
-                "sales": [
-                    {
-                        "article_name": item.article_name,
-                        "quantity": float(item.quantity),
-                        "price": float(item.price),
-                    }
-                    for item in order.sales
-                ],
-                "sum": float(order.sum),
-            }
+        json_data = {order.id: self._order_json(order) for order in orders}
 
         with open(output_path, "w", encoding="utf-8") as f:
             json.dump(json_data, f, indent=2, ensure_ascii=False)
 
         logger.info(f"JSON output saved to {output_path}")
 
+    def convert_to_monthly_json(
+        self,
+        orders: Iterable[OrderRecord],
+        output_dir: Path,
+        file_prefix: str = "bestellungen_",
+        watermark: Optional[OrderWatermark] = None,
+    ) -> Dict[str, Tuple[Path, int]]:
+        """Write orders to one JSON file per pickup month, like convert_to_json.
+
+        Every order goes to a spool file of its month right away, so orders
+        may be any iterable, e.g. iter_orders(). Afterwards the months are
+        written one at a time, merging parts of split orders, so at most one
+        month is in memory. With a watermark from the previous run, months
+        whose orders are unchanged are not rewritten; see _save_month.
+        Returns the file and order count of every month written.
+        """
+        written: Dict[str, Tuple[Path, int]] = {}
+        with MonthSpool(output_dir) as spool:
+            for order in orders:
+                spool.append(
+                    order.pickup_date.strftime("%Y-%m"),
+                    [order.id, self._order_json(order), order.sum_cents],
+                )
+
+            for month_key in spool.months():
+                json_data: Dict[str, Dict] = {}
+                sums_cents: Dict[str, int] = {}
+                for order_id, order_json, sum_cents in spool.read(month_key):
+                    if order_id in json_data:
+                        json_data[order_id]["sales"].extend(order_json["sales"])
+                        json_data[order_id]["pickup_date"] = order_json["pickup_date"]
+                        sums_cents[order_id] += sum_cents
+                        json_data[order_id]["sum"] = float(cents_to_decimal(sums_cents[order_id]))
+                    else:
+                        json_data[order_id] = order_json
+                        sums_cents[order_id] = sum_cents
+
+                output_path = output_dir / f"{file_prefix}{month_key}.json"
+                if self._save_month(month_key, json_data, output_path, watermark):
+                    written[month_key] = (output_path, len(json_data))
+
+        self._drop_missing_months(watermark, spool.counts, output_dir, file_prefix)
+        return written
+
+    def convert_columns_to_monthly_json(
+        self,
+        columns: OrderColumns,
+        output_dir: Path,
+        file_prefix: str = "bestellungen_",
+        watermark: Optional[OrderWatermark] = None,
+    ) -> Dict[str, Tuple[Path, int]]:
+        """Write order columns to one JSON file per pickup month, like convert_to_monthly_json.
+
+        The JSON is built straight from the columns, without order records;
+        names, quantities, prices and dates are converted once per value.
+        """
+        order_ids = columns.order_ids
+        article_ids = columns.columns["article_id"]
+        quantity_codes = columns.columns["quantity_code"]
+        prices = columns.columns["price_cents"]
+        quantities = [float(quantity) for quantity in columns.quantities]
+        sums = columns.order_sums()
+        days = columns.order_days()
+        rows, starts = columns.order_rows()
+
+        article_names: Dict[int, str] = {}
+        euros: Dict[int, float] = {}
+        pickup_dates: Dict[int, str] = {}
+
+        def article_name(article_id: int) -> str:
+            name = article_names.get(article_id)
+            if name is None:
+                name = article_names[article_id] = ARTICLE_NAMES.name(article_id)
+            return name
+
+        def to_euros(cents: int) -> float:
+            value = euros.get(cents)
+            if value is None:
+                value = euros[cents] = float(cents_to_decimal(cents))
+            return value
+
+        written: Dict[str, Tuple[Path, int]] = {}
+        partitions = columns.month_partitions()
+        for month_key in sorted(partitions):
+            json_data = {}
+            for order_code in partitions[month_key]:
+                pickup_day = days[order_code]
+                pickup_date = pickup_dates.get(pickup_day)
+                if pickup_date is None:
+                    pickup_date = pickup_dates[pickup_day] = date.fromordinal(
+                        pickup_day
+                    ).strftime("%Y-%m-%d")
+
+                json_data[order_ids[order_code]] = {
+                    "pickup_date": pickup_date,
+                    "sales": [
+                        {
+                            "article_name": article_name(article_ids[row]),
+                            "quantity": quantities[quantity_codes[row]],
+                            "price": to_euros(prices[row]),
+                        }
+                        for row in rows[starts[order_code] : starts[order_code + 1]]
+                    ],
+                    "sum": to_euros(sums[order_code]),
+                }
+
+            output_path = output_dir / f"{file_prefix}{month_key}.json"
+            if self._save_month(month_key, json_data, output_path, watermark):
+                written[month_key] = (output_path, len(json_data))
+
+        self._drop_missing_months(watermark, partitions, output_dir, file_prefix)
+        return written
+
+    def _save_month(
+        self,
+        month_key: str,
+        json_data: Dict[str, Dict],
+        output_path: Path,
+        watermark: Optional[OrderWatermark],
+    ) -> bool:
+        """Write one monthly file unless the watermark says it is unchanged.
+
+        The digest covers the month's orders as compact JSON, which is much
+        cheaper to produce than the indented file. Returns whether the file
+        was written; the watermark is updated either way.
+        """
+        digest = hashlib.sha256(
+            json.dumps(json_data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        ).hexdigest()
+
+        previous = watermark.months.get(month_key) if watermark else None
+        if previous is not None and previous.sha256 == digest and output_path.exists():
+            logger.debug(f"{month_key} is unchanged, keeping {output_path}")
+            return False
+
+        temp_path = output_path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(json_data, f, indent=2, ensure_ascii=False)
+        temp_path.replace(output_path)
+
+        if previous is None:
+            logger.info(f"Saved {len(json_data)} orders for {month_key} to {output_path}")
+        else:
+            new_orders = len(json_data.keys() - set(previous.order_ids))
+            logger.info(
+                f"Saved {len(json_data)} orders for {month_key} to {output_path} "
+                f"({new_orders} new, the rest changed or removed)"
+            )
+
+        if watermark is not None:
+            watermark.months[month_key] = MonthState(sha256=digest, order_ids=list(json_data))
+            last_pickup = date.fromisoformat(
+                max(order["pickup_date"] for order in json_data.values())
+            )
+            if watermark.max_pickup_date is None or last_pickup > watermark.max_pickup_date:
+                watermark.max_pickup_date = last_pickup
+        return True
+
+    def _drop_missing_months(
+        self,
+        watermark: Optional[OrderWatermark],
+        month_keys: Iterable[str],
+        output_dir: Path,
+        file_prefix: str,
+    ) -> None:
+        """Remove files of months that have no orders in the export anymore."""
+        if watermark is None:
+            return
+        for month_key in sorted(watermark.months.keys() - set(month_keys)):
+            output_path = output_dir / f"{file_prefix}{month_key}.json"
+            logger.warning(f"{month_key} is no longer in the export, removing {output_path}")
+            output_path.unlink(missing_ok=True)
+            del watermark.months[month_key]
+
+    def _iter_rows(
+        self, file_path: Path
+    ) -> Generator[Tuple[str, date, LineItemRecord], None, None]:
+        encoding = self._detect_encoding(file_path)
+
+        with open(file_path, "r", encoding=encoding) as csvfile:
+            reader = csv.DictReader(csvfile)
+
+            for row in reader:
+                pickup_date = datetime.strptime(row["abholdatum"], "%Y-%m-%d").date()
+                # The export already has prices in cents, which is what records carry
+                yield row["id"], pickup_date, LineItemRecord(
+                    article_id=ARTICLE_NAMES.intern(row["artikelname"]),
+                    quantity=Decimal(row["artikelanzahl"]),
+                    price_cents=int(row["artikelpreis"]),
+                )
+
+    def _make_order(
+        self, order_id: str, pickup_date: date, line_items: List[LineItemRecord]
+    ) -> OrderRecord:
+        sum_cents = sum(
+            multiply_cents(item.price_cents, item.quantity) for item in line_items
+        )
+        order = OrderRecord(
+            id=order_id, pickup_date=pickup_date, sales=line_items, sum_cents=sum_cents
+        )
+        if self.strict:
+            order.to_model()
+        return order
+
+    def _order_json(self, order: OrderRecord) -> Dict:
+        return {
+            "pickup_date": order.pickup_date.strftime("%Y-%m-%d"),
+            "sales": [
+                {
+                    "article_name": item.article_name,
+                    "quantity": float(item.quantity),
+                    "price": float(cents_to_decimal(item.price_cents)),
+                }
+                for item in order.sales
+            ],
+            "sum": float(cents_to_decimal(order.sum_cents)),
+        }
+
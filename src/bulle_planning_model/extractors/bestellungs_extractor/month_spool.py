@@ -0,0 +1,73 @@
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+from pathlib import Path
+import json
+import tempfile
+
+
+class MonthSpool:
+    """Collects JSON records per month in temporary files.
+
+    Records are written out as soon as they are appended, so memory holds
+    only what the producer is still assembling; each month is read back
+    on its own afterwards. At most max_open_files files stay open, the
+    least recently written one is closed and later reopened for appending.
+    The temporary directory is removed on close.
+    """
+
+    def __init__(self, spool_dir: Optional[Path] = None, max_open_files: int = 64):
+        self._temp_dir = tempfile.TemporaryDirectory(prefix="month_spool_", dir=spool_dir)
+        self.path = Path(self._temp_dir.name)
+        self.max_open_files = max_open_files
+        self.counts: Dict[str, int] = {}
+        self._files: "OrderedDict[str, TextIO]" = OrderedDict()
+
+    def __enter__(self) -> "MonthSpool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def months(self) -> List[str]:
+        return sorted(self.counts)
+
+    def append(self, month_key: str, record: Any) -> None:
+        f = self._open(month_key)
+        f.write(json.dumps(record, ensure_ascii=False))
+        f.write("\n")
+        self.counts[month_key] = self.counts.get(month_key, 0) + 1
+
+    def read(self, month_key: str) -> Iterator[Any]:
+        """Yield the records of one month in the order they were appended."""
+        f = self._files.pop(month_key, None)
+        if f is not None:
+            f.close()
+        if month_key not in self.counts:
+            return
+
+        with open(self._spool_path(month_key), "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def close(self) -> None:
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+        self._temp_dir.cleanup()
+
+    def _open(self, month_key: str) -> TextIO:
+        f = self._files.get(month_key)
+        if f is not None:
+            self._files.move_to_end(month_key)
+            return f
+
+        if len(self._files) >= self.max_open_files:
+            _, oldest = self._files.popitem(last=False)
+            oldest.close()
+
+        f = open(self._spool_path(month_key), "a", encoding="utf-8")
+        self._files[month_key] = f
+        return f
+
+    def _spool_path(self, month_key: str) -> Path:
+        return self.path / f"{month_key}.jsonl"
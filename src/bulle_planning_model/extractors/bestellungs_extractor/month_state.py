@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class MonthState(BaseModel):
+    """What a monthly Bestellungen file held when it was last written."""
+    sha256: str = Field(..., description="SHA-256 of the month's orders as compact JSON")
+    order_ids: List[str] = Field(default_factory=list, description="Ids of the orders in the file")
@@ -0,0 +1,165 @@
+from typing import Dict, List, Tuple
+from array import array
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+import csv
+
+from extractors.money import multiply_cents
+from extractors.symbol_table import ARTICLE_NAMES
+
+
+# One row per CSV line; strings are dictionary encoded into small codes
+COLUMN_TYPES = {
+    "order_code": "I",  # index into order_ids
+    "pickup_day": "i",  # date.toordinal()
+    "article_id": "I",  # id in ARTICLE_NAMES
+    "quantity_code": "I",  # index into quantities
+    "price_cents": "q",
+}
+
+
+class OrderColumns:
+    """A Bestellungen export as typed column arrays.
+
+    Rows are read with csv.reader into the columns of COLUMN_TYPES. Dates
+    and quantities repeat a lot, so each distinct string is parsed once.
+    Line totals, order sums and the month of every order are then worked
+    out column by column instead of per order object. As in
+    BestellungsExtractor.read_file, an order keeps its first-seen position
+    and the pickup date of its last row.
+    """
+
+    def __init__(self):
+        self.columns: Dict[str, array] = {
+            name: array(typecode) for name, typecode in COLUMN_TYPES.items()
+        }
+        self.order_ids: List[str] = []
+        self.quantities: List[Decimal] = []
+
+    def __len__(self) -> int:
+        return len(self.columns["order_code"])
+
+    @classmethod
+    def from_csv(cls, file_path: Path, encoding: str) -> "OrderColumns":
+        order_columns = cls()
+        columns = order_columns.columns
+        order_codes: Dict[str, int] = {}
+        quantity_codes: Dict[str, int] = {}
+        pickup_days: Dict[str, int] = {}
+
+        append_order = columns["order_code"].append
+        append_day = columns["pickup_day"].append
+        append_article = columns["article_id"].append
+        append_quantity = columns["quantity_code"].append
+        append_price = columns["price_cents"].append
+        intern = ARTICLE_NAMES.intern
+
+        with open(file_path, "r", encoding=encoding, newline="") as csvfile:
+            reader = csv.reader(csvfile)
+            header = next(reader, None)
+            if header is None:
+                return order_columns
+            id_index = header.index("id")
+            date_index = header.index("abholdatum")
+            article_index = header.index("artikelname")
+            quantity_index = header.index("artikelanzahl")
+            price_index = header.index("artikelpreis")
+
+            for row in reader:
+                order_id = row[id_index]
+                order_code = order_codes.get(order_id)
+                if order_code is None:
+                    order_code = order_codes[order_id] = len(order_columns.order_ids)
+                    order_columns.order_ids.append(order_id)
+
+                pickup_date = row[date_index]
+                pickup_day = pickup_days.get(pickup_date)
+                if pickup_day is None:
+                    pickup_day = pickup_days[pickup_date] = date.fromisoformat(
+                        pickup_date
+                    ).toordinal()
+
+                quantity = row[quantity_index]
+                quantity_code = quantity_codes.get(quantity)
+                if quantity_code is None:
+                    quantity_code = quantity_codes[quantity] = len(order_columns.quantities)
+                    order_columns.quantities.append(Decimal(quantity))
+
+                append_order(order_code)
+                append_day(pickup_day)
+                append_article(intern(row[article_index]))
+                append_quantity(quantity_code)
+                # The export already has prices in cents
+                append_price(int(row[price_index]))
+
+        return order_columns
+
+    def line_cents(self) -> array:
+        """Total of every row in cents, rounded like multiply_cents."""
+        whole = [
+            int(quantity) if quantity == quantity.to_integral_value() else None
+            for quantity in self.quantities
+        ]
+        totals = array("q")
+        for quantity_code, price_cents in zip(
+            self.columns["quantity_code"], self.columns["price_cents"]
+        ):
+            factor = whole[quantity_code]
+            if factor is None:
+                totals.append(multiply_cents(price_cents, self.quantities[quantity_code]))
+            else:
+                totals.append(price_cents * factor)
+        return totals
+
+    def order_sums(self) -> array:
+        """Sum in cents per order code."""
+        sums = array("q", bytes(8 * len(self.order_ids)))
+        for order_code, cents in zip(self.columns["order_code"], self.line_cents()):
+            sums[order_code] += cents
+        return sums
+
+    def order_days(self) -> array:
+        """Pickup day per order code, taken from its last row."""
+        days = array("i", bytes(4 * len(self.order_ids)))
+        for order_code, pickup_day in zip(
+            self.columns["order_code"], self.columns["pickup_day"]
+        ):
+            days[order_code] = pickup_day
+        return days
+
+    def month_partitions(self) -> Dict[str, array]:
+        """Order codes per pickup month ("YYYY-MM"), in first-seen order."""
+        month_keys: Dict[int, str] = {}
+        partitions: Dict[str, array] = {}
+        for order_code, pickup_day in enumerate(self.order_days()):
+            month_key = month_keys.get(pickup_day)
+            if month_key is None:
+                month_key = month_keys[pickup_day] = date.fromordinal(pickup_day).strftime(
+                    "%Y-%m"
+                )
+            partition = partitions.get(month_key)
+            if partition is None:
+                partition = partitions[month_key] = array("I")
+            partition.append(order_code)
+        return partitions
+
+    def order_rows(self) -> Tuple[array, array]:
+        """Row indices grouped by order code, and where each order's rows start.
+
+        The rows of order code c are rows[starts[c]:starts[c + 1]], in file
+        order (a stable counting sort on order_code).
+        """
+        order_codes = self.columns["order_code"]
+        starts = array("q", bytes(8 * (len(self.order_ids) + 1)))
+        for order_code in order_codes:
+            starts[order_code + 1] += 1
+        for order_code in range(len(self.order_ids)):
+            starts[order_code + 1] += starts[order_code]
+
+        positions = array("q", starts)
+        rows = array("q", bytes(8 * len(order_codes)))
+        for row, order_code in enumerate(order_codes):
+            rows[positions[order_code]] = row
+            positions[order_code] += 1
+        return rows, starts
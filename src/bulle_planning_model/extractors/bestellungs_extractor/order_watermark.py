@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+from datetime import date
+from typing import Dict, Optional
+
+from extractors.bestellungs_extractor.month_state import MonthState
+
+
+class OrderWatermark(BaseModel):
+    """How far an export has been extracted, kept in the manifest between runs."""
+    max_pickup_date: Optional[date] = Field(None, description="Latest pickup date seen so far")
+    months: Dict[str, MonthState] = Field(
+        default_factory=dict, description="State of every monthly file by YYYY-MM"
+    )
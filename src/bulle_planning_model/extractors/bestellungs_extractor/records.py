@@ -0,0 +1,65 @@
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import List
+
+from extractors.money import cents_to_decimal
+from extractors.symbol_table import ARTICLE_NAMES
+from extractors.bestellungs_extractor.line_item import LineItem
+from extractors.bestellungs_extractor.order import Order
+
+
+@dataclass(slots=True)
+class LineItemRecord:
+    """Unvalidated counterpart of LineItem used on the parsing hot path."""
+    article_id: int  # id in ARTICLE_NAMES
+    quantity: Decimal
+    price_cents: int
+
+    @property
+    def article_name(self) -> str:
+        return ARTICLE_NAMES.name(self.article_id)
+
+    @property
+    def price(self) -> Decimal:
+        return cents_to_decimal(self.price_cents)
+
+    def __reduce__(self):
+        # Ids differ between processes, so send the name across instead
+        return _line_item_record, (self.article_name, self.quantity, self.price_cents)
+
+    def to_model(self) -> LineItem:
+        return LineItem(
+            article_name=self.article_name, quantity=self.quantity, price=self.price
+        )
+
+
+@dataclass(slots=True)
+class OrderRecord:
+    """Unvalidated counterpart of Order used on the parsing hot path."""
+    id: str
+    pickup_date: date
+    sales: List[LineItemRecord]
+    sum_cents: int
+
+    @property
+    def sum(self) -> Decimal:
+        return cents_to_decimal(self.sum_cents)
+
+    def to_model(self) -> Order:
+        return Order(
+            id=self.id,
+            pickup_date=self.pickup_date,
+            sales=[item.to_model() for item in self.sales],
+            sum=self.sum,
+        )
+
+
+def _line_item_record(
+    article_name: str, quantity: Decimal, price_cents: int
+) -> LineItemRecord:
+    return LineItemRecord(
+        article_id=ARTICLE_NAMES.intern(article_name),
+        quantity=quantity,
+        price_cents=price_cents,
+    )
@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class DetectedEncoding(BaseModel):
+    """How the encoding of one raw input file was determined."""
+    source_file: str = Field(..., description="Raw input file path")
+    source_key: str = Field(..., description="Source the encoding is cached under")
+    encoding: str = Field(..., description="Encoding used to read the file")
+    method: str = Field(..., description="One of bom, utf-8, cached or chardet")
+    confidence: Optional[float] = Field(None, description="Confidence reported by chardet")
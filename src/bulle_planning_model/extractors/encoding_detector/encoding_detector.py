@@ -0,0 +1,137 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from pathlib import Path
+import codecs
+import json
+from loguru import logger
+import chardet
+
+from extractors.encoding_detector.detected_encoding import DetectedEncoding
+
+
+BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+SAMPLE_SIZE = 10000
+LOW_CONFIDENCE = 0.7
+
+
+class EncodingDetector:
+    """Detects the encoding of raw input files, calling chardet only as a last resort.
+
+    Only the first SAMPLE_SIZE bytes are looked at, so detecting a multi-GB
+    journal costs no pass over the file. The sample is checked for a byte
+    order mark first. Then the encoding last detected for the same source
+    (by default the file's directory) is reused if it decodes the sample,
+    unless it is a different encoding and the sample is non-ASCII UTF-8.
+    Then the sample is decoded as strict UTF-8, and only then chardet
+    guesses. Every detection is kept for the QC report.
+    """
+
+    def __init__(self, source_encodings: Optional[Dict[str, str]] = None):
+        self.source_encodings: Dict[str, str] = dict(source_encodings or {})
+        self.detections: List[DetectedEncoding] = []
+        self._detected: Dict[Tuple[str, int, int], str] = {}
+
+    @classmethod
+    def from_cache(cls, cache_path: Path) -> "EncodingDetector":
+        if not cache_path.exists():
+            return cls()
+
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                return cls(json.load(f))
+        except Exception as e:
+            logger.warning(f"Could not load encoding cache {cache_path}, starting fresh: {e}")
+            return cls()
+
+    def detect(self, file_path: Path, source_key: Optional[str] = None) -> str:
+        # Extractors ask more than once per file, only the first call does work
+        stat = file_path.stat()
+        file_key = (str(file_path), stat.st_size, stat.st_mtime_ns)
+        if file_key in self._detected:
+            return self._detected[file_key]
+
+        source_key = source_key or str(file_path.parent)
+        with open(file_path, "rb") as f:
+            sample = f.read(SAMPLE_SIZE)
+
+        encoding, method, confidence = self._detect(file_path, sample, source_key)
+
+        detection = DetectedEncoding(
+            source_file=str(file_path),
+            source_key=source_key,
+            encoding=encoding,
+            method=method,
+            confidence=confidence,
+        )
+        if _is_low_confidence(detection):
+            logger.warning(
+                f"Low confidence encoding {encoding} ({confidence}) for {file_path}"
+            )
+        else:
+            logger.debug(f"Detected encoding {encoding} via {method} for {file_path}")
+        self.merge([detection])
+        self._detected[file_key] = encoding
+        return encoding
+
+    def merge(self, detections: Iterable[DetectedEncoding]) -> None:
+        """Add detections, e.g. from worker processes, and cache their encodings."""
+        for detection in detections:
+            self.detections.append(detection)
+            # A BOM says nothing about other files, and a weak guess is not worth repeating
+            if detection.method == "bom" or _is_low_confidence(detection):
+                continue
+            self.source_encodings[detection.source_key] = detection.encoding
+
+    def save_cache(self, cache_path: Path) -> None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(self.source_encodings, f, indent=2, sort_keys=True, ensure_ascii=False)
+
+    def save_report(self, report_path: Path) -> None:
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(
+                [detection.model_dump() for detection in self.detections],
+                f,
+                indent=2,
+                ensure_ascii=False,
+            )
+
+    def _detect(
+        self, file_path: Path, sample: bytes, source_key: str
+    ) -> Tuple[str, str, Optional[float]]:
+        for bom, encoding in BOMS:
+            if sample.startswith(bom):
+                return encoding, "bom", 1.0
+
+        is_utf8 = _decodes(sample, "utf-8")
+        cached = self.source_encodings.get(source_key)
+        if cached and _decodes(sample, cached):
+            # Single-byte encodings decode anything, real UTF-8 must not be read as them
+            if cached == "utf-8" or not is_utf8 or sample.isascii():
+                return cached, "cached", None
+
+        if is_utf8:
+            return "utf-8", "utf-8", 1.0
+
+        result = chardet.detect(sample)
+        return result["encoding"] or "utf-8", "chardet", result["confidence"]
+
+
+def _is_low_confidence(detection: DetectedEncoding) -> bool:
+    return detection.method == "chardet" and (detection.confidence or 0) < LOW_CONFIDENCE
+
+
+def _decodes(sample: bytes, encoding: str) -> bool:
+    # The sample may end in the middle of a multi-byte character
+    decoder = codecs.getincrementaldecoder(encoding)("strict")
+    try:
+        decoder.decode(sample)
+    except (UnicodeDecodeError, LookupError):
+        return False
+    return True
@@ -0,0 +1,107 @@
+from typing import Any, Dict, List, Optional
+from pathlib import Path
+import hashlib
+import json
+from loguru import logger
+
+from extractors.extraction_manifest.manifest_entry import ManifestEntry
+
+
+def file_sha256(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class ExtractionManifest:
+    """Remembers which raw files were already extracted, and into what.
+
+    A file counts as up to date when its extractor version matches, all of
+    its outputs still exist and its content is unchanged. Size and mtime
+    are checked first; the content hash is only computed when the mtime
+    moved, so touching a file does not trigger a re-extraction.
+    """
+
+    def __init__(self, manifest_path: Path):
+        self.manifest_path = manifest_path
+        self.entries: Dict[str, ManifestEntry] = self._load()
+
+    def get(self, source_file: Path) -> Optional[ManifestEntry]:
+        return self.entries.get(str(source_file))
+
+    def is_up_to_date(self, source_file: Path, extractor_version: str) -> bool:
+        entry = self.get(source_file)
+        if entry is None or entry.extractor_version != extractor_version:
+            return False
+
+        if not source_file.exists():
+            return False
+        if not all(Path(output).exists() for output in entry.outputs):
+            return False
+
+        stat = source_file.stat()
+        if stat.st_size != entry.size:
+            return False
+        if stat.st_mtime_ns == entry.mtime_ns:
+            return True
+
+        if file_sha256(source_file) != entry.sha256:
+            return False
+
+        entry.mtime_ns = stat.st_mtime_ns
+        return True
+
+    def record(
+        self,
+        source_file: Path,
+        extractor_version: str,
+        outputs: List[Path],
+        state: Optional[Dict[str, Any]] = None,
+    ) -> ManifestEntry:
+        stat = source_file.stat()
+        entry = ManifestEntry(
+            source_file=str(source_file),
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            sha256=file_sha256(source_file),
+            extractor_version=extractor_version,
+            outputs=[str(output) for output in outputs],
+            state=state or {},
+        )
+        self.entries[entry.source_file] = entry
+        return entry
+
+    def save(self) -> None:
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temporary file first so a crash never leaves half a manifest
+        temp_path = self.manifest_path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    key: entry.model_dump(mode="json")
+                    for key, entry in sorted(self.entries.items())
+                },
+                f,
+                indent=2,
+                ensure_ascii=False,
+            )
+        temp_path.replace(self.manifest_path)
+
+        logger.info(f"Saved {len(self.entries)} manifest entries to {self.manifest_path}")
+
+    def _load(self) -> Dict[str, ManifestEntry]:
+        if not self.manifest_path.exists():
+            return {}
+
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return {key: ManifestEntry(**entry) for key, entry in data.items()}
+        except Exception as e:
+            logger.warning(
+                f"Could not load manifest {self.manifest_path}, starting fresh: {e}"
+            )
+            return {}
@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Any, Dict, List
+
+
+class ManifestEntry(BaseModel):
+    """Fingerprint of a raw input file and the extracts produced from it."""
+    source_file: str = Field(..., description="Raw input file path")
+    size: int = Field(..., description="File size in bytes")
+    mtime_ns: int = Field(..., description="Modification time in nanoseconds")
+    sha256: str = Field(..., description="SHA-256 of the file content")
+    extractor_version: str = Field(..., description="Version of the extractor that produced the outputs")
+    outputs: List[str] = Field(default_factory=list, description="Files written for this input")
+    processed_at: datetime = Field(default_factory=datetime.now)
+    state: Dict[str, Any] = Field(default_factory=dict, description="Extractor-specific resume state")
@@ -0,0 +1,32 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Generic, List, Optional, TypeVar
+
+from pydantic import BaseModel
+
+
+R = TypeVar("R")
+
+
+@dataclass(slots=True)
+class ExtractionResult(Generic[R]):
+    """Everything one extract call produced for one source file.
+
+    Extractors return this instead of keeping metadata and unparsed items
+    on the instance, so one extractor can serve several threads or tasks.
+    errors are failures of the file as a whole, unparsed holds its QC
+    items: UnparsedBlock for journals, file paths for PDFs. retryable marks
+    failures of an unavailable service, where the same call may succeed
+    later.
+    """
+
+    source_file: Path
+    records: List[R] = field(default_factory=list)
+    metadata: Optional[BaseModel] = None
+    errors: List[str] = field(default_factory=list)
+    unparsed: List[Any] = field(default_factory=list)
+    retryable: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
@@ -0,0 +1,150 @@
+from typing import List
+from datetime import datetime
+from decimal import Decimal
+import re
+
+from extractors.money import parse_cents
+from extractors.symbol_table import ARTICLE_NAMES
+from extractors.fiskal_extractor.records import LineItemRecord, TransactionRecord
+
+
+# Compiled once at import time; lines arrive already stripped from the reader
+HEADER_PATTERN = re.compile(r"Rechnung \(#(\d+)\)")
+DATE_PATTERN = re.compile(r"(\d{2})\.(\d{2})\.(\d{4}) (\d{2}):(\d{2}):(\d{2})$")
+ITEM_PATTERN = re.compile(r"^(\d+(?:\.\d+)?)x\s+(.+?)\s+\(#(\d+)\)\s+(\d+,\d+)$")
+CATEGORY_PATTERN = re.compile(r"^\s*Warengruppe:\s+(.+?)\s+\(#(\d+)\)$")
+TOTAL_PATTERN = re.compile(r"Summe Brutto\s+(\d+,\d+)")
+NEGATIVE_TOTAL_PATTERN = re.compile(r"Summe Brutto\s+-\d+,\d+")
+
+
+class BlockParseError(ValueError):
+    """A Rechnung block that cannot be parsed, with a reason code for QC."""
+
+    def __init__(self, message: str, reason: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+def missing_total_error(lines: List[str]) -> BlockParseError:
+    # Cancellations and refunds carry a negative total, which is never parsed
+    if any(NEGATIVE_TOTAL_PATTERN.search(line) for line in lines):
+        return BlockParseError(
+            "Negative total gross in transaction block", "negative_total"
+        )
+    return BlockParseError("Total gross not found in transaction block", "missing_total")
+
+
+def parse_transaction_block(lines: List[str]) -> TransactionRecord:
+    """Parse a Rechnung block in a single scan over its lines.
+
+    Produces the same record as FiskalExtractor's field-by-field parser:
+    the first match wins for UUID, date, bill number and total, and every
+    item line picks up the Warengruppe from the line directly after it.
+    """
+    uuid = None
+    date = None
+    bill_number = None
+    total_gross_cents = None
+    items = []
+
+    line_count = len(lines)
+    for i in range(line_count):
+        line = lines[i]
+        first = line[:1]
+
+        if first.isdigit():
+            item_match = ITEM_PATTERN.match(line)
+            if item_match is None:
+                continue
+
+            category = "Unknown"
+            category_number = 0
+            if i + 1 < line_count:
+                category_match = CATEGORY_PATTERN.match(lines[i + 1])
+                if category_match:
+                    category = category_match.group(1)
+                    category_number = int(category_match.group(2))
+
+            items.append(
+                LineItemRecord(
+                    article_number=int(item_match.group(3)),
+                    article_id=ARTICLE_NAMES.intern(item_match.group(2)),
+                    quantity=Decimal(item_match.group(1)),
+                    category=category,
+                    category_number=category_number,
+                    price_cents=parse_cents(item_match.group(4)),
+                )
+            )
+
+        elif first == "R":
+            if not line.startswith("Rechnung (#"):
+                continue
+            if date is None:
+                date_match = DATE_PATTERN.search(line)
+                if date_match:
+                    day, month, year, hour, minute, second = date_match.groups()
+                    date = datetime(
+                        int(year), int(month), int(day),
+                        int(hour), int(minute), int(second),
+                    )
+            if bill_number is None:
+                bill_match = HEADER_PATTERN.search(line)
+                if bill_match:
+                    bill_number = int(bill_match.group(1))
+
+        elif first == "U":
+            if uuid is None and line.startswith("UUID: "):
+                uuid = line.split("UUID: ")[1]
+
+        elif first == "S":
+            if total_gross_cents is None and line.startswith("Summe Brutto"):
+                total_match = TOTAL_PATTERN.search(line)
+                if total_match:
+                    total_gross_cents = parse_cents(total_match.group(1))
+
+    # Rare layouts where the marker is not at the start of the line
+    if date is None:
+        date = _find_date(lines)
+    if total_gross_cents is None:
+        total_gross_cents = _find_total_gross(lines)
+
+    if uuid is None:
+        raise BlockParseError("UUID not found in transaction block", "missing_uuid")
+    if date is None:
+        raise BlockParseError("Date not found in transaction block", "missing_date")
+    if bill_number is None:
+        raise BlockParseError(
+            "Bill number not found in transaction block", "missing_bill_number"
+        )
+    if total_gross_cents is None:
+        raise missing_total_error(lines)
+
+    return TransactionRecord(
+        uuid=uuid,
+        date=date,
+        bill_number=bill_number,
+        items=items,
+        total_gross_cents=total_gross_cents,
+    )
+
+
+def _find_date(lines: List[str]):
+    for line in lines:
+        if "Rechnung (#" in line:
+            date_match = DATE_PATTERN.search(line)
+            if date_match:
+                day, month, year, hour, minute, second = date_match.groups()
+                return datetime(
+                    int(year), int(month), int(day),
+                    int(hour), int(minute), int(second),
+                )
+    return None
+
+
+def _find_total_gross(lines: List[str]):
+    for line in lines:
+        if "Summe Brutto" in line:
+            total_match = TOTAL_PATTERN.search(line)
+            if total_match:
+                return parse_cents(total_match.group(1))
+    return None
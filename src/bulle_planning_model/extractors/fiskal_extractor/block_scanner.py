@@ -0,0 +1,171 @@
+from typing import Generator, List, NamedTuple, Optional
+from pathlib import Path
+import mmap
+
+
+BLOCK_START = b"Rechnung (#"
+BLOCK_END = b"Signatur: "
+
+
+class RawBlock(NamedTuple):
+    """Stripped lines of one Rechnung block plus its position in the source."""
+
+    lines: List[str]
+    start_line: int
+    end_line: int
+    start_offset: Optional[int] = None
+    end_offset: Optional[int] = None
+
+
+def is_ascii_compatible(encoding: str) -> bool:
+    """Byte-level marker search only works if the markers encode as ASCII."""
+    probe = "Rechnung (#Signatur: \r\n"
+    try:
+        return probe.encode(encoding) == probe.encode("ascii")
+    except LookupError:
+        return False
+
+
+def scan_file_blocks(
+    file_path: Path,
+    encoding: str,
+    start: int = 0,
+    end: Optional[int] = None,
+    first_line: int = 1,
+) -> Generator[RawBlock, None, None]:
+    """Memory-map a Fiskaljournal and yield its Rechnung blocks.
+
+    Only the bytes between a block's "Rechnung (#" line and its "Signatur: "
+    line are decoded; TSE records, drawer openings and everything else in
+    between is skipped without ever leaving the page cache.
+    """
+    with open(file_path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, "madvise"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            yield from scan_blocks(mm, encoding, start, end, first_line)
+
+
+def scan_blocks(
+    buffer: mmap.mmap,
+    encoding: str,
+    start: int = 0,
+    end: Optional[int] = None,
+    first_line: int = 1,
+) -> Generator[RawBlock, None, None]:
+    """Yield blocks found in buffer[start:end].
+
+    start must sit at the beginning of a line, which is numbered first_line.
+    Blocks behave exactly like the line reader in FiskalExtractor: a new
+    "Rechnung (#" line discards an unfinished block, and a block only counts
+    once its "Signatur: " line is seen inside the range.
+    """
+    if end is None:
+        end = len(buffer)
+
+    line_num = first_line
+    counted_to = start
+    pos = start
+
+    while True:
+        block_start, marker = _find_line_marker(buffer, BLOCK_START, pos, end)
+        if block_start == -1:
+            return
+
+        # A later block start before our Signatur means this block is incomplete
+        while True:
+            sig_start, sig_marker = _find_line_marker(
+                buffer, BLOCK_END, marker + len(BLOCK_START), end
+            )
+            if sig_start == -1:
+                return
+            next_start, next_marker = _find_line_marker(
+                buffer, BLOCK_START, marker + len(BLOCK_START), sig_start
+            )
+            if next_start == -1:
+                break
+            block_start, marker = next_start, next_marker
+
+        block_end = _find_line_end(buffer, sig_marker, end)
+
+        line_num += buffer[counted_to:block_start].count(b"\n")
+        counted_to = block_start
+
+        text = buffer[block_start:block_end].decode(encoding)
+        lines = [
+            line.strip()
+            for line in text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+        ]
+        end_line = line_num + len(lines) - 1
+
+        yield RawBlock(
+            lines=lines,
+            start_line=line_num,
+            end_line=end_line,
+            start_offset=block_start,
+            end_offset=block_end,
+        )
+
+        line_num = end_line
+        counted_to = block_end
+        pos = block_end
+
+
+def _find_line_marker(buffer: mmap.mmap, marker: bytes, pos: int, end: int):
+    """Find marker at the start of a line (after optional whitespace).
+
+    Returns (line_start, marker_offset) or (-1, -1).
+    """
+    while True:
+        idx = buffer.find(marker, pos, end)
+        if idx == -1:
+            return -1, -1
+
+        # Bound the \r lookup by the previous \n so LF files stay linear
+        newline = buffer.rfind(b"\n", 0, idx)
+        line_start = max(newline, buffer.rfind(b"\r", newline + 1, idx)) + 1
+        if not buffer[line_start:idx].strip():
+            return line_start, idx
+        pos = idx + 1
+
+
+def _find_line_end(buffer: mmap.mmap, pos: int, end: int) -> int:
+    line_end = buffer.find(b"\n", pos, end)
+    if line_end == -1:
+        line_end = end
+    carriage_return = buffer.find(b"\r", pos, line_end)
+    return line_end if carriage_return == -1 else carriage_return
+
+
+def find_chunk_boundaries(buffer: mmap.mmap, chunk_count: int) -> List[int]:
+    """Split buffer into roughly equal ranges that start on a Rechnung line.
+
+    Cutting right before a "Rechnung (#" line is always safe: the reader
+    would discard any unfinished block at that point anyway. Returns the
+    sorted start offsets, beginning with 0 and ending with len(buffer).
+    """
+    size = len(buffer)
+    boundaries = [0]
+    for k in range(1, chunk_count):
+        nominal = max(size * k // chunk_count, boundaries[-1] + 1)
+        if nominal >= size:
+            break
+        line_start, _ = _find_line_marker(buffer, BLOCK_START, nominal, size)
+        if line_start == -1:
+            break
+        if line_start > boundaries[-1]:
+            boundaries.append(line_start)
+    boundaries.append(size)
+    return boundaries
+
+
+def count_newlines(
+    buffer: mmap.mmap, start: int, end: int, window: int = 16 * 1024 * 1024
+) -> int:
+    """Count b"\\n" in buffer[start:end] without copying more than a window."""
+    count = 0
+    for offset in range(start, end, window):
+        count += buffer[offset:min(offset + window, end)].count(b"\n")
+    return count
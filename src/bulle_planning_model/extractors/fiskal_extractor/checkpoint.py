@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+
+from extractors.fiskal_extractor.unparsed_counts import UnparsedCounts
+
+
+class ParseCheckpoint(BaseModel):
+    """Resume point after the last complete Rechnung block of a journal."""
+    offset: int = Field(0, description="Byte offset right after the last Signatur line")
+    line: int = Field(1, description="Line number at offset")
+    prefix_sha256: str = Field(..., description="SHA-256 of the bytes before offset")
+    total_transactions: int = Field(0, description="Transactions extracted up to offset")
+    compact: bool = Field(False, description="Extract written as compact JSON (indent=None)")
+    unparsed: UnparsedCounts = Field(
+        default_factory=UnparsedCounts, description="Unparsed blocks up to offset"
+    )
@@ -0,0 +1,101 @@
+from typing import List, NamedTuple, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import mmap
+
+from extractors.fiskal_extractor.records import TransactionRecord
+from extractors.fiskal_extractor.unparsed_block_sink import UnparsedBlock
+from extractors.fiskal_extractor.block_scanner import (
+    count_newlines,
+    find_chunk_boundaries,
+    scan_file_blocks,
+)
+
+
+# Below this a chunk costs more in process overhead than it saves
+MIN_CHUNK_SIZE = 4 * 1024 * 1024
+CHUNKS_PER_WORKER = 4
+
+
+class ChunkResult(NamedTuple):
+    transactions: List[TransactionRecord]
+    unparsed_blocks: List[UnparsedBlock]
+
+
+def plan_chunks(
+    file_path: Path, workers: int, min_chunk_size: int = MIN_CHUNK_SIZE
+) -> List[Tuple[int, int]]:
+    """Return (start, end) byte ranges aligned to Rechnung block boundaries."""
+    size = file_path.stat().st_size
+    if size == 0:
+        return []
+
+    chunk_count = max(
+        1, min(workers * CHUNKS_PER_WORKER, size // max(min_chunk_size, 1))
+    )
+    with open(file_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            boundaries = find_chunk_boundaries(mm, chunk_count)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def read_chunks_parallel(
+    file_path: Path,
+    encoding: str,
+    parser: str,
+    chunks: List[Tuple[int, int]],
+    workers: Optional[int] = None,
+    strict: bool = False,
+) -> List[ChunkResult]:
+    """Parse each chunk in a process pool and return results in file order."""
+    file_paths = [file_path] * len(chunks)
+    starts = [start for start, _ in chunks]
+    ends = [end for _, end in chunks]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Line numbers must stay absolute, so count newlines per chunk first
+        newline_counts = list(
+            pool.map(_count_chunk_newlines, file_paths, starts, ends)
+        )
+        first_lines = []
+        line = 1
+        for count in newline_counts:
+            first_lines.append(line)
+            line += count
+
+        return list(
+            pool.map(
+                _parse_chunk,
+                file_paths,
+                [encoding] * len(chunks),
+                [parser] * len(chunks),
+                starts,
+                ends,
+                first_lines,
+                [strict] * len(chunks),
+            )
+        )
+
+
+def _count_chunk_newlines(file_path: Path, start: int, end: int) -> int:
+    with open(file_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return count_newlines(mm, start, end)
+
+
+def _parse_chunk(
+    file_path: Path,
+    encoding: str,
+    parser: str,
+    start: int,
+    end: int,
+    first_line: int,
+    strict: bool,
+) -> ChunkResult:
+    # Imported here to avoid a circular import with fiskal_extractor
+    from extractors.fiskal_extractor.fiskal_extractor import FiskalExtractor
+
+    extractor = FiskalExtractor(parser=parser, reader="mmap", strict=strict)
+    blocks = scan_file_blocks(file_path, encoding, start, end, first_line)
+    transactions = list(extractor._parse_blocks(blocks, file_path))
+    return ChunkResult(transactions, extractor.unparsed_blocks)
@@ -0,0 +1,221 @@
+from typing import Dict, Iterable, List, Set, Tuple
+from array import array
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+import json
+import mmap
+import struct
+import sys
+
+from extractors.fiskal_extractor.records import TransactionRecord
+from extractors.symbol_table import ARTICLE_NAMES
+
+
+FISKAL_COLUMNS_SUFFIX = ".fcol"
+MAGIC = b"FCOL1\0\0\0"
+ALIGNMENT = 8
+EPOCH = datetime(1970, 1, 1)
+SECONDS_PER_DAY = 86400
+
+# One row per line item; names are dictionary encoded into small ids
+COLUMN_TYPES = {
+    "timestamp": "q",  # seconds since 1970-01-01 in register local time
+    "bill_number": "q",
+    "article_number": "q",
+    "quantity": "d",
+    "price_cents": "q",
+    "article_id": "I",
+    "category_id": "I",
+}
+
+
+class FiskalColumnsWriter:
+    """Collects line items into typed column arrays and writes a .fcol file.
+
+    Layout: 8 byte magic, 8 byte little-endian header length, a JSON header
+    with row count, byte order, column offsets and the article and category
+    dictionaries, then every column as a raw array aligned to 8 bytes.
+    The header also lists every day with a transaction, as transactions
+    without line items have no rows.
+    """
+
+    def __init__(self):
+        self.columns: Dict[str, array] = {
+            name: array(typecode) for name, typecode in COLUMN_TYPES.items()
+        }
+        self.articles: List[str] = []
+        self.categories: List[Tuple[str, int]] = []
+        # Days since 1970-01-01 with at least one transaction
+        self.days: Set[int] = set()
+        # ARTICLE_NAMES id to the id in this file's article dictionary
+        self._article_ids: Dict[int, int] = {}
+        self._category_ids: Dict[Tuple[str, int], int] = {}
+
+    def __len__(self) -> int:
+        return len(self.columns["timestamp"])
+
+    @classmethod
+    def from_file(cls, file_path: Path) -> "FiskalColumnsWriter":
+        """Load an existing store so more rows can be appended to it."""
+        writer = cls()
+        with FiskalColumns.open(file_path) as columns:
+            for name in COLUMN_TYPES:
+                writer.columns[name].frombytes(columns.column(name).tobytes())
+            writer.articles = list(columns.articles)
+            writer.categories = list(columns.categories)
+            writer.days = set(columns.days)
+        writer._article_ids = {
+            ARTICLE_NAMES.intern(name): i for i, name in enumerate(writer.articles)
+        }
+        writer._category_ids = {
+            category: i for i, category in enumerate(writer.categories)
+        }
+        return writer
+
+    def add(self, transaction: TransactionRecord) -> None:
+        timestamp = int((transaction.date - EPOCH).total_seconds())
+        columns = self.columns
+        self.days.add(timestamp // SECONDS_PER_DAY)
+
+        for item in transaction.items:
+            article_id = self._article_ids.get(item.article_id)
+            if article_id is None:
+                article_id = self._article_ids[item.article_id] = len(self.articles)
+                self.articles.append(item.article_name)
+
+            category = (item.category, item.category_number)
+            category_id = self._category_ids.get(category)
+            if category_id is None:
+                category_id = self._category_ids[category] = len(self.categories)
+                self.categories.append(category)
+
+            columns["timestamp"].append(timestamp)
+            columns["bill_number"].append(transaction.bill_number)
+            columns["article_number"].append(item.article_number)
+            columns["quantity"].append(float(item.quantity))
+            columns["price_cents"].append(item.price_cents)
+            columns["article_id"].append(article_id)
+            columns["category_id"].append(category_id)
+
+    def add_all(self, transactions: Iterable[TransactionRecord]) -> None:
+        for transaction in transactions:
+            self.add(transaction)
+
+    def write(self, output_path: Path) -> None:
+        layout = {}
+        offset = 0
+        for name, column in self.columns.items():
+            length = len(column) * column.itemsize
+            layout[name] = {
+                "typecode": column.typecode,
+                "offset": offset,
+                "length": length,
+            }
+            offset += _padded(length)
+
+        header = json.dumps(
+            {
+                "rows": len(self),
+                "byteorder": sys.byteorder,
+                "columns": layout,
+                "articles": self.articles,
+                "categories": self.categories,
+                "days": sorted(self.days),
+            },
+            ensure_ascii=False,
+        ).encode("utf-8")
+        header += b" " * (_padded(len(header)) - len(header))
+
+        temp_path = output_path.with_suffix(".tmp")
+        with open(temp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            for column in self.columns.values():
+                data = column.tobytes()
+                f.write(data)
+                f.write(b"\0" * (_padded(len(data)) - len(data)))
+        temp_path.replace(output_path)
+
+
+class FiskalColumns:
+    """Read-only, memory-mapped view of a .fcol store.
+
+    column() returns zero-copy memoryviews, so only the pages that are
+    actually touched are read from disk. Use as a context manager and drop
+    all column views before it closes.
+    """
+
+    def __init__(self, file_path: Path):
+        self.file_path = file_path
+        self._file = open(file_path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+
+        if self._buffer[: len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{file_path} is not a fiskal columns file")
+
+        (header_length,) = struct.unpack("<Q", self._buffer[8:16])
+        header = json.loads(bytes(self._buffer[16:16 + header_length]))
+        self._data_start = 16 + header_length
+
+        self.rows: int = header["rows"]
+        self.articles: List[str] = header["articles"]
+        self.categories: List[Tuple[str, int]] = [
+            (name, number) for name, number in header["categories"]
+        ]
+        self._layout: Dict[str, dict] = header["columns"]
+        self._native = header["byteorder"] == sys.byteorder
+
+        # Stores written before days were recorded only know days with rows
+        if "days" in header:
+            self.days: List[int] = header["days"]
+        else:
+            timestamps = self.column("timestamp")
+            self.days = sorted({timestamp // SECONDS_PER_DAY for timestamp in timestamps})
+            del timestamps
+
+    @classmethod
+    def open(cls, file_path: Path) -> "FiskalColumns":
+        return cls(file_path)
+
+    def __enter__(self) -> "FiskalColumns":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def column(self, name: str):
+        spec = self._layout[name]
+        start = self._data_start + spec["offset"]
+        raw = self._buffer[start:start + spec["length"]]
+        if self._native:
+            return raw.cast(spec["typecode"])
+
+        # Files from a machine with the other byte order need a swapped copy
+        values = array(spec["typecode"])
+        values.frombytes(raw)
+        values.byteswap()
+        return values
+
+    def close(self) -> None:
+        self._buffer.release()
+        self._mmap.close()
+        self._file.close()
+
+
+def timestamp_to_datetime(timestamp: int) -> datetime:
+    return EPOCH + timedelta(seconds=timestamp)
+
+
+def quantity_to_decimal(quantity: float) -> Decimal:
+    """Decimal for a stored quantity, written the way the register prints it."""
+    if quantity.is_integer():
+        return Decimal(int(quantity))
+    return Decimal(repr(quantity))
+
+
+def _padded(length: int) -> int:
+    return (length + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
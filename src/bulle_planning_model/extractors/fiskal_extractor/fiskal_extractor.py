@@ -1,163 +1,533 @@
-from typing import Generator, Optional, List
+from typing import Callable, Generator, Iterable, Iterator, Optional, List, Tuple
 from pathlib import Path
+import hashlib
 import json
+import shutil
+import os
+import textwrap
 import re
 from datetime import datetime
 from decimal import Decimal
 from loguru import logger
-import chardet
+from pydantic import ValidationError
 
-from extractors.fiskal_extractor.transaction import Transaction
 from extractors.fiskal_extractor.metadata import ExtractMetadata
-from extractors.fiskal_extractor.line_item import LineItem
+from extractors.fiskal_extractor.records import LineItemRecord, TransactionRecord
+from extractors.fiskal_extractor.checkpoint import ParseCheckpoint
+from extractors.fiskal_extractor.block_parser import (
+    BlockParseError,
+    missing_total_error,
+    parse_transaction_block,
+)
+from extractors.fiskal_extractor.unparsed_block_sink import (
+    UnparsedBlock,
+    UnparsedBlockSink,
+)
+from extractors.fiskal_extractor.block_scanner import (
+    RawBlock,
+    is_ascii_compatible,
+    scan_file_blocks,
+)
+from extractors.fiskal_extractor.chunked_reader import (
+    MIN_CHUNK_SIZE,
+    plan_chunks,
+    read_chunks_parallel,
+)
+from extractors.encoding_detector.encoding_detector import EncodingDetector
+from extractors.extraction_result import ExtractionResult
+from extractors.money import cents_to_decimal, parse_cents
+from extractors.symbol_table import ARTICLE_NAMES
 
 
 class FiskalExtractor:
-    def __init__(self):
+    # Bump whenever the JSON extract changes so the manifest re-extracts
+    VERSION = "1"
+    PARSERS = ("single_pass", "legacy")
+    READERS = ("text", "mmap")
+
+    def __init__(
+        self,
+        parser: str = "single_pass",
+        reader: str = "text",
+        encoding_detector: Optional[EncodingDetector] = None,
+        strict: bool = False,
+        unparsed_sink: Optional[UnparsedBlockSink] = None,
+    ):
+        if parser not in self.PARSERS:
+            raise ValueError(
+                f"Unknown parser '{parser}', expected one of {self.PARSERS}"
+            )
+        if reader not in self.READERS:
+            raise ValueError(
+                f"Unknown reader '{reader}', expected one of {self.READERS}"
+            )
+        self.parser = parser
+        self.reader = reader
+        self.encoding_detector = encoding_detector or EncodingDetector()
+        # strict validates every transaction against the pydantic models,
+        # blocks that fail end up in unparsed_blocks like any parse error
+        self.strict = strict
         self.metadata: Optional[ExtractMetadata] = None
-        self.unparsed_blocks: List[List[str]] = []
+        self.checkpoint: Optional[ParseCheckpoint] = None
+        # Failed blocks go to the sink if there is one, otherwise to unparsed_blocks
+        self.unparsed_sink = unparsed_sink
+        self.unparsed_blocks: List[UnparsedBlock] = []
+        self.unparsed_count = 0
+
+    def extract(self, file_path: Path) -> ExtractionResult[TransactionRecord]:
+        """Parse a journal without touching the extractor's state.
+
+        Unparsed blocks go to the result instead of unparsed_blocks or the
+        sink, so concurrent calls on one extractor do not mix.
+        """
+        result = ExtractionResult(source_file=file_path)
+        result.records = list(
+            self._parse_transactions(file_path, record_unparsed=result.unparsed.append)
+        )
+        result.metadata = ExtractMetadata(
+            source_file=str(file_path), total_transactions=len(result.records)
+        )
+        return result
+
+    def read_file(self, file_path: Path) -> List[TransactionRecord]:
+        result = self.extract(file_path)
+        for block in result.unparsed:
+            self._record_unparsed(block)
+        self.metadata = result.metadata
+        return result.records
+
+    def iter_file(self, file_path: Path) -> Generator[TransactionRecord, None, None]:
+        """Yield transactions as they are parsed; metadata is set at the end."""
+        transaction_count = 0
+        for transaction in self._parse_transactions(file_path):
+            transaction_count += 1
+            yield transaction
+
+        self.metadata = ExtractMetadata(
+            source_file=str(file_path), total_transactions=transaction_count
+        )
+
+    def read_file_parallel(
+        self,
+        file_path: Path,
+        workers: Optional[int] = None,
+        min_chunk_size: int = MIN_CHUNK_SIZE,
+    ) -> List[TransactionRecord]:
+        """Parse one journal on several cores.
+
+        The file is cut into byte ranges at Rechnung block boundaries, each
+        range is parsed in a worker process and the results are merged in
+        file order, so transactions, unparsed blocks and metadata match
+        read_file.
+        """
+        workers = workers or os.cpu_count() or 1
+        encoding = self._detect_encoding(file_path)
+        chunks = plan_chunks(file_path, workers, min_chunk_size)
+
+        if len(chunks) <= 1 or not is_ascii_compatible(encoding):
+            return self.read_file(file_path)
+
+        logger.info(
+            f"Starting parallel extraction from {file_path} "
+            f"({len(chunks)} chunks, {workers} workers)"
+        )
+        results = read_chunks_parallel(
+            file_path, encoding, self.parser, chunks, workers, self.strict
+        )
 
-    def read_file(self, file_path: Path) -> List[Transaction]:
-        transactions = list(self._parse_transactions(file_path))
+        transactions = []
+        unparsed_before = self.unparsed_count
+        for result in results:
+            transactions.extend(result.transactions)
+            for block in result.unparsed_blocks:
+                self._record_unparsed(block)
+        unparsed_count = self.unparsed_count - unparsed_before
 
         self.metadata = ExtractMetadata(
             source_file=str(file_path), total_transactions=len(transactions)
         )
 
+        logger.info(f"Extraction complete. Found {len(transactions)} transactions")
+        if unparsed_count:
+            logger.warning(f"Found {unparsed_count} unparsed transaction blocks")
+
         return transactions
 
+    def read_file_incremental(
+        self, file_path: Path, checkpoint: Optional[ParseCheckpoint] = None
+    ) -> Tuple[List[TransactionRecord], bool]:
+        """Parse only what was appended to a journal since checkpoint.
+
+        The checkpoint is trusted only if the file still starts with exactly
+        the bytes it was taken from; otherwise the whole file is parsed.
+        Returns the new transactions and whether parsing resumed from the
+        checkpoint. self.checkpoint is updated to the new end of the journal.
+        """
+        transactions, resumed = self.iter_file_incremental(file_path, checkpoint)
+        return list(transactions), resumed
+
+    def iter_file_incremental(
+        self, file_path: Path, checkpoint: Optional[ParseCheckpoint] = None
+    ) -> Tuple[Iterator[TransactionRecord], bool]:
+        """Streaming variant of read_file_incremental.
+
+        Whether the checkpoint is used is decided up front; self.checkpoint
+        and self.metadata are set once the returned iterator is exhausted.
+        """
+        encoding = self._detect_encoding(file_path)
+        if not is_ascii_compatible(encoding):
+            self.checkpoint = None
+            return self.iter_file(file_path), False
+
+        prefix_hash = hashlib.sha256()
+        resumed = checkpoint is not None and self._matches_checkpoint(
+            file_path, checkpoint, prefix_hash
+        )
+        if not resumed:
+            checkpoint = None
+            prefix_hash = hashlib.sha256()
+
+        return self._iter_from_checkpoint(
+            file_path, encoding, checkpoint, prefix_hash
+        ), resumed
+
+    def _iter_from_checkpoint(
+        self,
+        file_path: Path,
+        encoding: str,
+        checkpoint: Optional[ParseCheckpoint],
+        prefix_hash,
+    ) -> Generator[TransactionRecord, None, None]:
+        if checkpoint is not None:
+            start, first_line = checkpoint.offset, checkpoint.line
+            previous_transactions = checkpoint.total_transactions
+            logger.info(f"Resuming extraction from {file_path} at byte {start}")
+        else:
+            start, first_line, previous_transactions = 0, 1, 0
+            logger.info(f"Starting extraction from {file_path}")
+
+        last_block: Optional[RawBlock] = None
+
+        def track_blocks(blocks: Iterable[RawBlock]):
+            nonlocal last_block
+            for block in blocks:
+                last_block = block
+                yield block
+
+        blocks = scan_file_blocks(file_path, encoding, start, first_line=first_line)
+        transaction_count = 0
+        for transaction in self._parse_blocks(track_blocks(blocks), file_path):
+            transaction_count += 1
+            yield transaction
+
+        end, end_line = start, first_line
+        if last_block is not None:
+            end, end_line = last_block.end_offset, last_block.end_line
+        self._hash_file_range(file_path, prefix_hash, start, end)
+
+        self.checkpoint = ParseCheckpoint(
+            offset=end,
+            line=end_line,
+            prefix_sha256=prefix_hash.hexdigest(),
+            total_transactions=previous_transactions + transaction_count,
+        )
+        self.metadata = ExtractMetadata(
+            source_file=str(file_path),
+            total_transactions=self.checkpoint.total_transactions,
+        )
+
+        logger.info(f"Extraction complete. Found {transaction_count} new transactions")
+
     def convert_to_json(
-        self, transactions: List[Transaction], output_path: Path
-    ) -> None:
-        json_data = []
-
-        for transaction in transactions:
-            transaction_dict = {
-                "UUID": transaction.uuid,
-                "date": transaction.date.strftime("%Y-%m-%d"),
-                "time": transaction.date.strftime("%H:%M:%S"),
-                "bill_number": str(transaction.bill_number),
-                "sales": [
-                    {
-                        "article": {
-                            "article_name": item.article_name,
-                            "article_number": str(item.article_number),
-                            "quantity": str(item.quantity),
-                            "category": item.category,
-                            "category_number": str(item.category_number),
-                            "price": str(item.price),
-                        }
-                    }
-                    for item in transaction.items
-                ],
-                "sum": str(transaction.total_gross),
-            }
-            json_data.append(transaction_dict)
+        self,
+        transactions: Iterable[TransactionRecord],
+        output_path: Path,
+        indent: Optional[int] = 2,
+    ) -> int:
+        """Write transactions as a JSON list, one record at a time.
+
+        transactions may be any iterable, e.g. iter_file(), so only one
+        record is held in memory. indent=None writes one compact record per
+        line. Returns the number of transactions written.
+        """
+        temp_path = output_path.with_suffix(".tmp")
+        transaction_count = 0
+
+        # The extract is replaced only once complete, a failure leaves the old one
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write("[")
+                for transaction in transactions:
+                    f.write("\n" if transaction_count == 0 else ",\n")
+                    f.write(self._format_record(transaction, indent))
+                    transaction_count += 1
+                f.write("\n]" if transaction_count else "]")
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+        temp_path.replace(output_path)
+
+        logger.info(f"Saved {transaction_count} transactions to {output_path}")
+        return transaction_count
+
+    def append_to_json(
+        self,
+        transactions: Iterable[TransactionRecord],
+        output_path: Path,
+        indent: Optional[int] = 2,
+    ) -> int:
+        """Append transactions to an extract written by convert_to_json.
+
+        The extract is copied to a temporary file, its closing bracket is
+        replaced by the new records and the copy then replaces the extract,
+        so a failure partway leaves the previous extract intact. Only the
+        new transactions are formatted. Returns the number appended.
+        """
+        transactions = iter(transactions)
+        first_transaction = next(transactions, None)
+        if first_transaction is None:
+            logger.info(f"No new transactions to append to {output_path}")
+            return 0
+
+        temp_path = output_path.with_suffix(".tmp")
+        shutil.copyfile(output_path, temp_path)
+        try:
+            with open(temp_path, "r+b") as f:
+                size = f.seek(0, 2)
+                tail_start = f.seek(max(0, size - 64))
+                tail = f.read().rstrip()
+                if not tail.endswith(b"]"):
+                    raise ValueError(f"{output_path} is not a JSON list extract")
+
+                # Cut right after the last record (or the opening bracket)
+                body = tail[:-1].rstrip()
+                separator = "\n" if body.endswith(b"[") else ",\n"
+
+                f.seek(tail_start + len(body))
+                f.truncate()
+
+                f.write(separator.encode("utf-8"))
+                f.write(self._format_record(first_transaction, indent).encode("utf-8"))
+                transaction_count = 1
+                for transaction in transactions:
+                    f.write(b",\n")
+                    f.write(self._format_record(transaction, indent).encode("utf-8"))
+                    transaction_count += 1
+                f.write(b"\n]")
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+        temp_path.replace(output_path)
+
+        logger.info(f"Appended {transaction_count} transactions to {output_path}")
+        return transaction_count
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(json_data, f, indent=2, ensure_ascii=False)
+    def _format_record(self, transaction: TransactionRecord, indent: Optional[int]) -> str:
+        record = self._transaction_to_dict(transaction)
+        if indent is None:
+            return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+        # Nest the record one level deep, exactly like json.dump on the list
+        return textwrap.indent(
+            json.dumps(record, indent=indent, ensure_ascii=False), " " * indent
+        )
+
+    def _transaction_to_dict(self, transaction: TransactionRecord) -> dict:
+        return {
+            "UUID": transaction.uuid,
+            "date": transaction.date.strftime("%Y-%m-%d"),
+            "time": transaction.date.strftime("%H:%M:%S"),
+            "bill_number": str(transaction.bill_number),
+            "sales": [
+                {
+                    "article": {
+                        "article_name": item.article_name,
+                        "article_number": str(item.article_number),
+                        "quantity": str(item.quantity),
+                        "category": item.category,
+                        "category_number": str(item.category_number),
+                        "price": str(cents_to_decimal(item.price_cents)),
+                    }
+                }
+                for item in transaction.items
+            ],
+            "sum": str(cents_to_decimal(transaction.total_gross_cents)),
+        }
+
+    def _matches_checkpoint(
+        self, file_path: Path, checkpoint: ParseCheckpoint, prefix_hash
+    ) -> bool:
+        if file_path.stat().st_size < checkpoint.offset:
+            return False
+        self._hash_file_range(file_path, prefix_hash, 0, checkpoint.offset)
+        return prefix_hash.hexdigest() == checkpoint.prefix_sha256
+
+    def _hash_file_range(
+        self,
+        file_path: Path,
+        hasher,
+        start: int,
+        end: int,
+        chunk_size: int = 1024 * 1024,
+    ) -> None:
+        with open(file_path, "rb") as f:
+            f.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                remaining -= len(chunk)
 
-        logger.info(f"Saved {len(json_data)} transactions to {output_path}")
-    
     def save_unparsed_blocks(self, output_path: Path) -> None:
         if not self.unparsed_blocks:
             logger.info("No unparsed blocks to save")
             return
-            
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(f"Unparsed Transaction Blocks ({len(self.unparsed_blocks)} total)\n")
-            f.write("=" * 60 + "\n\n")
-            
-            for i, block in enumerate(self.unparsed_blocks, 1):
-                f.write(f"Block {i}:\n")
-                f.write("-" * 20 + "\n")
-                for line in block:
-                    f.write(f"{line}\n")
-                f.write("\n" + "=" * 60 + "\n\n")
-        
-        logger.info(f"Saved {len(self.unparsed_blocks)} unparsed blocks to {output_path}")
+
+        with UnparsedBlockSink(output_path) as sink:
+            for block in self.unparsed_blocks:
+                sink.write(block)
 
     def _parse_transactions(
-        self, file_path: Path
-    ) -> Generator[Transaction, None, None]:
+        self,
+        file_path: Path,
+        record_unparsed: Optional[Callable[[UnparsedBlock], None]] = None,
+    ) -> Generator[TransactionRecord, None, None]:
         logger.info(f"Starting extraction from {file_path}")
 
-        current_block_lines = []
-        inside_transaction = False
+        record_unparsed = record_unparsed or self._record_unparsed
+        unparsed_count = 0
+
+        def count_unparsed(block: UnparsedBlock) -> None:
+            nonlocal unparsed_count
+            unparsed_count += 1
+            record_unparsed(block)
+
         transaction_count = 0
+        blocks = self._iter_blocks(file_path)
+        for transaction in self._parse_blocks(blocks, file_path, count_unparsed):
+            transaction_count += 1
+            yield transaction
 
-        # Detect file encoding
-        with open(file_path, "rb") as f:
-            raw_data = f.read(10000)  # Read first 10KB for detection
-            encoding_result = chardet.detect(raw_data)
-            encoding = encoding_result['encoding'] or 'utf-8'
-            logger.debug(f"Detected encoding: {encoding} (confidence: {encoding_result['confidence']})")
+        logger.info(f"Extraction complete. Found {transaction_count} transactions")
+        if unparsed_count:
+            logger.warning(f"Found {unparsed_count} unparsed transaction blocks")
+
+    def _parse_blocks(
+        self,
+        blocks: Iterable[RawBlock],
+        file_path: Path,
+        record_unparsed: Optional[Callable[[UnparsedBlock], None]] = None,
+    ) -> Generator[TransactionRecord, None, None]:
+        record_unparsed = record_unparsed or self._record_unparsed
+        for block in blocks:
+            try:
+                transaction = self._parse_transaction_block(block.lines)
+                if self.strict:
+                    transaction.to_model()
+            except Exception as e:
+                logger.warning(
+                    f"Failed to parse transaction at line {block.end_line}: {e}"
+                )
+                record_unparsed(
+                    UnparsedBlock(
+                        source_file=str(file_path),
+                        start_line=block.start_line,
+                        end_line=block.end_line,
+                        reason=_failure_reason(e),
+                        lines=block.lines,
+                    )
+                )
+                continue
 
-        try:
-            with open(file_path, "r", encoding=encoding) as file:
-                for line_num, line in enumerate(file, 1):
-                    line = line.strip()
-
-                    if line.startswith("Rechnung (#"):
-                        inside_transaction = True
-                        current_block_lines = [line]
-                        logger.debug(f"Found transaction start at line {line_num}")
-                        continue
-
-                    if inside_transaction and line.startswith("Signatur: "):
-                        current_block_lines.append(line)
-                        try:
-                            transaction = self._parse_transaction_block(
-                                current_block_lines
-                            )
-                            transaction_count += 1
-                            logger.debug(
-                                f"Successfully parsed transaction {transaction.uuid}"
-                            )
-                            yield transaction
-                        except Exception as e:
-                            logger.warning(
-                                f"Failed to parse transaction at line {line_num}: {e}"
-                            )
-                            self.unparsed_blocks.append(current_block_lines.copy())
-
-                        current_block_lines = []
-                        inside_transaction = False
-                        continue
-
-                    if inside_transaction:
-                        current_block_lines.append(line)
+            logger.debug(f"Successfully parsed transaction {transaction.uuid}")
+            yield transaction
+
+    def _record_unparsed(self, block: UnparsedBlock) -> None:
+        self.unparsed_count += 1
+        if self.unparsed_sink is not None:
+            self.unparsed_sink.write(block)
+        else:
+            self.unparsed_blocks.append(block)
+
+    def _detect_encoding(self, file_path: Path) -> str:
+        return self.encoding_detector.detect(file_path)
+
+    def _iter_blocks(self, file_path: Path) -> Generator[RawBlock, None, None]:
+        encoding = self._detect_encoding(file_path)
 
+        try:
+            if self.reader == "mmap" and is_ascii_compatible(encoding):
+                yield from scan_file_blocks(file_path, encoding)
+            else:
+                if self.reader == "mmap":
+                    logger.info(
+                        f"Encoding {encoding} is not ASCII compatible, "
+                        f"falling back to text reader for {file_path}"
+                    )
+                yield from self._iter_text_blocks(file_path, encoding)
         except Exception as e:
             logger.error(f"Error reading file {file_path}: {e}")
             raise
 
-        logger.info(f"Extraction complete. Found {transaction_count} transactions")
-        if self.unparsed_blocks:
-            logger.warning(f"Found {len(self.unparsed_blocks)} unparsed transaction blocks")
+    def _iter_text_blocks(
+        self, file_path: Path, encoding: str
+    ) -> Generator[RawBlock, None, None]:
+        current_block_lines = []
+        inside_transaction = False
+        start_line = 0
+
+        with open(file_path, "r", encoding=encoding) as file:
+            for line_num, line in enumerate(file, 1):
+                line = line.strip()
+
+                if line.startswith("Rechnung (#"):
+                    inside_transaction = True
+                    current_block_lines = [line]
+                    start_line = line_num
+                    logger.debug(f"Found transaction start at line {line_num}")
+                    continue
+
+                if inside_transaction and line.startswith("Signatur: "):
+                    current_block_lines.append(line)
+                    yield RawBlock(
+                        lines=current_block_lines,
+                        start_line=start_line,
+                        end_line=line_num,
+                    )
+                    current_block_lines = []
+                    inside_transaction = False
+                    continue
+
+                if inside_transaction:
+                    current_block_lines.append(line)
+
+    def _parse_transaction_block(self, lines: List[str]) -> TransactionRecord:
+        if self.parser == "single_pass":
+            return parse_transaction_block(lines)
 
-    def _parse_transaction_block(self, lines: List[str]) -> Transaction:
         uuid = self._extract_uuid(lines)
         date = self._extract_date(lines)
         bill_number = self._extract_bill_number(lines)
         items = self._extract_items(lines)
-        total_gross = self._extract_total_gross(lines)
+        total_gross_cents = self._extract_total_gross(lines)
 
-        return Transaction(
+        return TransactionRecord(
             uuid=uuid,
             date=date,
             bill_number=bill_number,
             items=items,
-            total_gross=total_gross,
+            total_gross_cents=total_gross_cents,
         )
 
     def _extract_uuid(self, lines: List[str]) -> str:
         for line in lines:
             if line.startswith("UUID: "):
                 return line.split("UUID: ")[1]
-        raise ValueError("UUID not found in transaction block")
+        raise BlockParseError("UUID not found in transaction block", "missing_uuid")
 
     def _extract_date(self, lines: List[str]) -> datetime:
         for line in lines:
@@ -168,7 +538,7 @@ class FiskalExtractor:
                 if date_match:
                     date_str = date_match.group(1)
                     return datetime.strptime(date_str, "%d.%m.%Y %H:%M:%S")
-        raise ValueError("Date not found in transaction block")
+        raise BlockParseError("Date not found in transaction block", "missing_date")
 
     def _extract_bill_number(self, lines: List[str]) -> int:
         for line in lines:
@@ -176,9 +546,11 @@ class FiskalExtractor:
                 bill_match = re.search(r"Rechnung \(#(\d+)\)", line)
                 if bill_match:
                     return int(bill_match.group(1))
-        raise ValueError("Bill number not found in transaction block")
+        raise BlockParseError(
+            "Bill number not found in transaction block", "missing_bill_number"
+        )
 
-    def _extract_items(self, lines: List[str]) -> List[LineItem]:
+    def _extract_items(self, lines: List[str]) -> List[LineItemRecord]:
         items = []
         i = 0
 
@@ -193,7 +565,7 @@ class FiskalExtractor:
                 quantity = Decimal(item_match.group(1).replace(",", "."))
                 article_name = item_match.group(2)
                 article_number = int(item_match.group(3))
-                price = Decimal(item_match.group(4).replace(",", "."))
+                price_cents = parse_cents(item_match.group(4))
 
                 # Look for category in next line
                 category = "Unknown"
@@ -208,13 +580,13 @@ class FiskalExtractor:
                         category_number = int(category_match.group(2))
 
                 items.append(
-                    LineItem(
+                    LineItemRecord(
                         article_number=article_number,
-                        article_name=article_name,
+                        article_id=ARTICLE_NAMES.intern(article_name),
                         quantity=quantity,
                         category=category,
                         category_number=category_number,
-                        price=price,
+                        price_cents=price_cents,
                     )
                 )
 
@@ -222,11 +594,19 @@ class FiskalExtractor:
 
         return items
 
-    def _extract_total_gross(self, lines: List[str]) -> Decimal:
+    def _extract_total_gross(self, lines: List[str]) -> int:
         for line in lines:
             if "Summe Brutto" in line:
                 # Only match positive amounts - excludes cancellations, refunds, and negative transactions
                 total_match = re.search(r"Summe Brutto\s+(\d+,\d+)", line)
                 if total_match:
-                    return Decimal(total_match.group(1).replace(",", "."))
-        raise ValueError("Total gross not found in transaction block")
+                    return parse_cents(total_match.group(1))
+        raise missing_total_error(lines)
+
+
+def _failure_reason(error: Exception) -> str:
+    if isinstance(error, BlockParseError):
+        return error.reason
+    if isinstance(error, ValidationError):
+        return "validation_failed"
+    return "parse_error"
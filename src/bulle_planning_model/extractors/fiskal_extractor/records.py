@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import List
+
+from extractors.money import cents_to_decimal
+from extractors.symbol_table import ARTICLE_NAMES
+from extractors.fiskal_extractor.line_item import LineItem
+from extractors.fiskal_extractor.transaction import Transaction
+
+
+# The parser creates one of these per line item, so they skip pydantic
+# validation; to_model() validates at the boundary or in strict mode.
+
+
+@dataclass(slots=True)
+class LineItemRecord:
+    """Unvalidated counterpart of LineItem used on the parsing hot path."""
+    article_number: int
+    article_id: int  # id in ARTICLE_NAMES
+    quantity: Decimal
+    category: str
+    category_number: int
+    price_cents: int
+
+    @property
+    def article_name(self) -> str:
+        return ARTICLE_NAMES.name(self.article_id)
+
+    @property
+    def price(self) -> Decimal:
+        return cents_to_decimal(self.price_cents)
+
+    def __reduce__(self):
+        # Ids differ between processes, so send the name across instead
+        return _line_item_record, (
+            self.article_number,
+            self.article_name,
+            self.quantity,
+            self.category,
+            self.category_number,
+            self.price_cents,
+        )
+
+    def to_model(self) -> LineItem:
+        return LineItem(
+            article_number=self.article_number,
+            article_name=self.article_name,
+            quantity=self.quantity,
+            category=self.category,
+            category_number=self.category_number,
+            price=self.price,
+        )
+
+
+@dataclass(slots=True)
+class TransactionRecord:
+    """Unvalidated counterpart of Transaction used on the parsing hot path."""
+    uuid: str
+    date: datetime
+    bill_number: int
+    items: List[LineItemRecord]
+    total_gross_cents: int
+
+    @property
+    def total_gross(self) -> Decimal:
+        return cents_to_decimal(self.total_gross_cents)
+
+    def to_model(self) -> Transaction:
+        return Transaction(
+            uuid=self.uuid,
+            date=self.date,
+            bill_number=self.bill_number,
+            items=[item.to_model() for item in self.items],
+            total_gross=self.total_gross,
+        )
+
+
+def _line_item_record(
+    article_number: int,
+    article_name: str,
+    quantity: Decimal,
+    category: str,
+    category_number: int,
+    price_cents: int,
+) -> LineItemRecord:
+    return LineItemRecord(
+        article_number=article_number,
+        article_id=ARTICLE_NAMES.intern(article_name),
+        quantity=quantity,
+        category=category,
+        category_number=category_number,
+        price_cents=price_cents,
+    )
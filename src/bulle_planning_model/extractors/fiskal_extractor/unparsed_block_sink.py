@@ -0,0 +1,129 @@
+from typing import Dict, List, NamedTuple, Optional, TextIO
+from pathlib import Path
+from loguru import logger
+
+from extractors.fiskal_extractor.unparsed_counts import UnparsedCounts
+
+
+SEPARATOR = "=" * 60
+
+
+class UnparsedBlock(NamedTuple):
+    source_file: str
+    start_line: int
+    end_line: int
+    reason: str
+    lines: List[str]
+
+
+class UnparsedBlockSink:
+    """Writes unparsed Rechnung blocks to a QC file as soon as they fail.
+
+    Every block is flushed right away, so memory stays flat and a crash
+    keeps everything found so far. After max_blocks blocks in the file
+    only the counts per reason are kept. The file ends with a trailer
+    holding the totals; unless resuming, an old file from a previous run
+    is removed up front. When resuming from the counts of a previous run
+    the numbering, the cap and the totals carry on and the old trailer is
+    replaced by the new one.
+    """
+
+    def __init__(
+        self,
+        output_path: Path,
+        max_blocks: Optional[int] = None,
+        previous: Optional[UnparsedCounts] = None,
+    ):
+        self.output_path = output_path
+        self.max_blocks = max_blocks
+        self.previous = previous
+        if previous is None:
+            output_path.unlink(missing_ok=True)
+            previous = UnparsedCounts()
+        self.written = previous.written
+        self.dropped = previous.dropped
+        self.counts: Dict[str, int] = dict(previous.reasons)
+        self._file: Optional[TextIO] = None
+
+    def __enter__(self) -> "UnparsedBlockSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def total(self) -> int:
+        return self.written + self.dropped
+
+    def summary(self) -> UnparsedCounts:
+        return UnparsedCounts(
+            written=self.written, dropped=self.dropped, reasons=dict(self.counts)
+        )
+
+    def write(self, block: UnparsedBlock) -> None:
+        self.counts[block.reason] = self.counts.get(block.reason, 0) + 1
+        f = self._open()
+
+        if self.max_blocks is not None and self.written >= self.max_blocks:
+            if self.dropped == 0:
+                logger.warning(
+                    f"Reached {self.max_blocks} unparsed blocks in {self.output_path}, "
+                    f"only counting the rest"
+                )
+            self.dropped += 1
+            return
+
+        self.written += 1
+        f.write(
+            f"Block {self.written}: {block.source_file} "
+            f"lines {block.start_line}-{block.end_line} ({block.reason})\n"
+        )
+        f.write("-" * 20 + "\n")
+        for line in block.lines:
+            f.write(f"{line}\n")
+        f.write("\n" + SEPARATOR + "\n\n")
+        f.flush()
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+
+        self._file.write(_trailer(self.summary()))
+        self._file.close()
+        self._file = None
+
+        logger.info(f"Saved {self.written} unparsed blocks to {self.output_path}")
+
+    def _open(self) -> TextIO:
+        if self._file is None:
+            self.output_path.parent.mkdir(parents=True, exist_ok=True)
+            is_new = not self.output_path.exists()
+            if not is_new and self.previous is not None:
+                self._cut_trailer(_trailer(self.previous))
+            self._file = open(self.output_path, "a", encoding="utf-8")
+            if is_new:
+                self._file.write("Unparsed Transaction Blocks\n")
+                self._file.write(SEPARATOR + "\n\n")
+        return self._file
+
+    def _cut_trailer(self, trailer: str) -> None:
+        """Remove the trailer of the previous run so only one set of totals remains."""
+        trailer_bytes = trailer.encode("utf-8")
+        with open(self.output_path, "r+b") as f:
+            size = f.seek(0, 2)
+            if size >= len(trailer_bytes):
+                f.seek(size - len(trailer_bytes))
+                if f.read() == trailer_bytes:
+                    f.truncate(size - len(trailer_bytes))
+                    return
+        logger.warning(f"No trailer of the previous run in {self.output_path}, appending")
+
+
+def _trailer(counts: UnparsedCounts) -> str:
+    reasons = ", ".join(
+        f"{reason}: {count}" for reason, count in sorted(counts.reasons.items())
+    )
+    trailer = f"Total: {counts.written + counts.dropped} blocks ({reasons})"
+    if counts.dropped:
+        trailer += f", {counts.dropped} not written"
+    return trailer + "\n\n"
@@ -0,0 +1,9 @@
+from typing import Dict
+from pydantic import BaseModel, Field
+
+
+class UnparsedCounts(BaseModel):
+    """Unparsed blocks found in a journal so far, carried over when resuming."""
+    written: int = Field(0, description="Blocks written to the QC file")
+    dropped: int = Field(0, description="Blocks only counted after the cap was reached")
+    reasons: Dict[str, int] = Field(default_factory=dict, description="Blocks per failure reason")
@@ -0,0 +1,15 @@
+from typing import Optional, Protocol
+from pathlib import Path
+
+
+class AIClient(Protocol):
+    """What MengenlistenExtractor needs from an AI client.
+
+    generate_response returns the JSON text for a PDF, or None when the PDF
+    cannot be extracted, and raises RetryableError when the service was
+    unavailable and the file is worth another try. Clients with a cache
+    may also offer discard_response(file_path), which the extractor calls
+    for answers it could not parse, so they are asked for again.
+    """
+
+    def generate_response(self, file_path: Path) -> Optional[str]: ...
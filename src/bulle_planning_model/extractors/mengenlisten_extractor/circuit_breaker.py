@@ -0,0 +1,69 @@
+from typing import Callable
+import threading
+import time
+from loguru import logger
+
+
+class CircuitBreaker:
+    """Pauses all requests while the AI service keeps failing.
+
+    After failure_threshold transient failures in a row the circuit opens
+    and every caller of wait_until_closed sleeps until cooldown seconds
+    have passed. Then requests go through again; one more failure opens
+    the circuit right away, a success closes it. Clock and sleep can be
+    replaced for tests.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        cooldown: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.sleep = sleep
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self._open_until = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._open_until is not None and self.clock() < self._open_until
+
+    def wait_until_closed(self) -> float:
+        """Sleep while the circuit is open. Returns the seconds waited."""
+        with self._lock:
+            if self._open_until is None:
+                return 0.0
+            wait = self._open_until - self.clock()
+
+        if wait > 0:
+            self.sleep(wait)
+            return wait
+        return 0.0
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.consecutive_failures = 0
+            self._open_until = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.consecutive_failures < self.failure_threshold:
+                return
+            # Threads failing together must not push the reopening further out
+            if self._open_until is not None and self.clock() < self._open_until:
+                return
+
+            self._open_until = self.clock() + self.cooldown
+            self.times_opened += 1
+            logger.warning(
+                f"AI service failed {self.consecutive_failures} times in a row, "
+                f"pausing requests for {self.cooldown:.0f}s"
+            )
@@ -1,14 +1,40 @@
 import os
-from typing import Optional
+import json
+from typing import Dict, List, Optional
 from pathlib import Path
 from google import genai
 from google.genai import types
 from loguru import logger
 from dotenv import load_dotenv
 
+from extractors.mengenlisten_extractor.json_repair import repair_json
+from extractors.mengenlisten_extractor.mengenliste_batch_response import (
+    MengenlisteBatchResponse,
+)
+from extractors.mengenlisten_extractor.mengenliste_response import MengenlisteResponse
+from extractors.mengenlisten_extractor.rate_limiter import TokenBucketRateLimiter
+from extractors.mengenlisten_extractor.response_cache import ResponseCache
+from extractors.mengenlisten_extractor.retry_policy import RetryableError, RetryPolicy
+
 
 class GeminiClient:
-    def __init__(self) -> None:
+    MODEL = "models/gemini-2.5-flash-lite"
+    # Bump whenever the prompt changes so cached responses are not reused
+    PROMPT_VERSION = "2"
+
+    def __init__(
+        self,
+        cache: Optional[ResponseCache] = None,
+        bypass_cache: bool = False,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> None:
+        # bypass_cache always asks the model but still stores the fresh response
+        self.cache = cache
+        self.bypass_cache = bypass_cache
+        # Only requests that reach the model count against the rate limit
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
         load_dotenv()
         try:
             self.client = genai.Client(
@@ -19,36 +45,173 @@ class GeminiClient:
             raise
 
     def generate_response(self, file_path: Path) -> Optional[str]:
+        """Return the cleaned JSON text, or None if the PDF cannot be extracted.
+
+        Raises RetryableError when the service kept failing with transient
+        errors, so the caller can try the file again later.
+        """
         try:
             logger.debug(f"Processing PDF: {file_path}")
 
+            pdf_bytes = file_path.read_bytes()
+            cache_key = self._cache_key(file_path, pdf_bytes)
+            cached = self._cached(cache_key)
+            if cached is not None:
+                logger.debug(f"Using cached response for PDF: {file_path}")
+                return cached
+
             prompt = self._create_prompt(file_path.name)
 
-            response = self.client.models.generate_content(
-                model="models/gemini-2.5-flash-lite",
-                contents=[
-                    types.Part.from_bytes(
-                        data=file_path.read_bytes(), mime_type="application/pdf"
-                    ),
-                    prompt,
-                ],
+            response = self.retry_policy.call(
+                lambda: self._generate_content(
+                    [types.Part.from_bytes(data=pdf_bytes, mime_type="application/pdf"), prompt],
+                    MengenlisteResponse,
+                ),
+                file_path.name,
             )
 
             if response.text:
                 logger.debug(f"Successfully processed PDF: {file_path}")
-                return self._clean_json_response(response.text)
+                # The schema makes the answer plain JSON, the extractor repairs the rest
+                response_text = response.text.strip()
+                if cache_key:
+                    self.cache.put(cache_key, response_text, file_path)
+                return response_text
             else:
                 logger.warning(f"API returned empty response for {file_path}")
                 return None
 
+        except RetryableError:
+            raise
         except Exception as e:
             logger.error(
                 f"Failed to process PDF {file_path} with the following Exception: {e}"
             )
             return None
 
+    def generate_batch_response(self, file_paths: List[Path]) -> Dict[str, Optional[str]]:
+        """Extract several PDFs with one request, keyed by file name.
+
+        Each answer has the same shape as generate_response's. Files the
+        model left out, or the whole batch if its answer is unusable, map to
+        None so the caller can retry them one by one. Cached files are not
+        sent again. Raises RetryableError like generate_response.
+        """
+        results: Dict[str, Optional[str]] = {}
+        contents = []
+        cache_keys = {}
+        try:
+            for file_path in file_paths:
+                pdf_bytes = file_path.read_bytes()
+                cache_keys[file_path.name] = self._cache_key(file_path, pdf_bytes)
+                cached = self._cached(cache_keys[file_path.name])
+                if cached is not None:
+                    logger.debug(f"Using cached response for PDF: {file_path}")
+                    results[file_path.name] = cached
+                    continue
+                # Naming every PDF lets the model tag its reports with the right file
+                contents.append(f"File: {file_path.name}")
+                contents.append(types.Part.from_bytes(data=pdf_bytes, mime_type="application/pdf"))
+
+            requested = [path for path in file_paths if path.name not in results]
+            if not requested:
+                return results
+            results.update({path.name: None for path in requested})
+
+            logger.debug(f"Processing {len(requested)} PDFs in one request")
+            contents.append(self._create_batch_prompt([path.name for path in requested]))
+            response = self.retry_policy.call(
+                lambda: self._generate_content(contents, MengenlisteBatchResponse),
+                f"batch of {len(requested)} PDFs",
+            )
+            if not response.text:
+                logger.warning(f"API returned empty response for batch of {len(requested)} PDFs")
+                return results
+
+            reports = self._split_batch_response(response.text)
+        except RetryableError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to process batch of {len(file_paths)} PDFs: {e}")
+            return results
+
+        by_name = {path.name: path for path in requested}
+        for file_name, response_text in reports.items():
+            if file_name not in by_name:
+                logger.warning(f"Batch answer contains a report for unknown file {file_name}")
+                continue
+            results[file_name] = response_text
+            if cache_keys[file_name]:
+                self.cache.put(cache_keys[file_name], response_text, by_name[file_name])
+        return results
+
+    def discard_response(self, file_path: Path) -> None:
+        """Drop the cached answer for a PDF, e.g. one the extractor could not parse."""
+        cache_key = self._cache_key(file_path, file_path.read_bytes())
+        if cache_key:
+            self.cache.delete(cache_key)
+
+    def _split_batch_response(self, response_text: str) -> Dict[str, str]:
+        try:
+            data = json.loads(response_text)
+        except json.JSONDecodeError:
+            data = json.loads(repair_json(response_text))
+
+        reports = {}
+        for report in data.get("reports", []):
+            file_name = report.pop("file_name", None)
+            # Incomplete reports are left out, so they are neither cached nor used
+            if not file_name or "report_date" not in report or "articles" not in report:
+                logger.warning(f"Ignoring incomplete report for {file_name} in batch answer")
+                continue
+            reports[file_name] = json.dumps(report, ensure_ascii=False)
+        return reports
+
+    def _cache_key(self, file_path: Path, pdf_bytes: bytes) -> Optional[str]:
+        if not self.cache:
+            return None
+        return ResponseCache.key(pdf_bytes, self.PROMPT_VERSION, self.MODEL, file_path.name)
+
+    def _cached(self, cache_key: Optional[str]) -> Optional[str]:
+        if not cache_key or self.bypass_cache:
+            return None
+        return self.cache.get(cache_key)
+
+    def _generate_content(self, contents: list, response_schema):
+        # Every attempt, retries included, counts against the rate limit
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        return self.client.models.generate_content(
+            model=self.MODEL,
+            contents=contents,
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=response_schema,
+            ),
+        )
+
     def _create_prompt(self, file_path: str) -> str:
-        template = """
+        file_section = f"""
+        <file name>
+        The file name for the current file is {file_path}
+        <file name>
+        """
+        return self._create_instructions() + file_section
+
+    def _create_batch_prompt(self, file_names: List[str]) -> str:
+        batch_section = f"""
+        <batch>
+        This request contains {len(file_names)} PDFs, each preceded by its file name:
+        {", ".join(file_names)}
+        Extract every PDF on its own, apply the date logic with its own file name and
+        return {{"reports": [...]}} with one object per PDF in the output format above,
+        each with an additional "file_name" field set to the PDF's file name.
+        </batch>
+        """
+        return self._create_instructions() + batch_section
+
+    def _create_instructions(self) -> str:
+        return """
         <task>
         Extract data from this German bakery shift report (Mengenliste) PDF and return it as JSON only.
         </task>
@@ -63,7 +226,7 @@ class GeminiClient:
         - Mengenliste: Extract product names exactly as written
         - Aktuelle Menge: Always extract, if required format into full integers
         - Retoure: Only extract ONE clear integers (ignore -, 0, O, ✓, symbols or anything that's not a clear integer)
-        - Ausverkauft/Notizen: Only extract times in HH:MM or HHMM format, ignore other text
+        - Ausverkauft/Notizen: Only extract times, written as HH:MM, ignore other text
         - Skip unclear/illegible entries rather than guessing
         - Do not extract anything from the Footer
         - Follow the output format rigorously
@@ -77,20 +240,19 @@ class GeminiClient:
         </date_logic>
 
         <output_format>
-        {{
-          "YYYY-MM-DD": {{
-            "production_day": "day mentioned for Backtag",
-            "sales_day": "day mentioned for 'Für Tag' - right after 'Backtag'", 
-            "articles": [
-              {{
-                "article_name": "Article Name",
-                "stock": "Aktuelle Menge",
-                "leftover": "Retoure",
-                "sold_out": "Ausverkauft/Notizen"
-              }}
-            ]
-          }}
-        }}
+        {
+          "report_date": "YYYY-MM-DD business date",
+          "production_day": "day mentioned for Backtag",
+          "sales_day": "day mentioned for 'Für Tag' - right after 'Backtag'",
+          "articles": [
+            {
+              "article_name": "Article Name",
+              "stock": Aktuelle Menge as number,
+              "leftover": Retoure as number,
+              "sold_out": "HH:MM from Ausverkauft/Notizen"
+            }
+          ]
+        }
         </output_format>
 
         <quality_guidelines>
@@ -108,17 +270,4 @@ class GeminiClient:
         Saturday: 07:00 until 13:00
         Sunday: 07:00 until 11:00
         </opening hours>
-
-        <file name>
-        The file name for the current file is {file_path}
-        <file name>
         """
-        return template.format(file_path=file_path)
-
-    def _clean_json_response(self, response_text: str) -> str:
-        clean_text = response_text.strip()
-        if clean_text.startswith("```json"):
-            clean_text = clean_text[7:]
-        if clean_text.endswith("```"):
-            clean_text = clean_text[:-3]
-        return clean_text.strip()
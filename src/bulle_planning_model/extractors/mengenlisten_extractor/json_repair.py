@@ -0,0 +1,63 @@
+from typing import Any
+import re
+
+
+FENCE_PATTERN = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+TRAILING_COMMA_PATTERN = re.compile(r",(\s*[}\]])")
+BARE_DASH_PATTERN = re.compile(r"(:\s*)[-–—]+(\s*[,}\]])")
+PYTHON_NONE_PATTERN = re.compile(r"(:\s*)None(\s*[,}\]])")
+TIME_PATTERN = re.compile(r"^(\d{1,2})\s*[:.,]?\s*(\d{2})(?:\s*(?:Uhr|h))?$")
+
+# What the handwritten columns hold when there is nothing to extract
+NULL_MARKERS = {"", "-", "–", "—", "--", "o", "✓", "x", "null", "none", "n/a"}
+
+
+def repair_json(text: str) -> str:
+    """Fix the near-valid JSON models produce: code fences, chatter around
+    the object, trailing commas, bare dashes and Python's None as values.
+    """
+    text = FENCE_PATTERN.sub("", text)
+
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        text = text[start : end + 1]
+
+    text = TRAILING_COMMA_PATTERN.sub(r"\1", text)
+    text = BARE_DASH_PATTERN.sub(r"\1null\2", text)
+    return PYTHON_NONE_PATTERN.sub(r"\1null\2", text)
+
+
+def normalize_quantity(value: Any) -> Any:
+    """Map placeholders like "-" to None and "1,0" to 1.0; anything else is left to validation."""
+    if not isinstance(value, str):
+        return value
+
+    text = value.strip()
+    if text.lower() in NULL_MARKERS:
+        return None
+    try:
+        return float(text.replace(",", "."))
+    except ValueError:
+        return value
+
+
+def normalize_time(value: Any) -> Any:
+    """Return sold-out times as HH:MM ("1430", "14.30", "9:45 Uhr") and
+    placeholders as None; notes that are no time ("ausverkauft", "25:00")
+    are kept as written.
+    """
+    if value is None:
+        return None
+
+    text = str(value).strip()
+    if text.lower() in NULL_MARKERS:
+        return None
+
+    match = TIME_PATTERN.match(text)
+    if not match:
+        return value
+
+    hours, minutes = int(match.group(1)), int(match.group(2))
+    if hours > 23 or minutes > 59:
+        return value
+    return f"{hours:02d}:{minutes:02d}"
@@ -0,0 +1,9 @@
+from pydantic import Field
+
+from extractors.mengenlisten_extractor.mengenliste_response import MengenlisteResponse
+
+
+class MengenlisteBatchItem(MengenlisteResponse):
+    """One shift report inside a batched answer, tagged with its PDF."""
+
+    file_name: str = Field(..., description="Name of the PDF this report was read from")
@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+from extractors.mengenlisten_extractor.mengenliste_batch_item import MengenlisteBatchItem
+
+
+class MengenlisteBatchResponse(BaseModel):
+    """The JSON schema the AI service has to answer with for several shift reports."""
+
+    reports: List[MengenlisteBatchItem] = Field(
+        ..., description="One report per PDF in the request"
+    )
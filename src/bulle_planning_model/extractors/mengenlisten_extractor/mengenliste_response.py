@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+from extractors.mengenlisten_extractor.mengenliste_entry import MengenlisteEntry
+
+
+class MengenlisteResponse(BaseModel):
+    """The JSON schema the AI service has to answer with for one shift report."""
+
+    report_date: str = Field(..., description="Business date of the report as YYYY-MM-DD")
+    production_day: str = Field(..., description="Day mentioned for Backtag")
+    sales_day: str = Field(
+        ..., description="Day mentioned for 'Für Tag', right after 'Backtag'"
+    )
+    articles: List[MengenlisteEntry] = Field(
+        ..., description="Rows of the main table, in document order"
+    )
@@ -1,5 +1,7 @@
 import json
-from typing import Optional, List
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Generator, Iterable, Optional, List, Tuple
 from pathlib import Path
 from datetime import datetime
 from loguru import logger
@@ -7,41 +9,174 @@ from loguru import logger
 from extractors.mengenlisten_extractor.mengenliste import Mengenliste
 from extractors.mengenlisten_extractor.metadata import MengenlisteMetadata
 from extractors.mengenlisten_extractor.mengenliste_entry import MengenlisteEntry
+from extractors.extraction_result import ExtractionResult
+from extractors.mengenlisten_extractor.ai_client import AIClient
 from extractors.mengenlisten_extractor.gemini_client import GeminiClient
+from extractors.mengenlisten_extractor.json_repair import (
+    normalize_quantity,
+    normalize_time,
+    repair_json,
+)
+from extractors.mengenlisten_extractor.retry_policy import RetryableError
 
 
 class MengenlistenExtractor:
-    def __init__(self):
-        self.ai_client = GeminiClient()
+    # Bump whenever the prompt or JSON extract changes so the manifest re-extracts
+    VERSION = "2"
+
+    def __init__(self, ai_client: Optional[AIClient] = None):
+        # ReplayClient runs the pipeline offline from recorded responses
+        self.ai_client = ai_client or GeminiClient()
         self.metadata: Optional[MengenlisteMetadata] = None
         self.unparsed_blocks: List[str] = []
 
-    def read_file(self, file_path: Path) -> Optional[Mengenliste]:
+    def extract(self, file_path: Path) -> ExtractionResult[Mengenliste]:
+        """Extract one PDF without touching the extractor's state.
+
+        A failed extraction carries its errors and the file as unparsed
+        item; retryable is set when the AI service was unavailable.
+        """
         logger.info(f"Starting extraction from {file_path}")
 
-        json_response = self.ai_client.generate_response(file_path)
+        try:
+            json_response = self.ai_client.generate_response(file_path)
+        except RetryableError as e:
+            logger.error(f"AI service unavailable for {file_path}: {e}")
+            return _failed(file_path, f"AI service unavailable: {e}", retryable=True)
 
         if not json_response:
             logger.error(f"Failed to get response from AI client for {file_path}")
-            self.unparsed_blocks.append(str(file_path))
-            self.metadata = MengenlisteMetadata(
-                source_file=str(file_path), errors=["Failed to get AI response"]
+            return _failed(file_path, "Failed to get AI response")
+
+        return self._result_from_response(file_path, json_response)
+
+    def read_file(self, file_path: Path) -> Optional[Mengenliste]:
+        return self._keep(self.extract(file_path))
+
+    def extract_files(
+        self,
+        file_paths: Iterable[Path],
+        max_workers: int = 4,
+        max_requeues: int = 2,
+        batch_size: int = 1,
+    ) -> Generator[ExtractionResult[Mengenliste], None, None]:
+        """Extract several PDFs concurrently and yield each result as soon as it is done.
+
+        At most max_workers requests are in flight at once; the client's
+        rate limiter, if set, spaces them out. With batch_size above 1 and a
+        client that has generate_batch_response, that many PDFs share one
+        request; files missing from a batch answer or failing to parse are
+        retried one by one. A file whose retries ran out on transient errors
+        goes to the back of the queue on its own, up to max_requeues times,
+        before its failed result is yielded. Results arrive in completion
+        order.
+        """
+        file_paths = list(file_paths)
+        if batch_size > 1 and not hasattr(self.ai_client, "generate_batch_response"):
+            logger.warning("AI client cannot batch requests, sending one PDF per request")
+            batch_size = 1
+
+        requeues: Counter = Counter()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending: Dict[Future, List[Path]] = {}
+
+            def submit(paths: List[Path]) -> None:
+                task = self._extract_batch if len(paths) > 1 else self._extract_single
+                pending[executor.submit(task, paths)] = paths
+
+            for start in range(0, len(file_paths), batch_size):
+                submit(file_paths[start : start + batch_size])
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    paths = pending.pop(future)
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to extract {paths}: {e}")
+                        results = [_failed(path, f"Failed to extract: {e}") for path in paths]
+
+                    for result in results:
+                        file_path = result.source_file
+                        if result.retryable and requeues[file_path] < max_requeues:
+                            requeues[file_path] += 1
+                            logger.warning(f"Re-queueing {file_path}")
+                            submit([file_path])
+                            continue
+                        yield result
+
+    def read_files(
+        self,
+        file_paths: Iterable[Path],
+        max_workers: int = 4,
+        max_requeues: int = 2,
+        batch_size: int = 1,
+    ) -> Generator[Tuple[Path, Optional[Mengenliste]], None, None]:
+        """Like extract_files, but yields (file, Mengenliste or None) pairs.
+
+        metadata always belongs to the file yielded last and failed files
+        are collected in unparsed_blocks.
+        """
+        for result in self.extract_files(file_paths, max_workers, max_requeues, batch_size):
+            yield result.source_file, self._keep(result)
+
+    def _keep(self, result: ExtractionResult[Mengenliste]) -> Optional[Mengenliste]:
+        self.metadata = result.metadata
+        self.unparsed_blocks.extend(result.unparsed)
+        return result.records[0] if result.records else None
+
+    def _extract_single(self, paths: List[Path]) -> List[ExtractionResult[Mengenliste]]:
+        return [self.extract(paths[0])]
+
+    def _extract_batch(self, paths: List[Path]) -> List[ExtractionResult[Mengenliste]]:
+        logger.info(f"Starting batched extraction of {len(paths)} files")
+
+        try:
+            responses = self.ai_client.generate_batch_response(paths)
+        except RetryableError as e:
+            logger.error(f"AI service unavailable for batch of {len(paths)} files: {e}")
+            return [
+                _failed(path, f"AI service unavailable: {e}", retryable=True)
+                for path in paths
+            ]
+
+        results = []
+        retry_paths = []
+        for file_path in paths:
+            json_response = responses.get(file_path.name)
+            if json_response:
+                result = self._result_from_response(file_path, json_response)
+                if result.ok:
+                    results.append(result)
+                    continue
+            retry_paths.append(file_path)
+
+        if retry_paths:
+            logger.warning(
+                f"{len(retry_paths)} of {len(paths)} files failed in the batch, retrying them alone"
             )
-            return None
+        results.extend(self.extract(file_path) for file_path in retry_paths)
+        return results
 
+    def _result_from_response(
+        self, file_path: Path, json_response: str
+    ) -> ExtractionResult[Mengenliste]:
         try:
             mengenliste = self._parse_json_response(json_response)
-            self.metadata = MengenlisteMetadata(source_file=str(file_path))
-            logger.info(f"Successfully extracted data from {file_path}")
-            return mengenliste
-
         except Exception as e:
             logger.error(f"Failed to parse AI response for {file_path}: {e}")
-            self.unparsed_blocks.append(str(file_path))
-            self.metadata = MengenlisteMetadata(
-                source_file=str(file_path), errors=[f"Failed to parse AI response: {e}"]
-            )
-            return None
+            # A cached answer would fail the same way on every retry and rerun
+            if hasattr(self.ai_client, "discard_response"):
+                self.ai_client.discard_response(file_path)
+            return _failed(file_path, f"Failed to parse AI response: {e}")
+
+        logger.info(f"Successfully extracted data from {file_path}")
+        return ExtractionResult(
+            source_file=file_path,
+            records=[mengenliste],
+            metadata=MengenlisteMetadata(source_file=str(file_path)),
+        )
 
     def convert_to_json(self, mengenliste: Mengenliste, output_path: Path) -> None:
         json_data = {
@@ -87,13 +222,23 @@ class MengenlistenExtractor:
     def _parse_json_response(self, json_string: str) -> Mengenliste:
         try:
             raw_data = json.loads(json_string)
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON from AI response: {e}")
-            logger.debug(f"Raw JSON: {json_string}")
-            raise ValueError(f"Invalid JSON from AI: {e}")
+        except json.JSONDecodeError:
+            # Near-valid JSON is cheaper to repair than to request again
+            try:
+                raw_data = json.loads(repair_json(json_string))
+            except json.JSONDecodeError as e:
+                logger.error(f"Invalid JSON from AI response: {e}")
+                logger.debug(f"Raw JSON: {json_string}")
+                raise ValueError(f"Invalid JSON from AI: {e}")
+            logger.info("Repaired invalid JSON from AI response")
 
-        date_key = list(raw_data.keys())[0]
-        data = raw_data[date_key]
+        if "report_date" in raw_data:
+            date_key = raw_data["report_date"]
+            data = raw_data
+        else:
+            # Responses from before the schema are keyed by date
+            date_key = list(raw_data.keys())[0]
+            data = raw_data[date_key]
 
         date_obj = datetime.strptime(date_key, "%Y-%m-%d").date()
 
@@ -103,9 +248,9 @@ class MengenlistenExtractor:
             try:
                 article = MengenlisteEntry(
                     article_name=article_data["article_name"],
-                    stock=article_data.get("stock"),
-                    leftover=article_data.get("leftover"),
-                    sold_out=article_data.get("sold_out"),
+                    stock=normalize_quantity(article_data.get("stock")),
+                    leftover=normalize_quantity(article_data.get("leftover")),
+                    sold_out=normalize_time(article_data.get("sold_out")),
                 )
                 articles.append(article)
             except Exception as e:
@@ -122,3 +267,15 @@ class MengenlistenExtractor:
             sales_day=data["sales_day"],
             articles=articles,
         )
+
+
+def _failed(
+    file_path: Path, error: str, retryable: bool = False
+) -> ExtractionResult[Mengenliste]:
+    return ExtractionResult(
+        source_file=file_path,
+        metadata=MengenlisteMetadata(source_file=str(file_path), errors=[error]),
+        errors=[error],
+        unparsed=[str(file_path)],
+        retryable=retryable,
+    )
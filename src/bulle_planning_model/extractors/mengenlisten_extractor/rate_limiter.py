@@ -0,0 +1,47 @@
+from typing import Callable
+import threading
+import time
+
+
+class TokenBucketRateLimiter:
+    """Keeps AI requests within a requests-per-minute budget across threads.
+
+    The bucket holds up to burst tokens and refills at requests_per_minute.
+    Every acquire takes one token; when the bucket is empty the caller
+    reserves the next token and sleeps until it is due, so waiting threads
+    are served in the order they arrived. Clock and sleep can be replaced
+    for tests.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+
+        self.rate = requests_per_minute / 60
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until one is available. Returns the seconds waited."""
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            self.sleep(wait)
+        return wait
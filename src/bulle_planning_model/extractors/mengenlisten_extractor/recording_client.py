@@ -0,0 +1,64 @@
+from typing import Dict, List, Optional
+from pathlib import Path
+import json
+import os
+import threading
+from loguru import logger
+
+from extractors.mengenlisten_extractor.ai_client import AIClient
+
+
+def recording_path(recordings_dir: Path, file_path: Path) -> Path:
+    return recordings_dir / f"{file_path.name}.json"
+
+
+class RecordingClient:
+    """Passes requests on to a real client and saves every response it gets.
+
+    Each response ends up as <PDF name>.json in recordings_dir, where
+    ReplayClient picks it up to run the pipeline without the AI service.
+    Batch requests and discard_response are passed on as well; a client
+    without batch support is asked file by file.
+    """
+
+    def __init__(self, client: AIClient, recordings_dir: Path):
+        self.client = client
+        self.recordings_dir = recordings_dir
+
+    def generate_response(self, file_path: Path) -> Optional[str]:
+        response = self.client.generate_response(file_path)
+        if response is not None:
+            self._record(file_path, response)
+        return response
+
+    def generate_batch_response(self, file_paths: List[Path]) -> Dict[str, Optional[str]]:
+        if not hasattr(self.client, "generate_batch_response"):
+            return {
+                file_path.name: self.generate_response(file_path) for file_path in file_paths
+            }
+
+        responses = self.client.generate_batch_response(file_paths)
+        for file_path in file_paths:
+            response = responses.get(file_path.name)
+            if response is not None:
+                self._record(file_path, response)
+        return responses
+
+    def discard_response(self, file_path: Path) -> None:
+        if hasattr(self.client, "discard_response"):
+            self.client.discard_response(file_path)
+
+    def _record(self, file_path: Path, response: str) -> None:
+        self.recordings_dir.mkdir(parents=True, exist_ok=True)
+        path = recording_path(self.recordings_dir, file_path)
+        temp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"source_file": file_path.name, "response": response},
+                f,
+                indent=2,
+                ensure_ascii=False,
+            )
+        os.replace(temp_path, path)
+
+        logger.debug(f"Recorded response for {file_path} to {path}")
@@ -0,0 +1,152 @@
+from typing import Callable, Dict, List, Optional
+from pathlib import Path
+import json
+import random
+import threading
+import time
+from loguru import logger
+
+from extractors.mengenlisten_extractor.rate_limiter import TokenBucketRateLimiter
+from extractors.mengenlisten_extractor.recording_client import recording_path
+from extractors.mengenlisten_extractor.response_cache import ResponseCache
+from extractors.mengenlisten_extractor.retry_policy import RetryableError, RetryPolicy
+
+
+class ServiceUnavailableError(Exception):
+    """The transient error a ReplayClient injects, shaped like a genai API error."""
+
+    def __init__(self, code: int = 503):
+        super().__init__(f"{code} UNAVAILABLE (injected)")
+        self.code = code
+
+
+class ReplayClient:
+    """Answers like GeminiClient from recorded responses, without the AI service.
+
+    Responses come from responses (by PDF name) or from the files a
+    RecordingClient wrote to recordings_dir. Every request takes latency
+    seconds plus up to jitter seconds, batched or not. With error_rate a
+    file fails like an unextractable PDF (None), with transient_error_rate
+    a request raises a 503 that goes through the retry policy, exactly as
+    with the real client.
+    Cache, rate limiter and retry policy behave as in GeminiClient; by
+    default every transient error surfaces as RetryableError right away.
+    """
+
+    MODEL = "replay"
+
+    def __init__(
+        self,
+        recordings_dir: Optional[Path] = None,
+        responses: Optional[Dict[str, str]] = None,
+        cache: Optional[ResponseCache] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        transient_error_rate: float = 0.0,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        seed: int = 0,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.recordings_dir = recordings_dir
+        self.responses: Dict[str, str] = dict(responses or {})
+        self.cache = cache
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.transient_error_rate = transient_error_rate
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=1)
+        self.sleep = sleep
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate_response(self, file_path: Path) -> Optional[str]:
+        return self.generate_batch_response([file_path]).get(file_path.name)
+
+    def generate_batch_response(self, file_paths: List[Path]) -> Dict[str, Optional[str]]:
+        """Answer several PDFs with one request; error_rate drops files from the answer."""
+        results: Dict[str, Optional[str]] = {}
+        requested: Dict[str, str] = {}
+        cache_keys: Dict[str, str] = {}
+        for file_path in file_paths:
+            recorded = self._recorded_response(file_path)
+            if recorded is None:
+                logger.warning(f"No recorded response for {file_path}")
+                results[file_path.name] = None
+                continue
+
+            if self.cache:
+                cache_keys[file_path.name] = self._cache_key(file_path)
+                cached = self.cache.get(cache_keys[file_path.name])
+                if cached is not None:
+                    results[file_path.name] = cached
+                    continue
+            requested[file_path.name] = recorded
+
+        if not requested:
+            return results
+        results.update({file_name: None for file_name in requested})
+
+        description = (
+            next(iter(requested)) if len(requested) == 1 else f"batch of {len(requested)} PDFs"
+        )
+        try:
+            answers = self.retry_policy.call(lambda: self._respond(requested), description)
+        except RetryableError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to process {description} with the following Exception: {e}")
+            return results
+
+        by_name = {file_path.name: file_path for file_path in file_paths}
+        for file_name, response in answers.items():
+            results[file_name] = response
+            if self.cache:
+                self.cache.put(cache_keys[file_name], response, by_name[file_name])
+        return results
+
+    def discard_response(self, file_path: Path) -> None:
+        if self.cache:
+            self.cache.delete(self._cache_key(file_path))
+
+    def _cache_key(self, file_path: Path) -> str:
+        return ResponseCache.key(file_path.read_bytes(), self.MODEL, self.MODEL, file_path.name)
+
+    def _respond(self, requested: Dict[str, str]) -> Dict[str, str]:
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._random.random() * self.jitter
+            transient = self._random.random() < self.transient_error_rate
+            failed = {
+                file_name
+                for file_name in requested
+                if self._random.random() < self.error_rate
+            }
+
+        if delay:
+            self.sleep(delay)
+        if transient:
+            raise ServiceUnavailableError()
+        return {
+            file_name: response
+            for file_name, response in requested.items()
+            if file_name not in failed
+        }
+
+    def _recorded_response(self, file_path: Path) -> Optional[str]:
+        if file_path.name in self.responses:
+            return self.responses[file_path.name]
+        if self.recordings_dir is None:
+            return None
+
+        path = recording_path(self.recordings_dir, file_path)
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)["response"]
@@ -0,0 +1,93 @@
+from typing import Optional
+from pathlib import Path
+import hashlib
+import json
+import os
+import threading
+from loguru import logger
+
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class ResponseCache:
+    """Keeps AI responses on disk, addressed by everything that shapes them.
+
+    The key is the SHA-256 of the PDF bytes, the prompt version, the model
+    id and the file name (the prompt tells the model the file name for its
+    date logic). Each response is one JSON file in cache_dir. A hit
+    refreshes the file's mtime; once the cache grows past max_bytes the
+    least recently used files are removed.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(pdf_bytes: bytes, prompt_version: str, model: str, file_name: str) -> str:
+        sha256 = hashlib.sha256(pdf_bytes)
+        for part in (prompt_version, model, file_name):
+            sha256.update(b"\0" + part.encode("utf-8"))
+        return sha256.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                response = json.load(f)["response"]
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable cached response {path}: {e}")
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return response
+
+    def put(self, key: str, response: str, source_file: Optional[Path] = None) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        temp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"source_file": str(source_file) if source_file else None, "response": response},
+                f,
+                ensure_ascii=False,
+            )
+        # Readers never see a half written response
+        os.replace(temp_path, path)
+        self.evict()
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def evict(self) -> None:
+        with self._lock:
+            entries = []
+            for path in self.cache_dir.glob("*.json"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                logger.debug(f"Evicted cached response {path.name}")
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
@@ -0,0 +1,92 @@
+from typing import Callable, Optional, TypeVar
+import random
+import time
+from loguru import logger
+
+from extractors.mengenlisten_extractor.circuit_breaker import CircuitBreaker
+
+
+# Rate limits, timeouts and server errors pass; bad requests, auth and quota setup do not
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+T = TypeVar("T")
+
+
+class RetryableError(Exception):
+    """Every attempt failed with a transient error; the request is worth another try later."""
+
+
+def is_transient(error: Exception) -> bool:
+    # genai API errors carry the HTTP status as code
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return code in TRANSIENT_STATUS_CODES
+    return isinstance(error, (TimeoutError, ConnectionError)) or _is_transport_error(error)
+
+
+def _is_transport_error(error: Exception) -> bool:
+    # httpx only comes with google-genai, so its TransportError is matched by name
+    return any(
+        cls.__name__ == "TransportError" and cls.__module__.split(".")[0] == "httpx"
+        for cls in type(error).__mro__
+    )
+
+
+class RetryPolicy:
+    """Retries transient errors with exponential backoff and full jitter.
+
+    Attempt n waits a random time up to base_delay * 2**n, capped at
+    max_delay. Permanent errors are raised at once; after max_attempts
+    transient failures the last one is raised as RetryableError. With a
+    circuit breaker every attempt first waits while the circuit is open
+    and reports its outcome back.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 2.0,
+        max_delay: float = 60.0,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        random_fraction: Callable[[], float] = random.random,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.circuit_breaker = circuit_breaker
+        self.sleep = sleep
+        self.random_fraction = random_fraction
+
+    def call(self, func: Callable[[], T], description: str = "request") -> T:
+        for attempt in range(self.max_attempts):
+            if self.circuit_breaker:
+                self.circuit_breaker.wait_until_closed()
+
+            try:
+                result = func()
+            except Exception as e:
+                if not is_transient(e):
+                    raise
+                if self.circuit_breaker:
+                    self.circuit_breaker.record_failure()
+                if attempt == self.max_attempts - 1:
+                    raise RetryableError(
+                        f"{description} failed {self.max_attempts} times, last error: {e}"
+                    ) from e
+
+                delay = self.random_fraction() * min(
+                    self.max_delay, self.base_delay * 2**attempt
+                )
+                logger.warning(
+                    f"Transient error for {description} "
+                    f"(attempt {attempt + 1}/{self.max_attempts}), retrying in {delay:.1f}s: {e}"
+                )
+                self.sleep(delay)
+                continue
+
+            if self.circuit_breaker:
+                self.circuit_breaker.record_success()
+            return result
+
+        raise ValueError("max_attempts must be at least 1")
@@ -0,0 +1,48 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+
+# Amounts are carried as integer cents internally, so sums stay exact and
+# cheap; Decimal euros only appear when reading or writing extracts.
+CENTS_PER_EURO = 100
+
+
+def parse_cents(amount: str) -> int:
+    """Cents for an amount written as euros, e.g. "2,45", "-0.50" or "1.234,56".
+
+    Raises ValueError for anything that is not a whole number of cents.
+    """
+    # Registers always print two decimals, so dropping the separator is enough
+    if len(amount) > 3 and amount[-3] in ",." and amount[-2:].isdigit():
+        # The other separator can only group thousands
+        thousands = "." if amount[-3] == "," else ","
+        euros = amount[:-3].replace(thousands, "")
+        if euros.lstrip("-").isdigit():
+            return int(euros + amount[-2:])
+    try:
+        euros = Decimal(amount.replace(",", "."))
+    except InvalidOperation:
+        raise ValueError(f"Amount {amount!r} is not a number") from None
+    return to_cents(euros)
+
+
+def to_cents(euros: Decimal) -> int:
+    cents = euros.scaleb(2)
+    if cents != cents.to_integral_value():
+        raise ValueError(f"Amount {euros} is not a whole number of cents")
+    return int(cents)
+
+
+def round_cents(euros: Decimal) -> int:
+    """Cents for amounts that may carry fractions, e.g. price times a fractional quantity."""
+    return int(euros.scaleb(2).to_integral_value(ROUND_HALF_UP))
+
+
+def multiply_cents(cents: int, quantity: Decimal) -> int:
+    """Line total in cents, rounded half up when the quantity is fractional."""
+    if quantity == quantity.to_integral_value():
+        return cents * int(quantity)
+    return int((cents * quantity).to_integral_value(ROUND_HALF_UP))
+
+
+def cents_to_decimal(cents: int) -> Decimal:
+    return Decimal(cents).scaleb(-2)
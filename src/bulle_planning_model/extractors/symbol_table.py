@@ -0,0 +1,45 @@
+from typing import Dict, List, Optional
+import threading
+
+
+class SymbolTable:
+    """Maps names to small integer ids, so each distinct name is stored once.
+
+    Ids are only meaningful within one process; records carrying ids
+    pickle their names instead and are re-interned when unpickled.
+    Interning is thread-safe: lookups of known names take no lock, new
+    names are added under one.
+    """
+
+    def __init__(self):
+        self.names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def intern(self, name: str) -> int:
+        symbol_id = self._ids.get(name)
+        if symbol_id is not None:
+            return symbol_id
+
+        with self._lock:
+            # Another thread may have added the name since the lookup above
+            symbol_id = self._ids.get(name)
+            if symbol_id is None:
+                symbol_id = len(self.names)
+                # The name goes in first, so an id is never seen without it
+                self.names.append(name)
+                self._ids[name] = symbol_id
+        return symbol_id
+
+    def get(self, name: str) -> Optional[int]:
+        return self._ids.get(name)
+
+    def name(self, symbol_id: int) -> str:
+        return self.names[symbol_id]
+
+
+# Shared by all extractors and the unifier
+ARTICLE_NAMES = SymbolTable()
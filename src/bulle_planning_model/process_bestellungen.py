@@ -1,48 +1,118 @@
 from pathlib import Path
-from collections import defaultdict
+from typing import Optional
+import argparse
 from extractors.bestellungs_extractor.bestellungs_extractor import BestellungsExtractor
+from extractors.bestellungs_extractor.order_watermark import OrderWatermark
+from extractors.extraction_manifest.extraction_manifest import ExtractionManifest
+from extractors.encoding_detector.encoding_detector import EncodingDetector
 
 
-def process_bestellungen():
+def get_watermark(manifest: ExtractionManifest, csv_file: Path) -> Optional[OrderWatermark]:
+    """Return the watermark of the last extracted export, if its monthly files are still there"""
+    # Every export covers the full history, so a newer export picks up where the last one left off
+    entries = [
+        entry
+        for entry in manifest.entries.values()
+        if Path(entry.source_file).parent == csv_file.parent and "watermark" in entry.state
+    ]
+    if not entries:
+        return None
+    entry = max(entries, key=lambda entry: entry.processed_at)
+    if entry.extractor_version != BestellungsExtractor.VERSION:
+        return None
+    if not all(Path(output).exists() for output in entry.outputs):
+        return None
+    return OrderWatermark(**entry.state["watermark"])
+
+
+def process_bestellungen(force: bool = False, in_memory: bool = False, columnar: bool = False):
     """Process bestellungen CSV file and create monthly JSON extracts"""
     
     # Path to the CSV file (hardcoded for simplicity)
     csv_file = Path("../../data/raw/Bestellungen/bulle_2023_04_01-2025_09_02_birke+bistro.csv")
     output_dir = Path("../../data/processed/Bestellungen/")
+    qc_dir = Path("../../data/processed/qc/")
+    manifest = ExtractionManifest(Path("../../data/processed/extraction_manifest.json"))
+    encoding_cache_path = Path("../../data/processed/encoding_cache.json")
     
     # Create output directory
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    extractor = BestellungsExtractor()
+    if not force and manifest.is_up_to_date(csv_file, BestellungsExtractor.VERSION):
+        print(f"{csv_file.name} is unchanged since the last run, nothing to do")
+        return
+    
+    encoding_detector = EncodingDetector.from_cache(encoding_cache_path)
+    extractor = BestellungsExtractor(encoding_detector)
+    
+    # Months whose orders did not change since the watermark are not rewritten
+    watermark = None if force else get_watermark(manifest, csv_file)
+    if watermark is not None:
+        print(f"Previous export reached {watermark.max_pickup_date}, "
+              f"only months with new or changed orders are rewritten")
+    else:
+        watermark = OrderWatermark()
+    previous_max_pickup_date = watermark.max_pickup_date
     
     try:
         print(f"Reading orders from {csv_file.name}...")
-        orders = extractor.read_file(csv_file)
+        if columnar:
+            columns = extractor.read_columns(csv_file)
+            written = extractor.convert_columns_to_monthly_json(
+                columns, output_dir, watermark=watermark
+            )
+        else:
+            if in_memory:
+                orders = extractor.read_file(csv_file)
+            else:
+                # Orders go to per-month spool files as they are read
+                orders = extractor.iter_orders(csv_file)
+            written = extractor.convert_to_monthly_json(orders, output_dir, watermark=watermark)
+        
+        encoding_detector.save_cache(encoding_cache_path)
+        encoding_detector.save_report(qc_dir / "bestellungen_encodings.json")
         
-        # Group orders by month
-        orders_by_month = defaultdict(list)
-        for order in orders:
-            month_key = order.pickup_date.strftime("%Y-%m")
-            orders_by_month[month_key].append(order)
+        for month_key, (output_file, order_count) in written.items():
+            print(f"  ✓ Saved {order_count} orders for {month_key} to {output_file.name}")
         
-        # Save each month to separate JSON file
-        processed_months = 0
-        for month_key, month_orders in orders_by_month.items():
-            output_file = output_dir / f"bestellungen_{month_key}.json"
-            
-            try:
-                extractor.convert_to_json(month_orders, output_file)
-                print(f"  ✓ Saved {len(month_orders)} orders for {month_key} to {output_file.name}")
-                processed_months += 1
-            except Exception as e:
-                print(f"  ✗ Error saving {month_key}: {e}")
+        output_files = [
+            output_dir / f"bestellungen_{month_key}.json" for month_key in sorted(watermark.months)
+        ]
+        manifest.record(
+            csv_file,
+            BestellungsExtractor.VERSION,
+            output_files,
+            {"watermark": watermark.model_dump(mode="json")},
+        )
+        manifest.save()
         
-        print(f"\nCompleted: {len(orders)} total orders processed")
-        print(f"Created {processed_months} monthly files in {output_dir}")
+        total_orders = sum(len(month.order_ids) for month in watermark.months.values())
+        print(f"\nCompleted: {total_orders} total orders processed")
+        if previous_max_pickup_date is not None:
+            print(f"Pickup dates now reach {watermark.max_pickup_date} "
+                  f"(previously {previous_max_pickup_date})")
+        print(f"Rewrote {len(written)} of {len(watermark.months)} monthly files in {output_dir}")
         
     except Exception as e:
         print(f"Error reading CSV file: {e}")
 
 
 if __name__ == "__main__":
-    process_bestellungen()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Extract Bestellungen CSV to monthly JSON")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-extract the export, even if the manifest says it is unchanged",
+    )
+    parser.add_argument(
+        "--in-memory",
+        action="store_true",
+        help="Read the whole export before writing, instead of streaming it month by month",
+    )
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="Parse the export into typed column arrays, fastest for large exports",
+    )
+    args = parser.parse_args()
+    process_bestellungen(force=args.force, in_memory=args.in_memory, columnar=args.columnar)
@@ -1,48 +1,309 @@
 from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
 from extractors.fiskal_extractor.fiskal_extractor import FiskalExtractor
+from extractors.fiskal_extractor.metadata import ExtractMetadata
+from extractors.fiskal_extractor.checkpoint import ParseCheckpoint
+from extractors.fiskal_extractor.unparsed_block_sink import UnparsedBlockSink
+from extractors.fiskal_extractor.records import TransactionRecord
+from extractors.fiskal_extractor.columnar_store import (
+    FISKAL_COLUMNS_SUFFIX,
+    FiskalColumnsWriter,
+)
+from extractors.extraction_manifest.extraction_manifest import ExtractionManifest
+from extractors.encoding_detector.detected_encoding import DetectedEncoding
+from extractors.encoding_detector.encoding_detector import EncodingDetector
 
 
-def process_fiskaljournale():
-    """Process all fiskaljournal .txt files and create JSON extracts"""
+def extract_fiskaljournal(
+    txt_file: Path,
+    output_path: Path,
+    unparsed_path: Path,
+    checkpoint: Optional[ParseCheckpoint] = None,
+    indent: Optional[int] = 2,
+    columns_path: Optional[Path] = None,
+    source_encodings: Optional[Dict[str, str]] = None,
+    max_unparsed_blocks: Optional[int] = None,
+) -> Tuple[
+    ExtractMetadata,
+    Dict[str, int],
+    Optional[ParseCheckpoint],
+    bool,
+    List[DetectedEncoding],
+]:
+    """Extract one journal and write its JSON; runs inside a worker process
+
+    Transactions are streamed from the parser straight into the JSON file,
+    and blocks that fail to parse straight into the journal's QC file.
+    With a checkpoint from the previous run only the appended tail of the
+    journal is parsed and added to the existing extract and QC file, unless
+    the extract was written in the other JSON format. With columns_path the
+    line items are also written to a columnar store; without it a store
+    left by an earlier run is removed, as it would no longer match the JSON.
+
+    Returns the unparsed block counts per reason for the whole journal, not
+    the blocks themselves.
+    """
+    extractor = FiskalExtractor(
+        reader="mmap", encoding_detector=EncodingDetector(source_encodings)
+    )
+
+    if checkpoint is not None and checkpoint.compact != (indent is None):
+        # Appending would mix indented and compact records in one extract
+        checkpoint = None
+    transactions, resumed = extractor.iter_file_incremental(txt_file, checkpoint)
+    # A resumed journal carries on with the numbering, cap and totals of its QC file
+    extractor.unparsed_sink = UnparsedBlockSink(
+        unparsed_path, max_unparsed_blocks, checkpoint.unparsed if resumed else None
+    )
+
+    columns = None
+    if columns_path is not None:
+        if resumed:
+            columns = FiskalColumnsWriter.from_file(columns_path)
+        else:
+            columns = FiskalColumnsWriter()
+        transactions = feed_columns(transactions, columns)
+
+    with extractor.unparsed_sink:
+        if resumed:
+            extractor.append_to_json(transactions, output_path, indent)
+        else:
+            extractor.convert_to_json(transactions, output_path, indent)
+
+    if columns is not None:
+        columns.write(columns_path)
+    else:
+        output_path.with_name(f"{txt_file.name}{FISKAL_COLUMNS_SUFFIX}").unlink(missing_ok=True)
+
+    checkpoint = extractor.checkpoint
+    if checkpoint is not None:
+        checkpoint.compact = indent is None
+        checkpoint.unparsed = extractor.unparsed_sink.summary()
+
+    return (
+        extractor.metadata,
+        extractor.unparsed_sink.counts,
+        checkpoint,
+        resumed,
+        extractor.encoding_detector.detections,
+    )
+
+
+def feed_columns(
+    transactions: Iterable[TransactionRecord], columns: FiskalColumnsWriter
+) -> Iterable[TransactionRecord]:
+    """Pass transactions through while adding their line items to columns"""
+    for transaction in transactions:
+        columns.add(transaction)
+        yield transaction
+
+
+def get_checkpoint(
+    manifest: ExtractionManifest, txt_file: Path, output_paths: List[Path]
+) -> Optional[ParseCheckpoint]:
+    """Return the stored checkpoint if all previous extracts can be appended to"""
+    entry = manifest.get(txt_file)
+    if entry is None or entry.extractor_version != FiskalExtractor.VERSION:
+        return None
+    if "checkpoint" not in entry.state:
+        return None
+    if not set(map(str, output_paths)) <= set(entry.outputs):
+        return None
+    if not all(Path(output).exists() for output in entry.outputs):
+        return None
+    return ParseCheckpoint(**entry.state["checkpoint"])
+
+
+def save_extraction_metadata(
+    metadata_path: Path, all_metadata: List[ExtractMetadata], txt_files: List[Path]
+) -> None:
+    """Merge this run's metadata into the QC file, one entry per source file
+
+    Journals skipped as unchanged keep their entry from an earlier run;
+    entries of journals no longer among txt_files are dropped.
+    """
+    metadata_by_source = {}
+    if metadata_path.exists():
+        try:
+            with open(metadata_path, "r", encoding="utf-8") as f:
+                metadata_by_source = {entry["source_file"]: entry for entry in json.load(f)}
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Warning: Could not read {metadata_path}, starting fresh: {e}")
+
+    for metadata in all_metadata:
+        metadata_by_source[metadata.source_file] = metadata.model_dump(mode="json")
+
+    source_files = {str(txt_file) for txt_file in txt_files}
+    with open(metadata_path, "w", encoding="utf-8") as f:
+        json.dump(
+            [
+                metadata_by_source[source_file]
+                for source_file in sorted(metadata_by_source)
+                if source_file in source_files
+            ],
+            f,
+            indent=2,
+            ensure_ascii=False,
+        )
+
+
+def process_fiskaljournale(
+    max_workers: Optional[int] = None,
+    force: bool = False,
+    compact: bool = False,
+    columnar: bool = False,
+    max_unparsed_blocks: Optional[int] = None,
+):
+    """Process new or changed fiskaljournal .txt files and create JSON extracts"""
     
     input_dir = Path("../../data/raw/Fiskaljournale/")
     output_dir = Path("../../data/processed/Fiskaljournale/")
     qc_dir = Path("../../data/processed/qc/")
+    unparsed_dir = qc_dir / "unparsed_fiskal_blocks"
+    manifest = ExtractionManifest(Path("../../data/processed/extraction_manifest.json"))
+    encoding_cache_path = Path("../../data/processed/encoding_cache.json")
     
     # Create output directories
     output_dir.mkdir(parents=True, exist_ok=True)
     qc_dir.mkdir(parents=True, exist_ok=True)
     
-    extractor = FiskalExtractor()
+    # Collects encodings from all workers for the QC output
+    extractor = FiskalExtractor(
+        reader="mmap",
+        encoding_detector=EncodingDetector.from_cache(encoding_cache_path),
+    )
     
-    txt_files = list(input_dir.glob("*.txt"))
+    all_txt_files = sorted(input_dir.glob("*.txt"))
+    txt_files = [
+        txt_file
+        for txt_file in all_txt_files
+        if force or not manifest.is_up_to_date(txt_file, FiskalExtractor.VERSION)
+    ]
     processed_count = 0
+    all_metadata = []
+    unparsed_counts: Dict[str, int] = {}
     
-    print(f"Found {len(txt_files)} fiskaljournal files to process")
+    print(
+        f"Found {len(all_txt_files)} fiskaljournal files, "
+        f"{len(txt_files)} new or changed to process"
+    )
     
-    for txt_file in txt_files:
-        try:
-            print(f"Processing {txt_file.name}...")
-            
-            transactions = extractor.read_file(txt_file)
-            
-            # Save JSON extract
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = []
+        all_output_paths = []
+        for txt_file in txt_files:
             output_path = output_dir / f"{txt_file.name}.json"
-            extractor.convert_to_json(transactions, output_path)
+            columns_path = None
+            output_paths = [output_path]
+            if columnar:
+                columns_path = output_dir / f"{txt_file.name}{FISKAL_COLUMNS_SUFFIX}"
+                output_paths.append(columns_path)
+            all_output_paths.append(output_paths)
             
-            print(f"  ✓ Extracted {len(transactions)} transactions to {output_path.name}")
-            processed_count += 1
+            checkpoint = None
+            if not force:
+                checkpoint = get_checkpoint(manifest, txt_file, output_paths)
+            futures.append(
+                pool.submit(
+                    extract_fiskaljournal,
+                    txt_file,
+                    output_path,
+                    unparsed_dir / f"{txt_file.name}.txt",
+                    checkpoint,
+                    None if compact else 2,
+                    columns_path,
+                    extractor.encoding_detector.source_encodings,
+                    max_unparsed_blocks,
+                )
+            )
+        
+        # Collect in input order so the QC output is deterministic
+        for txt_file, output_paths, future in zip(txt_files, all_output_paths, futures):
+            try:
+                metadata, file_unparsed_counts, checkpoint, resumed, detections = (
+                    future.result()
+                )
+                
+                for reason, count in file_unparsed_counts.items():
+                    unparsed_counts[reason] = unparsed_counts.get(reason, 0) + count
+                extractor.encoding_detector.merge(detections)
+                all_metadata.append(metadata)
+                state = {"checkpoint": checkpoint.model_dump()} if checkpoint else {}
+                manifest.record(txt_file, FiskalExtractor.VERSION, output_paths, state)
+                
+                if resumed:
+                    print(
+                        f"  ✓ Appended new transactions from {txt_file.name} "
+                        f"({metadata.total_transactions} in total)"
+                    )
+                else:
+                    print(
+                        f"  ✓ Extracted {metadata.total_transactions} transactions "
+                        f"from {txt_file.name}"
+                    )
+                processed_count += 1
             
-        except Exception as e:
-            print(f"  ✗ Error processing {txt_file.name}: {e}")
+            except Exception as e:
+                print(f"  ✗ Error processing {txt_file.name}: {e}")
+    
+    manifest.save()
+    extractor.encoding_detector.save_cache(encoding_cache_path)
+    
+    # Save detected encodings and their confidence to QC directory
+    encodings_path = qc_dir / "fiskal_encodings.json"
+    extractor.encoding_detector.save_report(encodings_path)
     
-    # Save unparsed blocks to QC directory
-    unparsed_path = qc_dir / "unparsed_fiskal_blocks.txt"
-    extractor.save_unparsed_blocks(unparsed_path)
+    # Save per-file extraction metadata to QC directory
+    metadata_path = qc_dir / "fiskal_extraction_metadata.json"
+    save_extraction_metadata(metadata_path, all_metadata, all_txt_files)
     
     print(f"\nCompleted: {processed_count}/{len(txt_files)} files processed")
-    print(f"Unparsed blocks saved to: {unparsed_path}")
+    if unparsed_counts:
+        counts = ", ".join(
+            f"{reason}: {count}" for reason, count in sorted(unparsed_counts.items())
+        )
+        print(f"Unparsed blocks ({counts}) saved to: {unparsed_dir}")
+    print(f"Extraction metadata saved to: {metadata_path}")
+    print(f"Detected encodings saved to: {encodings_path}")
 
 
 if __name__ == "__main__":
-    process_fiskaljournale()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Extract Fiskaljournale to JSON")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-extract all files, even if the manifest says they are unchanged",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write one compact JSON record per line instead of indented JSON",
+    )
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="Also write a memory-mappable columnar store of the line items",
+    )
+    parser.add_argument(
+        "--max-unparsed",
+        type=int,
+        default=1000,
+        help="Unparsed blocks written to QC per journal, the rest are only counted",
+    )
+    args = parser.parse_args()
+    process_fiskaljournale(
+        max_workers=args.workers,
+        force=args.force,
+        compact=args.compact,
+        columnar=args.columnar,
+        max_unparsed_blocks=args.max_unparsed,
+    )
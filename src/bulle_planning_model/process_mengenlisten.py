@@ -1,59 +1,134 @@
 from pathlib import Path
-from time import sleep
+import argparse
 from extractors.mengenlisten_extractor.mengenlisten_extractor import MengenlistenExtractor
+from extractors.mengenlisten_extractor.circuit_breaker import CircuitBreaker
+from extractors.mengenlisten_extractor.gemini_client import GeminiClient
+from extractors.mengenlisten_extractor.rate_limiter import TokenBucketRateLimiter
+from extractors.mengenlisten_extractor.response_cache import ResponseCache
+from extractors.mengenlisten_extractor.retry_policy import RetryPolicy
+from extractors.extraction_manifest.extraction_manifest import ExtractionManifest
 
 
-def process_mengenlisten():
-    """Process all mengenlisten .pdf files and create JSON extracts"""
-    
+def process_mengenlisten(
+    force: bool = False,
+    workers: int = 4,
+    requests_per_minute: float = 15,
+    bypass_cache: bool = False,
+    batch_size: int = 1,
+):
+    """Process new or changed mengenlisten .pdf files and create JSON extracts
+
+    Up to workers PDFs are sent to the AI service at once, within a budget
+    of requests_per_minute. Responses are cached by PDF content, prompt
+    version and model, so re-extracting unchanged PDFs costs no API calls
+    unless bypass_cache is set. Rate limits and server errors are retried
+    with backoff, a failing service pauses the whole run, and files that
+    still fail are re-queued before they count as unparsed. With batch_size
+    above 1 that many PDFs share one request and one rate limit token.
+    """
+
     input_dir = Path("../../data/raw/Mengenlisten/")
     output_dir = Path("../../data/processed/Mengenlisten/")
     qc_dir = Path("../../data/processed/qc/")
-    
+    manifest = ExtractionManifest(Path("../../data/processed/extraction_manifest.json"))
+
     # Create output directories
     output_dir.mkdir(parents=True, exist_ok=True)
     qc_dir.mkdir(parents=True, exist_ok=True)
-    
-    extractor = MengenlistenExtractor()
-    
-    pdf_files = list(input_dir.glob("*.pdf"))
+
+    cache = ResponseCache(Path("../../data/processed/gemini_cache/"))
+    extractor = MengenlistenExtractor(
+        ai_client=GeminiClient(
+            cache=cache,
+            bypass_cache=bypass_cache,
+            rate_limiter=TokenBucketRateLimiter(requests_per_minute, burst=workers),
+            retry_policy=RetryPolicy(circuit_breaker=CircuitBreaker()),
+        )
+    )
+
+    all_pdf_files = sorted(input_dir.glob("*.pdf"))
+    # Already extracted PDFs need neither a paid API call nor a rate limit pause
+    pdf_files = [
+        pdf_file
+        for pdf_file in all_pdf_files
+        if force or not manifest.is_up_to_date(pdf_file, MengenlistenExtractor.VERSION)
+    ]
     processed_count = 0
-    
-    print(f"Found {len(pdf_files)} mengenlisten files to process")
-    
-    for i, pdf_file in enumerate(pdf_files):
-        try:
-            print(f"Processing {pdf_file.name} ({i+1}/{len(pdf_files)})...")
-            
-            mengenliste = extractor.read_file(pdf_file)
-            
-            if mengenliste:
-                # Save JSON extract with date as filename
-                output_path = output_dir / f"{mengenliste.report_date}.json"
-                extractor.convert_to_json(mengenliste, output_path)
-                
-                print(f"  ✓ Extracted data for {mengenliste.report_date} to {output_path.name}")
-                processed_count += 1
-            else:
-                print(f"  ✗ Failed to extract data from {pdf_file.name}")
-            
-            # Rate limiting - 5 second delay between API calls
-            if i < len(pdf_files) - 1:  # Don't sleep after last file
-                sleep(5)
-                
-        except Exception as e:
-            print(f"  ✗ Error processing {pdf_file.name}: {e}")
-            # Still sleep to avoid API rate limits
-            if i < len(pdf_files) - 1:
-                sleep(5)
-    
+
+    print(
+        f"Found {len(all_pdf_files)} mengenlisten files, "
+        f"{len(pdf_files)} new or changed to process"
+    )
+
+    try:
+        results = extractor.read_files(
+            pdf_files, max_workers=workers, batch_size=batch_size
+        )
+        for i, (pdf_file, mengenliste) in enumerate(results):
+            try:
+                print(f"Processed {pdf_file.name} ({i+1}/{len(pdf_files)})...")
+
+                if mengenliste:
+                    # Save JSON extract with date as filename
+                    output_path = output_dir / f"{mengenliste.report_date}.json"
+                    extractor.convert_to_json(mengenliste, output_path)
+                    manifest.record(pdf_file, MengenlistenExtractor.VERSION, [output_path])
+
+                    print(f"  ✓ Extracted data for {mengenliste.report_date} to {output_path.name}")
+                    processed_count += 1
+                else:
+                    print(f"  ✗ Failed to extract data from {pdf_file.name}")
+
+            except Exception as e:
+                print(f"  ✗ Error processing {pdf_file.name}: {e}")
+    finally:
+        # Keep the paid extractions recorded even if the run is interrupted
+        manifest.save()
+
     # Save unparsed files to QC directory
     unparsed_path = qc_dir / "unparsed_mengenlisten.txt"
     extractor.save_unparsed_blocks(unparsed_path)
-    
+
     print(f"\nCompleted: {processed_count}/{len(pdf_files)} files processed")
+    print(f"Cached responses used: {cache.hits}")
     print(f"Unparsed files saved to: {unparsed_path}")
 
 
 if __name__ == "__main__":
-    process_mengenlisten()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Extract Mengenlisten PDFs to JSON")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-extract all files, even if the manifest says they are unchanged",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Number of PDFs sent to the AI service at the same time",
+    )
+    parser.add_argument(
+        "--requests-per-minute",
+        type=float,
+        default=15,
+        help="Upper limit of AI requests per minute",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ask the AI service even for PDFs with a cached response",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="Number of PDFs sent in one AI request",
+    )
+    args = parser.parse_args()
+    process_mengenlisten(
+        force=args.force,
+        workers=args.workers,
+        requests_per_minute=args.requests_per_minute,
+        bypass_cache=args.no_cache,
+        batch_size=args.batch_size,
+    )
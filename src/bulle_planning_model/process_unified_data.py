@@ -1,10 +1,9 @@
 from pathlib import Path
-from collections import defaultdict
 import re
-import tempfile
-import shutil
 import json
 from data_unifier.data_unifier import DataUnifier
+from data_unifier.mengenlisten_store import MengenlistenStore
+from extractors.fiskal_extractor.columnar_store import FISKAL_COLUMNS_SUFFIX
 
 
 def get_month_key_from_fiskal_filename(filename: str) -> str:
@@ -24,37 +23,11 @@ def get_month_key_from_fiskal_filename(filename: str) -> str:
     return None
 
 
-def get_month_key_from_date(date_str: str) -> str:
-    """Extract YYYY-MM format from date string like '2024-04-11'"""
-    return date_str[:7]
-
-
-def create_monthly_mengenlisten_dirs(mengenlisten_dir: Path) -> dict:
-    """Group mengenlisten files by month and create temporary directories"""
-    monthly_files = defaultdict(list)
-    
-    # Group mengenlisten files by month
-    for json_file in mengenlisten_dir.glob("*.json"):
-        date_str = json_file.stem  # e.g., '2024-04-11'
-        if re.match(r"\d{4}-\d{2}-\d{2}", date_str):
-            month_key = get_month_key_from_date(date_str)
-            monthly_files[month_key].append(json_file)
-    
-    # Create temporary directories for each month
-    temp_dirs = {}
-    for month_key, files in monthly_files.items():
-        temp_dir = Path(tempfile.mkdtemp())
-        for file in files:
-            shutil.copy2(file, temp_dir)
-        temp_dirs[month_key] = temp_dir
-    
-    return temp_dirs
-
-
-def cleanup_temp_dirs(temp_dirs: dict):
-    """Clean up temporary directories"""
-    for temp_dir in temp_dirs.values():
-        shutil.rmtree(temp_dir)
+def is_current_columns_file(columns_file: Path, json_file: Path) -> bool:
+    """A columnar store left behind by an earlier run is older than its JSON extract"""
+    if not json_file.exists():
+        return True
+    return columns_file.stat().st_mtime_ns >= json_file.stat().st_mtime_ns
 
 
 def process_unified_data():
@@ -93,76 +66,79 @@ def process_unified_data():
         if month_key:
             fiskal_files[month_key] = json_file
     
-    # Create monthly mengenlisten directories
-    print("Grouping mengenlisten files by month...")
-    mengenlisten_monthly_dirs = create_monthly_mengenlisten_dirs(mengenlisten_dir)
-    
-    try:
-        # Get all available months
-        all_months = (
-            set(bestellungen_files.keys()) | 
-            set(fiskal_files.keys()) | 
-            set(mengenlisten_monthly_dirs.keys())
+    # Prefer columnar stores, they are read without re-parsing every line item,
+    # but only if written since the JSON extract they belong to
+    for columns_file in fiskaljournale_dir.glob(f"*{FISKAL_COLUMNS_SUFFIX}"):
+        month_key = get_month_key_from_fiskal_filename(columns_file.name)
+        json_file = columns_file.with_name(
+            columns_file.name.removesuffix(FISKAL_COLUMNS_SUFFIX) + ".json"
         )
+        if month_key and is_current_columns_file(columns_file, json_file):
+            fiskal_files[month_key] = columns_file
+    
+    # Each Mengenliste is parsed when its month comes up, at most once per run
+    print("Indexing mengenlisten files by date...")
+    mengenlisten_store = MengenlistenStore(mengenlisten_dir)
+    
+    # Get all available months
+    all_months = (
+        set(bestellungen_files.keys()) | 
+        set(fiskal_files.keys()) | 
+        set(mengenlisten_store.months())
+    )
+    
+    print(f"Found {len(all_months)} months to process: {sorted(all_months)}")
+    
+    processed_months = 0
+    for month_key in sorted(all_months):
+        fiskal_path = fiskal_files.get(month_key)
+        bestellungen_path = bestellungen_files.get(month_key)
+        
+        # Skip months where we don't have fiskal data
+        if not fiskal_path:
+            print(f"Skipping {month_key}: Missing fiskal data")
+            continue
         
-        print(f"Found {len(all_months)} months to process: {sorted(all_months)}")
+        print(f"\nProcessing {month_key}...")
+        print(f"  Fiskal: {fiskal_path.name}")
+        print(f"  Bestellungen: {bestellungen_path.name if bestellungen_path else 'Not available'}")
+        mengenlisten = mengenlisten_store.for_month(month_key)
+        print(f"  Mengenlisten: {len(mengenlisten)} files")
         
-        processed_months = 0
-        for month_key in sorted(all_months):
-            fiskal_path = fiskal_files.get(month_key)
-            bestellungen_path = bestellungen_files.get(month_key)
-            mengenlisten_temp_dir = mengenlisten_monthly_dirs.get(
-                month_key, Path(tempfile.mkdtemp())
+        try:
+            consolidated_data, unmapped_data = unifier.unify_monthly_data(
+                fiskal_path, mengenlisten, bestellungen_path
             )
             
-            # Skip months where we don't have fiskal data
-            if not fiskal_path:
-                print(f"Skipping {month_key}: Missing fiskal data")
-                continue
+            # Write consolidated data
+            output_file = output_dir / f"consolidated_{month_key}.json"
+            unifier.write_monthly_consolidated_data(consolidated_data, output_file)
             
-            print(f"\nProcessing {month_key}...")
-            print(f"  Fiskal: {fiskal_path.name}")
-            print(f"  Bestellungen: {bestellungen_path.name if bestellungen_path else 'Not available'}")
-            print(f"  Mengenlisten: {len(list(mengenlisten_temp_dir.glob('*.json')))} files")
-            
-            try:
-                consolidated_data, unmapped_data = unifier.unify_monthly_data(
-                    fiskal_path, mengenlisten_temp_dir, bestellungen_path
-                )
-                
-                # Write consolidated data
-                output_file = output_dir / f"consolidated_{month_key}.json"
-                unifier.write_monthly_consolidated_data(consolidated_data, output_file)
+            # Write unmapped items to QC directory
+            if unmapped_data:
+                qc_dir = Path("../../data/processed/qc")
+                qc_dir.mkdir(parents=True, exist_ok=True)
                 
-                # Write unmapped items to QC directory
-                if unmapped_data:
-                    qc_dir = Path("../../data/processed/qc")
-                    qc_dir.mkdir(parents=True, exist_ok=True)
-                    
-                    for date_str, unmapped_items in unmapped_data.items():
-                        qc_data = {
-                            "date": date_str,
-                            **unmapped_items
-                        }
-                        qc_file_path = qc_dir / f"unmapped_items_{date_str}.json"
-                        with open(qc_file_path, "w", encoding="utf-8") as f:
-                            json.dump(qc_data, f, indent=2, ensure_ascii=False)
-                
-                print(f"  ✓ Processed {len(consolidated_data)} days -> {output_file.name}")
-                if unmapped_data:
-                    print(f"    QC: {len(unmapped_data)} days with unmapped items")
-                processed_months += 1
-                
-            except Exception as e:
-                print(f"  ✗ Error processing {month_key}: {e}")
-        
-        print(f"\nCompleted: {processed_months}/{len(all_months)} months processed")
-        print(f"Consolidated files saved to: {output_dir}")
-        print("QC files saved to: ../../data/processed/qc/")
+                for date_str, unmapped_items in unmapped_data.items():
+                    qc_data = {
+                        "date": date_str,
+                        **unmapped_items
+                    }
+                    qc_file_path = qc_dir / f"unmapped_items_{date_str}.json"
+                    with open(qc_file_path, "w", encoding="utf-8") as f:
+                        json.dump(qc_data, f, indent=2, ensure_ascii=False)
+            
+            print(f"  ✓ Processed {len(consolidated_data)} days -> {output_file.name}")
+            if unmapped_data:
+                print(f"    QC: {len(unmapped_data)} days with unmapped items")
+            processed_months += 1
         
-    finally:
-        print("\nCleaning up temporary directories...")
-        cleanup_temp_dirs(mengenlisten_monthly_dirs)
+        except Exception as e:
+            print(f"  ✗ Error processing {month_key}: {e}")
+    
+    print(f"\nCompleted: {processed_months}/{len(all_months)} months processed")
+    print(f"Consolidated files saved to: {output_dir}")
+    print("QC files saved to: ../../data/processed/qc/")
 
 
 if __name__ == "__main__":
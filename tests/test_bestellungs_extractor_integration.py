@@ -0,0 +1,167 @@
+import unittest
+from pathlib import Path
+from collections import defaultdict
+import csv
+import json
+import tempfile
+import shutil
+
+from src.bulle_planning_model.extractors.bestellungs_extractor.bestellungs_extractor import (
+    BestellungsExtractor,
+)
+from src.bulle_planning_model.extractors.bestellungs_extractor.order_watermark import (
+    OrderWatermark,
+)
+
+
+ROWS = [
+    # id, abholdatum, artikelname, artikelanzahl, artikelpreis (cents)
+    ("1001", "2024-10-30", "Nussbrot", "1", "520"),
+    ("1001", "2024-10-30", "Brezel", "3", "95"),
+    ("1002", "2024-10-31", "Dinkelbrot", "2", "610"),
+    ("1003", "2024-11-02", "Brezel", "0.5", "95"),
+    ("1004", "2024-11-02", "Nussbrot", "1", "520"),
+    # A late row of an order whose other rows came earlier
+    ("1002", "2024-10-31", "Brezel", "1", "95"),
+    ("1005", "2024-12-24", "Stollen", "1", "1890"),
+]
+
+
+class TestBestellungsExtractorIntegration(unittest.TestCase):
+    """Integration tests for BestellungsExtractor on a small generated export."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.csv_path = self.temp_dir / "bestellungen.csv"
+        self.write_export(ROWS)
+        self.extractor = BestellungsExtractor()
+
+    def write_export(self, rows):
+        with open(self.csv_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", "abholdatum", "artikelname", "artikelanzahl", "artikelpreis"])
+            writer.writerows(rows)
+
+    def tearDown(self):
+        """Clean up after tests."""
+        shutil.rmtree(self.temp_dir)
+
+    def write_in_memory_months(self):
+        """Write monthly files the way process_bestellungen used to, from read_file."""
+        expected_dir = self.temp_dir / "expected"
+        expected_dir.mkdir()
+        orders_by_month = defaultdict(list)
+        for order in self.extractor.read_file(self.csv_path):
+            orders_by_month[order.pickup_date.strftime("%Y-%m")].append(order)
+        for month_key, month_orders in orders_by_month.items():
+            self.extractor.convert_to_json(
+                month_orders, expected_dir / f"bestellungen_{month_key}.json"
+            )
+        return expected_dir, orders_by_month
+
+    def assert_same_months(self, written, output_dir):
+        expected_dir, orders_by_month = self.write_in_memory_months()
+
+        self.assertEqual(sorted(written), sorted(orders_by_month))
+        self.assertEqual(
+            sorted(path.name for path in output_dir.iterdir()),
+            sorted(path.name for path in expected_dir.iterdir()),
+        )
+        for month_key, (output_path, order_count) in written.items():
+            with open(output_path, "r", encoding="utf-8") as f:
+                streamed = json.load(f)
+            with open(expected_dir / output_path.name, "r", encoding="utf-8") as f:
+                expected = json.load(f)
+            self.assertEqual(streamed, expected)
+            self.assertEqual(order_count, len(orders_by_month[month_key]))
+
+    def test_streaming_matches_in_memory_months(self):
+        """Test that streamed monthly files equal grouping the whole export in memory."""
+        output_dir = self.temp_dir / "streamed"
+        output_dir.mkdir()
+        written = self.extractor.convert_to_monthly_json(
+            self.extractor.iter_orders(self.csv_path), output_dir
+        )
+
+        self.assert_same_months(written, output_dir)
+        with open(output_dir / "bestellungen_2024-10.json", "r", encoding="utf-8") as f:
+            split_order = json.load(f)["1002"]
+        self.assertEqual(len(split_order["sales"]), 2)
+        self.assertAlmostEqual(split_order["sum"], 13.15)
+
+        print(f"✅ Streamed {len(written)} monthly files match the in-memory extract")
+
+    def test_columnar_matches_in_memory_months(self):
+        """Test that the column parser writes the same monthly files as read_file."""
+        columns = self.extractor.read_columns(self.csv_path)
+
+        self.assertEqual(len(columns), len(ROWS))
+        self.assertEqual(columns.order_ids, ["1001", "1002", "1003", "1004", "1005"])
+        self.assertEqual(list(columns.order_sums()), [805, 1315, 48, 520, 1890])
+        self.assertEqual(
+            {month: list(codes) for month, codes in columns.month_partitions().items()},
+            {"2024-10": [0, 1], "2024-11": [2, 3], "2024-12": [4]},
+        )
+
+        output_dir = self.temp_dir / "columnar"
+        output_dir.mkdir()
+        written = self.extractor.convert_columns_to_monthly_json(columns, output_dir)
+
+        self.assert_same_months(written, output_dir)
+        self.assertEqual(self.extractor.metadata.total_orders, len(columns.order_ids))
+
+        print(f"✅ Columnar parser wrote {len(written)} matching monthly files")
+
+    def test_watermark_rewrites_only_changed_months(self):
+        """Test that a rerun with the watermark only rewrites months with new or changed orders."""
+        output_dir = self.temp_dir / "incremental"
+        output_dir.mkdir()
+        watermark = OrderWatermark()
+        written = self.extractor.convert_to_monthly_json(
+            self.extractor.iter_orders(self.csv_path), output_dir, watermark=watermark
+        )
+        self.assertEqual(sorted(written), ["2024-10", "2024-11", "2024-12"])
+        self.assertEqual(str(watermark.max_pickup_date), "2024-12-24")
+        self.assertEqual(watermark.months["2024-10"].order_ids, ["1001", "1002"])
+
+        # Same export again, through the other parser: nothing changes
+        state = OrderWatermark(**watermark.model_dump(mode="json"))
+        written = self.extractor.convert_columns_to_monthly_json(
+            self.extractor.read_columns(self.csv_path), output_dir, watermark=state
+        )
+        self.assertEqual(written, {})
+        self.assertEqual(state, watermark)
+
+        # A new order in November, an edited one in October and December gone
+        rows = [row for row in ROWS if row[0] != "1005"]
+        rows[2] = ("1002", "2024-10-31", "Dinkelbrot", "3", "610")
+        rows.append(("1006", "2024-11-03", "Brezel", "2", "95"))
+        self.write_export(rows)
+
+        written = self.extractor.convert_to_monthly_json(
+            self.extractor.iter_orders(self.csv_path), output_dir, watermark=state
+        )
+        self.assertEqual(sorted(written), ["2024-10", "2024-11"])
+        self.assertEqual(written["2024-11"][1], 3)
+        with open(output_dir / "bestellungen_2024-10.json", "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["1002"]["sales"][0]["quantity"], 3.0)
+        self.assertFalse((output_dir / "bestellungen_2024-12.json").exists())
+        self.assertEqual(sorted(state.months), ["2024-10", "2024-11"])
+        self.assertEqual(str(state.max_pickup_date), "2024-12-24")
+
+        # And an unchanged rerun leaves the files alone
+        november_mtime = (output_dir / "bestellungen_2024-11.json").stat().st_mtime_ns
+        written = self.extractor.convert_to_monthly_json(
+            self.extractor.iter_orders(self.csv_path), output_dir, watermark=state
+        )
+        self.assertEqual(written, {})
+        self.assertEqual(
+            (output_dir / "bestellungen_2024-11.json").stat().st_mtime_ns, november_mtime
+        )
+
+        print("✅ Watermark rewrote only the months with new or changed orders")
+
+
+if __name__ == "__main__":
+    unittest.main()
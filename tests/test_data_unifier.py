@@ -0,0 +1,193 @@
+import unittest
+from decimal import Decimal
+from pathlib import Path
+import json
+import tempfile
+import shutil
+
+from src.bulle_planning_model.data_unifier.data_unifier import DataUnifier
+from src.bulle_planning_model.data_unifier.mengenlisten_store import MengenlistenStore
+from src.bulle_planning_model.data_unifier.article_lookup_table import ArticleLookupTable
+from src.bulle_planning_model.extractors.fiskal_extractor import records
+from src.bulle_planning_model.process_fiskaljournale import extract_fiskaljournal
+
+# The table the unifier uses, it imports the package without the src prefix
+ARTICLE_NAMES = records.ARTICLE_NAMES
+
+LOOKUP = {
+    "Roggenmischbrot": "Roggenbrot",
+    "Roggenbrot": "Roggenbrot",
+    "Osterbrot": "Osterbrot",
+}
+
+
+class FixedLookupUnifier(DataUnifier):
+    """DataUnifier with a small lookup table; Nussbrot is left unmapped."""
+
+    def _load_lookup_table(self) -> ArticleLookupTable:
+        return ArticleLookupTable(variant_to_master=LOOKUP)
+
+
+def item_less_receipt(journal_text: str) -> str:
+    """Rechnung #2 moved to the next day, without its line items."""
+    block = journal_text[journal_text.index("Rechnung (#2)"):]
+    block = (
+        block.replace("Rechnung (#2)", "Rechnung (#3)")
+        .replace("31.03.2023 15:39:26", "01.04.2023 08:02:10")
+        .replace("9DA51AE5B85A4A65B4F86CFACE4830BC", "5B0C3E1A9F8D4E2BA7C61D0F3E9A2B47")
+    )
+    return block[:block.index("  1x Osterbrot")] + block[block.index("          Verkauf "):]
+
+
+class TestDataUnifier(unittest.TestCase):
+    """Tests for DataUnifier on a small journal and Mengenliste."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+        journal_text = (Path(__file__).parent / "test_files/Fiskaljournal.txt").read_text(
+            encoding="utf-8"
+        )
+        self.txt_file = self.temp_dir / "Fiskaljournal.txt"
+        self.txt_file.write_text(
+            journal_text + "\n" + item_less_receipt(journal_text), encoding="utf-8"
+        )
+        self.json_path = self.temp_dir / "Fiskaljournal.txt.json"
+        self.columns_path = self.temp_dir / "Fiskaljournal.txt.fcol"
+        extract_fiskaljournal(
+            self.txt_file,
+            self.json_path,
+            self.temp_dir / "unparsed.txt",
+            columns_path=self.columns_path,
+        )
+
+        self.mengenlisten_dir = self.temp_dir / "Mengenlisten"
+        self.mengenlisten_dir.mkdir()
+        with open(self.mengenlisten_dir / "2023-03-31.json", "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "2023-03-31": {
+                        "production_day": "Freitag",
+                        "sales_day": "Freitag",
+                        "articles": [
+                            {"article_name": "Roggenbrot", "stock": 20, "leftover": 3, "sold_out": None},
+                            {"article_name": "Osterbrot", "stock": 8, "leftover": 0, "sold_out": "16:30"},
+                            {"article_name": "Zwiebelkuchen", "stock": 4, "leftover": 1, "sold_out": None},
+                        ],
+                    }
+                },
+                f,
+            )
+
+    def tearDown(self):
+        """Clean up after tests."""
+        shutil.rmtree(self.temp_dir)
+
+    def _dump(self, consolidated_data):
+        return {
+            date_str: data.model_dump() for date_str, data in consolidated_data.items()
+        }
+
+    def test_columnar_store_matches_json_extract(self):
+        """Test that the .fcol and JSON paths consolidate to the same output."""
+        unifier = FixedLookupUnifier()
+        json_data, json_unmapped = unifier.unify_monthly_data(
+            self.json_path, self.mengenlisten_dir
+        )
+        columns_data, columns_unmapped = unifier.unify_monthly_data(
+            self.columns_path, self.mengenlisten_dir
+        )
+
+        self.assertEqual(self._dump(columns_data), self._dump(json_data))
+        self.assertEqual(columns_unmapped, json_unmapped)
+
+        # The item-less receipt keeps its day, with nothing sold
+        self.assertEqual(sorted(json_data), ["2023-03-31", "2023-04-01"])
+        self.assertEqual(json_data["2023-04-01"].total_revenue, Decimal("0"))
+        self.assertEqual(json_data["2023-04-01"].master_articles, {})
+        self.assertNotIn("2023-04-01", json_unmapped)
+
+        self.assertEqual(
+            json_unmapped["2023-03-31"],
+            {
+                "unmapped_fiskal_items": ["Nussbrot"],
+                "unmapped_mengenlisten_items": ["Zwiebelkuchen"],
+                "unmapped_bestellungen_items": [],
+            },
+        )
+
+        print("✅ Columnar store and JSON extract consolidate identically")
+
+    def test_totals_are_exact_cents(self):
+        """Test that sales, quantities and Mengenliste data end up on the master articles."""
+        unifier = FixedLookupUnifier()
+        consolidated_data, _ = unifier.unify_monthly_data(
+            self.json_path, MengenlistenStore(self.mengenlisten_dir).for_month("2023-03")
+        )
+
+        day = consolidated_data["2023-03-31"]
+        # The unmapped Nussbrot (2,70) does not count towards the revenue
+        self.assertEqual(day.total_revenue, Decimal("13.45"))
+        self.assertEqual(str(day.total_revenue), "13.45")
+
+        roggenbrot = day.master_articles["Roggenbrot"]
+        self.assertEqual(roggenbrot.total_sales, Decimal("2.45"))
+        self.assertEqual(roggenbrot.total_quantity, Decimal("0.5"))
+        self.assertEqual(roggenbrot.leftover, 3.0)
+
+        osterbrot = day.master_articles["Osterbrot"]
+        self.assertEqual(osterbrot.total_sales, Decimal("11.00"))
+        self.assertEqual(osterbrot.sold_out_time, "16:30")
+
+        print("✅ Master article totals are exact")
+
+    def test_fractional_order_quantities_round_once(self):
+        """Test that Bestellungen lines are summed exactly and rounded once per article and day."""
+        bestellungen_path = self.temp_dir / "bestellungen_2023-03.json"
+        with open(bestellungen_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    order_id: {
+                        "pickup_date": "2023-03-31",
+                        "sales": [
+                            {"article_name": "Roggenbrot", "quantity": 0.5, "price": 2.45}
+                        ],
+                        "sum": 1.23,
+                    }
+                    for order_id in ("1001", "1002", "1003")
+                },
+                f,
+            )
+
+        unifier = FixedLookupUnifier()
+        consolidated_data, _ = unifier.unify_monthly_data(
+            self.json_path, self.mengenlisten_dir, bestellungen_path
+        )
+
+        day = consolidated_data["2023-03-31"]
+        roggenbrot = day.master_articles["Roggenbrot"]
+        # 2,45 from the register plus 3 x 1,225 = 3,675 from orders, not 3 x 1,23
+        self.assertEqual(roggenbrot.total_sales, Decimal("6.13"))
+        self.assertEqual(roggenbrot.total_quantity, Decimal("2.0"))
+        self.assertEqual(day.total_revenue, Decimal("17.13"))
+
+        print("✅ Fractional order quantities are rounded once per article and day")
+
+    def test_master_name_resolves_names_interned_later(self):
+        """Test that _master_name maps ids interned after its first call."""
+        unifier = FixedLookupUnifier()
+        self.assertEqual(
+            unifier._master_name(ARTICLE_NAMES.intern("Roggenmischbrot")), "Roggenbrot"
+        )
+
+        later_id = ARTICLE_NAMES.intern("Osterbrot")
+        unknown_id = ARTICLE_NAMES.intern("Unbekanntes Gebäck (test_data_unifier)")
+        self.assertEqual(unifier._master_name(later_id), "Osterbrot")
+        self.assertIsNone(unifier._master_name(unknown_id))
+
+        print("✅ Master names resolve by article id")
+
+
+if __name__ == "__main__":
+    unittest.main()
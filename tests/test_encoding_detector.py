@@ -0,0 +1,117 @@
+import unittest
+from pathlib import Path
+import codecs
+import tempfile
+import shutil
+
+from src.bulle_planning_model.extractors.encoding_detector.encoding_detector import (
+    EncodingDetector,
+    SAMPLE_SIZE,
+)
+
+
+GERMAN_TEXT = "Brötchen, Laugenbrezel und Käsekuchen für die Bäckerei Grüße\n" * 40
+
+
+class TestEncodingDetector(unittest.TestCase):
+    """Tests for EncodingDetector on small files in every supported shape."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        """Clean up after tests."""
+        shutil.rmtree(self.temp_dir)
+
+    def write(self, name: str, data: bytes) -> Path:
+        file_path = self.temp_dir / name
+        file_path.write_bytes(data)
+        return file_path
+
+    def test_bom(self):
+        """Test that a byte order mark decides the encoding."""
+        detector = EncodingDetector()
+        utf8_path = self.write("bom8.txt", codecs.BOM_UTF8 + GERMAN_TEXT.encode("utf-8"))
+        utf16_path = self.write("bom16.txt", GERMAN_TEXT.encode("utf-16"))
+
+        self.assertEqual(detector.detect(utf8_path), "utf-8-sig")
+        self.assertEqual(detector.detect(utf16_path), "utf-16")
+        self.assertEqual([d.method for d in detector.detections], ["bom", "bom"])
+        # A BOM is not cached for the source
+        self.assertEqual(detector.source_encodings, {})
+
+        print("✅ Byte order marks detected")
+
+    def test_utf8_checks_only_the_sample(self):
+        """Test that UTF-8 is detected from the sample, even with a character cut at its end."""
+        # "ö" is two bytes; put its first byte at the last position of the sample
+        head = b"a" * (SAMPLE_SIZE - 1) + "ö".encode("utf-8")
+        # Bytes after the sample are never read, not even invalid ones
+        file_path = self.write("journal.txt", head + b"\xff" * 100)
+
+        detector = EncodingDetector()
+        self.assertEqual(detector.detect(file_path), "utf-8")
+        self.assertEqual(detector.detections[0].method, "utf-8")
+        self.assertEqual(detector.source_encodings, {str(self.temp_dir): "utf-8"})
+
+        print("✅ UTF-8 detected from the sample alone")
+
+    def test_cached_latin1(self):
+        """Test that the source's cached encoding is reused before UTF-8 and chardet."""
+        file_path = self.write("latin1.txt", GERMAN_TEXT.encode("latin-1"))
+        ascii_path = self.write("ascii.txt", b"Nussbrot 5,20\n" * 10)
+        utf8_path = self.write("utf8.txt", GERMAN_TEXT.encode("utf-8"))
+
+        detector = EncodingDetector({str(self.temp_dir): "latin-1"})
+        self.assertEqual(detector.detect(file_path), "latin-1")
+        self.assertEqual(detector.detect(ascii_path), "latin-1")
+        # Real UTF-8 is not read as latin-1 just because the directory used to be
+        self.assertEqual(detector.detect(utf8_path), "utf-8")
+        self.assertEqual(
+            [d.method for d in detector.detections], ["cached", "cached", "utf-8"]
+        )
+
+        print("✅ Cached latin-1 reused, UTF-8 files still recognised")
+
+    def test_chardet_fallback(self):
+        """Test that chardet guesses when nothing else applies."""
+        file_path = self.write("cp1252.txt", GERMAN_TEXT.encode("cp1252"))
+
+        detector = EncodingDetector()
+        encoding = detector.detect(file_path)
+
+        detection = detector.detections[0]
+        self.assertEqual(detection.method, "chardet")
+        self.assertIsNotNone(detection.confidence)
+        self.assertEqual(
+            file_path.read_bytes().decode(encoding), GERMAN_TEXT, f"Guessed {encoding}"
+        )
+
+        print(f"✅ chardet guessed {encoding}")
+
+    def test_cache_save_and_load(self):
+        """Test that detected encodings survive a save and load of the cache."""
+        file_path = self.write("utf8.txt", GERMAN_TEXT.encode("utf-8"))
+        cache_path = self.temp_dir / "cache" / "encoding_cache.json"
+
+        detector = EncodingDetector()
+        encoding = detector.detect(file_path)
+        detector.save_cache(cache_path)
+
+        loaded = EncodingDetector.from_cache(cache_path)
+        self.assertEqual(loaded.source_encodings, detector.source_encodings)
+        self.assertEqual(loaded.detect(file_path), encoding)
+        self.assertEqual(loaded.detections[0].method, "cached")
+
+        cache_path.write_text("{broken", encoding="utf-8")
+        self.assertEqual(EncodingDetector.from_cache(cache_path).source_encodings, {})
+        self.assertEqual(
+            EncodingDetector.from_cache(self.temp_dir / "missing.json").source_encodings, {}
+        )
+
+        print("✅ Encoding cache saved and loaded")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+from pathlib import Path
+import os
+import shutil
+import tempfile
+
+from src.bulle_planning_model.extractors.extraction_manifest.extraction_manifest import (
+    ExtractionManifest,
+)
+
+
+class TestExtractionManifest(unittest.TestCase):
+    """Tests for ExtractionManifest."""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.manifest_path = self.temp_dir / "manifest.json"
+        self.source_file = self.temp_dir / "journal.txt"
+        self.source_file.write_text("Beleg 1\nBeleg 2\n", encoding="utf-8")
+        self.output_file = self.temp_dir / "journal.txt.json"
+        self.output_file.write_text("[]", encoding="utf-8")
+
+        self.manifest = ExtractionManifest(self.manifest_path)
+        self.manifest.record(self.source_file, "1", [self.output_file])
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _move_mtime(self):
+        stat = self.source_file.stat()
+        os.utime(
+            self.source_file,
+            ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000),
+        )
+
+    def test_unchanged_file_is_up_to_date(self):
+        """Test that a recorded, unchanged file is up to date."""
+        self.assertTrue(self.manifest.is_up_to_date(self.source_file, "1"))
+        self.assertFalse(
+            self.manifest.is_up_to_date(self.temp_dir / "other.txt", "1")
+        )
+
+        print("✅ Unchanged file is up to date")
+
+    def test_touched_file_with_same_content_is_up_to_date(self):
+        """Test that an mtime change alone is settled by the content hash."""
+        self._move_mtime()
+        new_mtime_ns = self.source_file.stat().st_mtime_ns
+
+        self.assertTrue(self.manifest.is_up_to_date(self.source_file, "1"))
+        # The new mtime is remembered so the next check skips the hash
+        self.assertEqual(self.manifest.get(self.source_file).mtime_ns, new_mtime_ns)
+
+        print("✅ Touched file with the same content is up to date")
+
+    def test_changed_content_is_not_up_to_date(self):
+        """Test that changed content is detected, with or without a size change."""
+        # Same size, different bytes
+        self.source_file.write_text("Beleg 1\nBeleg 3\n", encoding="utf-8")
+        self._move_mtime()
+        self.assertFalse(self.manifest.is_up_to_date(self.source_file, "1"))
+
+        self.source_file.write_text("Beleg 1\nBeleg 2\nBeleg 3\n", encoding="utf-8")
+        self.assertFalse(self.manifest.is_up_to_date(self.source_file, "1"))
+
+        print("✅ Changed content is not up to date")
+
+    def test_version_bump_is_not_up_to_date(self):
+        """Test that a new extractor version forces a re-extraction."""
+        self.assertFalse(self.manifest.is_up_to_date(self.source_file, "2"))
+
+        print("✅ Version bump is not up to date")
+
+    def test_missing_output_is_not_up_to_date(self):
+        """Test that a deleted output forces a re-extraction."""
+        self.output_file.unlink()
+        self.assertFalse(self.manifest.is_up_to_date(self.source_file, "1"))
+
+        print("✅ Missing output is not up to date")
+
+    def test_save_and_load_round_trip(self):
+        """Test that entries and their state survive a save and load."""
+        self.manifest.record(
+            self.source_file, "1", [self.output_file], state={"checkpoint": {"offset": 16}}
+        )
+        self.manifest.save()
+        self.assertFalse(self.manifest_path.with_suffix(".tmp").exists())
+
+        loaded = ExtractionManifest(self.manifest_path)
+        self.assertEqual(loaded.entries, self.manifest.entries)
+        self.assertEqual(
+            loaded.get(self.source_file).state, {"checkpoint": {"offset": 16}}
+        )
+        self.assertTrue(loaded.is_up_to_date(self.source_file, "1"))
+
+        # A corrupt manifest starts fresh instead of failing the run
+        self.manifest_path.write_text("{", encoding="utf-8")
+        self.assertEqual(ExtractionManifest(self.manifest_path).entries, {})
+
+        print("✅ Manifest survives a save and load")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,10 +3,18 @@ from pathlib import Path
 import json
 import tempfile
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 
 from src.bulle_planning_model.extractors.fiskal_extractor.fiskal_extractor import (
     FiskalExtractor,
 )
+from src.bulle_planning_model.extractors.fiskal_extractor.columnar_store import (
+    FiskalColumns,
+    FiskalColumnsWriter,
+    timestamp_to_datetime,
+    quantity_to_decimal,
+)
+from benchmarks.journal_generator import JournalGenerator
 
 
 class TestFiskalExtractorIntegration(unittest.TestCase):
@@ -141,6 +149,217 @@ class TestFiskalExtractorIntegration(unittest.TestCase):
 
         print(f"✅ Data integrity validated for {len(transactions)} transactions")
 
+    def test_single_pass_parser_matches_legacy(self):
+        """Test that both parsing engines produce identical transactions."""
+        legacy_extractor = FiskalExtractor(parser="legacy")
+        single_pass_extractor = FiskalExtractor(parser="single_pass")
+
+        legacy_transactions = legacy_extractor.read_file(self.test_file_path)
+        single_pass_transactions = single_pass_extractor.read_file(
+            self.test_file_path
+        )
+
+        self.assertGreater(len(legacy_transactions), 0)
+        self.assertEqual(legacy_transactions, single_pass_transactions)
+        self.assertEqual(
+            legacy_extractor.unparsed_blocks, single_pass_extractor.unparsed_blocks
+        )
+
+        print(f"✅ Parsers agree on {len(single_pass_transactions)} transactions")
+
+    def test_mmap_reader_matches_text_reader(self):
+        """Test that the memory-mapped reader finds the same blocks."""
+        text_extractor = FiskalExtractor(reader="text")
+        mmap_extractor = FiskalExtractor(reader="mmap")
+
+        text_transactions = text_extractor.read_file(self.test_file_path)
+        mmap_transactions = mmap_extractor.read_file(self.test_file_path)
+
+        self.assertGreater(len(mmap_transactions), 0)
+        self.assertEqual(text_transactions, mmap_transactions)
+        self.assertEqual(text_extractor.unparsed_blocks, mmap_extractor.unparsed_blocks)
+
+        print(f"✅ Readers agree on {len(mmap_transactions)} transactions")
+
+    def test_parallel_read_matches_read_file(self):
+        """Test that chunked parallel parsing merges back to the same result."""
+        transactions = self.extractor.read_file(self.test_file_path)
+
+        parallel_extractor = FiskalExtractor()
+        parallel_transactions = parallel_extractor.read_file_parallel(
+            self.test_file_path, workers=2, min_chunk_size=1
+        )
+
+        self.assertEqual(transactions, parallel_transactions)
+        self.assertEqual(
+            self.extractor.unparsed_blocks, parallel_extractor.unparsed_blocks
+        )
+        self.assertEqual(
+            parallel_extractor.metadata.total_transactions, len(transactions)
+        )
+
+        print(f"✅ Parallel read agrees on {len(parallel_transactions)} transactions")
+
+    def test_shared_extractor_extracts_concurrently(self):
+        """Test that one extractor serves several threads without mixing up results."""
+        generated_path = self.temp_dir / "generated.txt"
+        JournalGenerator(seed=3).write(generated_path, transactions=50)
+        file_paths = [self.test_file_path, generated_path] * 4
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(self.extractor.extract, file_paths))
+
+        expected = {path: FiskalExtractor().extract(path) for path in set(file_paths)}
+        for file_path, result in zip(file_paths, results):
+            self.assertEqual(result.source_file, file_path)
+            self.assertEqual(result.records, expected[file_path].records)
+            self.assertEqual(len(result.unparsed), len(expected[file_path].unparsed))
+            self.assertEqual(result.metadata.total_transactions, len(result.records))
+        self.assertIsNone(self.extractor.metadata)
+        self.assertEqual(self.extractor.unparsed_blocks, [])
+
+        print(f"✅ {len(results)} concurrent extractions on one extractor kept apart")
+
+    def test_incremental_read_appends_tail(self):
+        """Test that an appended journal only parses and appends the new tail."""
+        journal_path = self.temp_dir / "growing.txt"
+        journal_text = self.test_file_path.read_text(encoding="utf-8")
+        journal_path.write_text(journal_text, encoding="utf-8")
+
+        output_path = self.temp_dir / "growing.txt.json"
+        transactions, resumed = self.extractor.read_file_incremental(journal_path)
+        self.assertFalse(resumed)
+        self.extractor.convert_to_json(transactions, output_path)
+        checkpoint = self.extractor.checkpoint
+
+        # The register re-exports the same file with another day appended
+        journal_path.write_text(journal_text * 2, encoding="utf-8")
+
+        tail_extractor = FiskalExtractor()
+        tail_transactions, resumed = tail_extractor.read_file_incremental(
+            journal_path, checkpoint
+        )
+        self.assertTrue(resumed)
+        self.assertEqual(len(tail_transactions), len(transactions))
+        tail_extractor.append_to_json(tail_transactions, output_path)
+
+        full_path = self.temp_dir / "full.json"
+        full_transactions = FiskalExtractor().read_file(journal_path)
+        self.extractor.convert_to_json(full_transactions, full_path)
+
+        self.assertEqual(output_path.read_bytes(), full_path.read_bytes())
+        self.assertEqual(
+            tail_extractor.checkpoint.total_transactions, len(full_transactions)
+        )
+
+        print(f"✅ Appended {len(tail_transactions)} transactions from the new tail")
+
+    def test_compact_extract_appends_tail(self):
+        """Test that a compact (indent=None) extract is one record per line and appends cleanly."""
+        transactions = self.extractor.read_file(self.test_file_path)
+        half = len(transactions) // 2
+
+        output_path = self.temp_dir / "compact.json"
+        self.extractor.convert_to_json(transactions[:half], output_path, indent=None)
+        self.extractor.append_to_json(transactions[half:], output_path, indent=None)
+
+        lines = output_path.read_text(encoding="utf-8").split("\n")
+        self.assertEqual(lines[0], "[")
+        self.assertEqual(lines[-1], "]")
+        self.assertEqual(len(lines), len(transactions) + 2)
+
+        indented_path = self.temp_dir / "indented.json"
+        self.extractor.convert_to_json(transactions, indented_path)
+        with open(output_path, "r", encoding="utf-8") as f:
+            compact_data = json.load(f)
+        with open(indented_path, "r", encoding="utf-8") as f:
+            indented_data = json.load(f)
+        self.assertEqual(compact_data, indented_data)
+
+        print(f"✅ Compact extract holds {len(compact_data)} transactions, one per line")
+
+    def test_failed_append_keeps_extract(self):
+        """Test that an append failing partway leaves the previous extract untouched."""
+        transactions = self.extractor.read_file(self.test_file_path)
+        output_path = self.temp_dir / "extract.json"
+        self.extractor.convert_to_json(transactions, output_path)
+        original = output_path.read_bytes()
+
+        def failing_transactions():
+            yield from transactions
+            raise RuntimeError("journal went away")
+
+        with self.assertRaises(RuntimeError):
+            self.extractor.append_to_json(failing_transactions(), output_path)
+        with self.assertRaises(RuntimeError):
+            self.extractor.convert_to_json(failing_transactions(), output_path)
+
+        self.assertEqual(output_path.read_bytes(), original)
+        self.assertEqual([path.name for path in self.temp_dir.glob("*.tmp")], [])
+
+        print("✅ Failed writes left the extract intact")
+
+    def test_columnar_store_round_trip(self):
+        """Test that the columnar store holds every line item unchanged."""
+        transactions = self.extractor.read_file(self.test_file_path)
+        items = [
+            (transaction, item)
+            for transaction in transactions
+            for item in transaction.items
+        ]
+
+        columns_path = self.temp_dir / "Fiskaljournal.txt.fcol"
+        writer = FiskalColumnsWriter()
+        writer.add_all(transactions)
+        writer.write(columns_path)
+
+        with FiskalColumns.open(columns_path) as columns:
+            self.assertEqual(columns.rows, len(items))
+            timestamps = columns.column("timestamp")
+            quantities = columns.column("quantity")
+            prices = columns.column("price_cents")
+            article_ids = columns.column("article_id")
+
+            for row, (transaction, item) in enumerate(items):
+                self.assertEqual(timestamp_to_datetime(timestamps[row]), transaction.date)
+                self.assertEqual(quantity_to_decimal(quantities[row]), item.quantity)
+                self.assertEqual(prices[row], item.price * 100)
+                self.assertEqual(
+                    columns.articles[article_ids[row]], item.article_name
+                )
+
+            del timestamps, quantities, prices, article_ids
+
+        print(f"✅ Columnar store round-trips {len(items)} line items")
+
+    def test_generated_journal_round_trip(self):
+        """Test that every parser finds exactly what the journal generator wrote."""
+        journal_path = self.temp_dir / "Fiskaljournal.txt"
+        stats = JournalGenerator(seed=1, cancellation_rate=0.05).write(
+            journal_path, transactions=300
+        )
+        self.assertGreater(stats.cancellations, 0)
+
+        for parser in FiskalExtractor.PARSERS:
+            extractor = FiskalExtractor(parser=parser)
+            transactions = extractor.read_file(journal_path)
+
+            self.assertEqual(len(transactions), stats.transactions)
+            self.assertEqual(
+                sum(len(transaction.items) for transaction in transactions),
+                stats.line_items,
+            )
+            self.assertEqual(
+                sum(transaction.total_gross_cents for transaction in transactions),
+                stats.total_gross_cents,
+            )
+            self.assertEqual(
+                [block.reason for block in extractor.unparsed_blocks],
+                ["negative_total"] * stats.cancellations,
+            )
+
+        print(f"✅ Generated journal round-trips {stats.transactions} transactions")
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)
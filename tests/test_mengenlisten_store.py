@@ -0,0 +1,79 @@
+import unittest
+from datetime import date
+from pathlib import Path
+import json
+import tempfile
+import shutil
+
+from src.bulle_planning_model.data_unifier.mengenlisten_store import MengenlistenStore
+
+
+def mengenliste_json(date_str: str, leftover: float) -> dict:
+    """One extract as MengenlistenExtractor.convert_to_json writes it."""
+    return {
+        date_str: {
+            "production_day": "Freitag",
+            "sales_day": "Samstag",
+            "articles": [
+                {"article_name": "Nussbrot", "stock": 12.0, "leftover": leftover, "sold_out": None}
+            ],
+        }
+    }
+
+
+class TestMengenlistenStore(unittest.TestCase):
+    """Tests for the date-indexed Mengenlisten store used by the unifier."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        for i, date_str in enumerate(["2024-10-31", "2024-11-01", "2024-11-08", "2024-12-02"]):
+            with open(self.temp_dir / f"{date_str}.json", "w", encoding="utf-8") as f:
+                json.dump(mengenliste_json(date_str, float(i)), f)
+        # A file not named by its date is indexed by its content
+        with open(self.temp_dir / "nachtrag.json", "w", encoding="utf-8") as f:
+            json.dump(mengenliste_json("2024-11-15", 9.0), f)
+        (self.temp_dir / "2024-11-20.json").write_text("{not json", encoding="utf-8")
+
+    def tearDown(self):
+        """Clean up after tests."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_queries_parse_each_file_once(self):
+        """Test that month and range queries parse only the files they need, once."""
+        store = MengenlistenStore(self.temp_dir)
+
+        self.assertEqual(store.months(), ["2024-10", "2024-11", "2024-12"])
+        self.assertEqual(store.files_parsed, 1)
+
+        november = store.for_month("2024-11")
+        self.assertEqual(sorted(november), ["2024-11-01", "2024-11-08", "2024-11-15"])
+        self.assertEqual(november["2024-11-08"].articles[0].leftover, 2.0)
+        self.assertEqual(november["2024-11-15"].report_date, date(2024, 11, 15))
+        # Three date-named November files, one of them broken
+        self.assertEqual(store.files_parsed, 4)
+
+        store.for_month("2024-11")
+        in_range = store.for_range(date(2024, 10, 31), date(2024, 11, 1))
+        self.assertEqual(sorted(in_range), ["2024-10-31", "2024-11-01"])
+        self.assertIs(in_range["2024-11-01"], november["2024-11-01"])
+        self.assertEqual(store.files_parsed, 5)
+
+        self.assertEqual(store.for_month("2025-01"), {})
+        self.assertEqual(len(store.all()), 5)
+        self.assertEqual(store.files_parsed, 6)
+
+        print(f"✅ Store answered every query parsing {store.files_parsed} files once")
+
+    def test_missing_directory_is_empty(self):
+        """Test that a missing directory gives an empty store instead of an error."""
+        store = MengenlistenStore(self.temp_dir / "missing")
+
+        self.assertEqual(store.months(), [])
+        self.assertEqual(store.all(), {})
+
+        print("✅ Missing Mengenlisten directory gives an empty store")
+
+
+if __name__ == "__main__":
+    unittest.main()
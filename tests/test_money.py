@@ -0,0 +1,68 @@
+import unittest
+from decimal import Decimal
+
+from src.bulle_planning_model.extractors.money import (
+    cents_to_decimal,
+    multiply_cents,
+    parse_cents,
+    round_cents,
+    to_cents,
+)
+
+
+class TestMoney(unittest.TestCase):
+    """Tests for the integer cent helpers."""
+
+    def test_parse_cents(self):
+        """Test that register amounts parse to exact cents."""
+        self.assertEqual(parse_cents("1,50"), 150)
+        self.assertEqual(parse_cents("-2,00"), -200)
+        self.assertEqual(parse_cents("-0,50"), -50)
+        self.assertEqual(parse_cents("0.05"), 5)
+        self.assertEqual(parse_cents("1.234,56"), 123456)
+        self.assertEqual(parse_cents("1,234.56"), 123456)
+        self.assertEqual(parse_cents("2,5"), 250)
+        self.assertEqual(parse_cents("3"), 300)
+
+        print("✅ Amounts parse to exact cents")
+
+    def test_parse_cents_rejects_malformed_amounts(self):
+        """Test that malformed amounts raise ValueError instead of guessing."""
+        for amount in ("12,345", "1,2,34", "abc", "", "1,5x"):
+            with self.assertRaises(ValueError, msg=amount):
+                parse_cents(amount)
+
+        print("✅ Malformed amounts are rejected")
+
+    def test_to_cents_requires_whole_cents(self):
+        """Test that to_cents refuses fractions of a cent."""
+        self.assertEqual(to_cents(Decimal("2.45")), 245)
+        with self.assertRaises(ValueError):
+            to_cents(Decimal("2.455"))
+
+        print("✅ to_cents only accepts whole cents")
+
+    def test_multiply_cents_rounds_half_up(self):
+        """Test that fractional quantities round half up, away from zero."""
+        self.assertEqual(multiply_cents(245, Decimal("2")), 490)
+        self.assertEqual(multiply_cents(245, Decimal("0.5")), 123)  # 122.5
+        self.assertEqual(multiply_cents(245, Decimal("1.5")), 368)  # 367.5
+        self.assertEqual(multiply_cents(333, Decimal("0.25")), 83)  # 83.25
+        self.assertEqual(multiply_cents(-245, Decimal("0.5")), -123)
+        self.assertEqual(round_cents(Decimal("1.225")), 123)
+
+        print("✅ Fractional quantities round half up")
+
+    def test_cents_to_decimal(self):
+        """Test that cents convert back to two-decimal euros."""
+        self.assertEqual(cents_to_decimal(245), Decimal("2.45"))
+        self.assertEqual(str(cents_to_decimal(245)), "2.45")
+        self.assertEqual(str(cents_to_decimal(-50)), "-0.50")
+        self.assertEqual(str(cents_to_decimal(123456)), "1234.56")
+        self.assertEqual(cents_to_decimal(parse_cents("1.234,56")), Decimal("1234.56"))
+
+        print("✅ Cents convert back to euros")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,221 @@
+import unittest
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import tempfile
+import shutil
+
+from src.bulle_planning_model.process_fiskaljournale import (
+    extract_fiskaljournal,
+    save_extraction_metadata,
+)
+from src.bulle_planning_model.process_unified_data import is_current_columns_file
+from src.bulle_planning_model.extractors.fiskal_extractor.fiskal_extractor import (
+    FiskalExtractor,
+)
+from src.bulle_planning_model.extractors.fiskal_extractor.columnar_store import (
+    FISKAL_COLUMNS_SUFFIX,
+    FiskalColumns,
+)
+
+
+class TestProcessFiskaljournale(unittest.TestCase):
+    """Tests for the per-journal extraction that process_fiskaljournale runs in workers."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.txt_file = self.temp_dir / "Fiskaljournal.txt"
+        shutil.copy(Path(__file__).parent / "test_files/Fiskaljournal.txt", self.txt_file)
+        self.output_path = self.temp_dir / f"{self.txt_file.name}.json"
+        self.columns_path = self.temp_dir / f"{self.txt_file.name}{FISKAL_COLUMNS_SUFFIX}"
+        self.unparsed_path = self.temp_dir / "unparsed.txt"
+
+    def tearDown(self):
+        """Clean up after tests."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_worker_processes_extract_journals(self):
+        """Test that journals extracted in worker processes match an in-process read."""
+        second_file = self.temp_dir / "Fiskaljournal-2.txt"
+        shutil.copy(self.txt_file, second_file)
+        expected = FiskalExtractor().read_file(self.txt_file)
+
+        jobs = [
+            (self.txt_file, self.output_path, 2),
+            (second_file, self.temp_dir / f"{second_file.name}.json", None),
+        ]
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            futures = [
+                pool.submit(
+                    extract_fiskaljournal,
+                    txt_file,
+                    output_path,
+                    self.temp_dir / f"unparsed-{txt_file.name}",
+                    None,
+                    indent,
+                )
+                for txt_file, output_path, indent in jobs
+            ]
+            results = [future.result() for future in futures]
+
+        extracts = []
+        for (txt_file, output_path, _), result in zip(jobs, results):
+            metadata, unparsed_counts, checkpoint, resumed, detections = result
+            self.assertFalse(resumed)
+            self.assertEqual(metadata.total_transactions, len(expected))
+            self.assertEqual(checkpoint.total_transactions, len(expected))
+            self.assertEqual(metadata.source_file, str(txt_file))
+            self.assertEqual(unparsed_counts, {})
+            self.assertEqual(len(detections), 1)
+            with open(output_path, "r", encoding="utf-8") as f:
+                extracts.append(json.load(f))
+
+        # The compact extract holds the same transactions as the indented one
+        self.assertEqual(extracts[0], extracts[1])
+        self.assertEqual(len(extracts[0]), len(expected))
+        self.assertEqual(extracts[0][0]["UUID"], expected[0].uuid)
+
+        print(f"✅ Worker processes extracted {len(jobs)} journals")
+
+    def test_resumed_journal_continues_unparsed_blocks(self):
+        """Test that --max-unparsed caps the QC file of a journal across resumed runs."""
+        # Both Rechnung blocks of the broken journal fail to parse
+        journal_text = self.txt_file.read_text(encoding="utf-8")
+        broken_text = journal_text.replace(
+            "  UUID: 19EF67B3103E4B72BB1750CCC19CD3B6\n", ""
+        ).replace("31.03.2023 15:39:26", "31.03.2023")
+        self.txt_file.write_text(broken_text, encoding="utf-8")
+
+        _, unparsed_counts, checkpoint, resumed, _ = extract_fiskaljournal(
+            self.txt_file, self.output_path, self.unparsed_path, max_unparsed_blocks=3
+        )
+        self.assertFalse(resumed)
+        self.assertEqual(unparsed_counts, {"missing_date": 1, "missing_uuid": 1})
+        self.assertEqual(checkpoint.unparsed.written, 2)
+
+        self.txt_file.write_text(broken_text * 2, encoding="utf-8")
+        _, unparsed_counts, checkpoint, resumed, _ = extract_fiskaljournal(
+            self.txt_file,
+            self.output_path,
+            self.unparsed_path,
+            checkpoint,
+            max_unparsed_blocks=3,
+        )
+
+        self.assertTrue(resumed)
+        self.assertEqual(unparsed_counts, {"missing_date": 2, "missing_uuid": 2})
+        self.assertEqual((checkpoint.unparsed.written, checkpoint.unparsed.dropped), (3, 1))
+        text = self.unparsed_path.read_text(encoding="utf-8")
+        self.assertEqual(text.count("Block 1:"), 1)
+        self.assertEqual(text.count("Block 3:"), 1)
+        self.assertNotIn("Block 4:", text)
+        self.assertEqual(text.count("Total:"), 1)
+        self.assertIn("Total: 4 blocks (missing_date: 2, missing_uuid: 2), 1 not written", text)
+
+        print("✅ Resumed journal continued its QC file under one cap")
+
+    def test_metadata_of_skipped_journals_is_kept(self):
+        """Test that an unchanged rerun keeps the QC metadata of every journal."""
+        second_file = self.temp_dir / "Fiskaljournal-2.txt"
+        shutil.copy(self.txt_file, second_file)
+        removed_file = self.temp_dir / "Fiskaljournal-alt.txt"
+        shutil.copy(self.txt_file, removed_file)
+        metadata_path = self.temp_dir / "fiskal_extraction_metadata.json"
+        txt_files = [self.txt_file, second_file, removed_file]
+
+        all_metadata = [
+            extract_fiskaljournal(
+                txt_file, self.temp_dir / f"{txt_file.name}.json", self.unparsed_path
+            )[0]
+            for txt_file in txt_files
+        ]
+        save_extraction_metadata(metadata_path, all_metadata, txt_files)
+
+        # Nothing changed, and one journal is gone from the input directory
+        save_extraction_metadata(metadata_path, [], txt_files[:2])
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        self.assertEqual(
+            [entry["source_file"] for entry in entries],
+            sorted([str(self.txt_file), str(second_file)]),
+        )
+
+        # A re-extracted journal replaces its own entry only
+        metadata = all_metadata[1].model_copy(update={"total_transactions": 7})
+        save_extraction_metadata(metadata_path, [metadata], txt_files[:2])
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            totals = {entry["source_file"]: entry["total_transactions"] for entry in json.load(f)}
+        self.assertEqual(totals, {str(self.txt_file): 2, str(second_file): 7})
+
+        print("✅ Metadata of journals skipped by the manifest is kept")
+
+    def test_format_change_extracts_from_scratch(self):
+        """Test that switching --compact on or off rewrites the extract instead of appending."""
+        journal_text = self.txt_file.read_text(encoding="utf-8")
+        _, _, checkpoint, _, _ = extract_fiskaljournal(
+            self.txt_file, self.output_path, self.unparsed_path
+        )
+        self.assertFalse(checkpoint.compact)
+
+        self.txt_file.write_text(journal_text * 2, encoding="utf-8")
+        _, _, checkpoint, resumed, _ = extract_fiskaljournal(
+            self.txt_file, self.output_path, self.unparsed_path, checkpoint, indent=None
+        )
+
+        self.assertFalse(resumed)
+        self.assertTrue(checkpoint.compact)
+        lines = self.output_path.read_text(encoding="utf-8").split("\n")
+        # Every record on one line, none left over from the indented extract
+        self.assertEqual(len(lines), checkpoint.total_transactions + 2)
+        with open(self.output_path, "r", encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)), checkpoint.total_transactions)
+
+        # The same format again only appends
+        self.txt_file.write_text(journal_text * 3, encoding="utf-8")
+        _, _, checkpoint, resumed, _ = extract_fiskaljournal(
+            self.txt_file, self.output_path, self.unparsed_path, checkpoint, indent=None
+        )
+        self.assertTrue(resumed)
+        self.assertEqual(
+            len(self.output_path.read_text(encoding="utf-8").split("\n")),
+            checkpoint.total_transactions + 2,
+        )
+
+        print("✅ Format change re-extracted the journal from scratch")
+
+    def test_run_without_columnar_removes_stale_store(self):
+        """Test that a run without --columnar does not leave an older store behind."""
+        metadata, *_ = extract_fiskaljournal(
+            self.txt_file, self.output_path, self.unparsed_path, columns_path=self.columns_path
+        )
+        with FiskalColumns.open(self.columns_path) as columns:
+            self.assertGreater(columns.rows, 0)
+        self.assertTrue(is_current_columns_file(self.columns_path, self.output_path))
+
+        extract_fiskaljournal(self.txt_file, self.output_path, self.unparsed_path)
+
+        self.assertFalse(self.columns_path.exists())
+        with open(self.output_path, "r", encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)), metadata.total_transactions)
+
+        print("✅ Run without --columnar removed the stale columnar store")
+
+    def test_older_store_is_not_current(self):
+        """Test that the unifier skips a store older than its JSON extract."""
+        extract_fiskaljournal(
+            self.txt_file, self.output_path, self.unparsed_path, columns_path=self.columns_path
+        )
+        stat = self.output_path.stat()
+        os.utime(
+            self.columns_path, ns=(stat.st_atime_ns, stat.st_mtime_ns - 1_000_000_000)
+        )
+
+        self.assertFalse(is_current_columns_file(self.columns_path, self.output_path))
+
+        print("✅ Columnar store older than its JSON extract is ignored")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal
+import pickle
+import threading
+
+from src.bulle_planning_model.extractors.symbol_table import SymbolTable
+from src.bulle_planning_model.extractors.fiskal_extractor import records
+from src.bulle_planning_model.extractors.fiskal_extractor.records import (
+    LineItemRecord,
+    TransactionRecord,
+)
+from src.bulle_planning_model.extractors.bestellungs_extractor.records import (
+    LineItemRecord as BestellungLineItemRecord,
+    OrderRecord,
+)
+
+# The table the records use, they import the package without the src prefix
+ARTICLE_NAMES = records.ARTICLE_NAMES
+
+
+class TestSymbolTable(unittest.TestCase):
+    """Tests for SymbolTable and the records that carry its ids."""
+
+    def test_intern_returns_stable_ids(self):
+        """Test that every name gets one id and ids map back to their names."""
+        table = SymbolTable()
+
+        self.assertEqual(table.intern("Nussbrot"), 0)
+        self.assertEqual(table.intern("Brezel"), 1)
+        self.assertEqual(table.intern("Nussbrot"), 0)
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.name(1), "Brezel")
+        self.assertEqual(table.get("Brezel"), 1)
+        self.assertIsNone(table.get("Stollen"))
+
+        print("✅ Interned names keep their ids")
+
+    def test_concurrent_intern_gives_unique_ids(self):
+        """Test that threads interning overlapping names never share or lose an id."""
+        table = SymbolTable()
+        names = [f"Artikel {i}" for i in range(2000)]
+        barrier = threading.Barrier(8)
+
+        def intern_all(offset):
+            barrier.wait()
+            # Every thread walks the names from a different start
+            return {name: table.intern(name) for name in names[offset:] + names[:offset]}
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(intern_all, range(0, 2000, 250)))
+
+        for ids in results:
+            self.assertEqual(ids, results[0])
+        self.assertEqual(len(table), len(names))
+        self.assertEqual(sorted(results[0].values()), list(range(len(names))))
+        for name, symbol_id in results[0].items():
+            self.assertEqual(table.name(symbol_id), name)
+
+        print(f"✅ {len(names)} names interned from 8 threads with unique ids")
+
+    def test_records_pickle_names_not_ids(self):
+        """Test that records survive pickling even where ids differ, by sending names."""
+        item = LineItemRecord(
+            article_number=7,
+            article_id=ARTICLE_NAMES.intern("Dinkelbrot"),
+            quantity=Decimal("2"),
+            category="Brot",
+            category_number=1,
+            price_cents=610,
+        )
+        transaction = TransactionRecord(
+            uuid="abc",
+            date=datetime(2024, 11, 8, 9, 30),
+            bill_number=42,
+            items=[item],
+            total_gross_cents=1220,
+        )
+        order = OrderRecord(
+            id="1001",
+            pickup_date=date(2024, 11, 8),
+            sales=[
+                BestellungLineItemRecord(
+                    article_id=ARTICLE_NAMES.intern("Brezel"),
+                    quantity=Decimal("0.5"),
+                    price_cents=95,
+                )
+            ],
+            sum_cents=48,
+        )
+
+        _, item_state = item.__reduce__()
+        self.assertIn("Dinkelbrot", item_state)
+
+        self.assertEqual(pickle.loads(pickle.dumps(transaction)), transaction)
+        copied_order = pickle.loads(pickle.dumps(order))
+        self.assertEqual(copied_order, order)
+        self.assertEqual(copied_order.sales[0].article_name, "Brezel")
+
+        print("✅ Records pickle article names and re-intern them")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+from pathlib import Path
+import shutil
+import tempfile
+
+from src.bulle_planning_model.extractors.fiskal_extractor.unparsed_block_sink import (
+    UnparsedBlock,
+    UnparsedBlockSink,
+)
+
+
+def make_block(start_line: int, reason: str = "missing_uuid") -> UnparsedBlock:
+    return UnparsedBlock(
+        source_file="Fiskaljournal.txt",
+        start_line=start_line,
+        end_line=start_line + 2,
+        reason=reason,
+        lines=["Rechnung (#1)", "  Kasse: 1", f"  Zeile {start_line}"],
+    )
+
+
+class TestUnparsedBlockSink(unittest.TestCase):
+    """Tests for UnparsedBlockSink."""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.output_path = self.temp_dir / "qc" / "Fiskaljournal.txt"
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_counts_reasons_and_caps_blocks(self):
+        """Test that blocks past max_blocks are only counted, per reason."""
+        with UnparsedBlockSink(self.output_path, max_blocks=2) as sink:
+            sink.write(make_block(10, "missing_uuid"))
+            sink.write(make_block(20, "missing_date"))
+            sink.write(make_block(30, "missing_uuid"))
+            sink.write(make_block(40, "validation_failed"))
+
+        self.assertEqual(sink.written, 2)
+        self.assertEqual(sink.dropped, 2)
+        self.assertEqual(sink.total, 4)
+        self.assertEqual(
+            sink.counts, {"missing_uuid": 2, "missing_date": 1, "validation_failed": 1}
+        )
+
+        text = self.output_path.read_text(encoding="utf-8")
+        self.assertIn("Block 2: Fiskaljournal.txt lines 20-22 (missing_date)", text)
+        self.assertNotIn("Block 3:", text)
+        self.assertNotIn("Zeile 30", text)
+        self.assertTrue(
+            text.endswith(
+                "Total: 4 blocks (missing_date: 1, missing_uuid: 2, "
+                "validation_failed: 1), 2 not written\n\n"
+            )
+        )
+
+        print("✅ Blocks past the cap are only counted")
+
+    def test_without_blocks_no_file_is_written(self):
+        """Test that a clean journal leaves no QC file and removes a stale one."""
+        self.output_path.parent.mkdir(parents=True)
+        self.output_path.write_text("Unparsed blocks of an earlier run\n", encoding="utf-8")
+
+        with UnparsedBlockSink(self.output_path) as sink:
+            pass
+
+        self.assertFalse(self.output_path.exists())
+        self.assertEqual(
+            sink.summary().model_dump(), {"written": 0, "dropped": 0, "reasons": {}}
+        )
+
+        print("✅ Stale QC file removed when not resuming")
+
+    def test_resumed_run_carries_on(self):
+        """Test that a resumed run continues numbering, cap and totals in the same file."""
+        with UnparsedBlockSink(self.output_path, max_blocks=3) as sink:
+            sink.write(make_block(10, "missing_uuid"))
+            sink.write(make_block(20, "missing_date"))
+        previous = sink.summary()
+
+        with UnparsedBlockSink(self.output_path, max_blocks=3, previous=previous) as sink:
+            sink.write(make_block(30, "missing_uuid"))
+            sink.write(make_block(40, "missing_uuid"))
+
+        self.assertEqual(
+            sink.summary().model_dump(),
+            {"written": 3, "dropped": 1, "reasons": {"missing_date": 1, "missing_uuid": 3}},
+        )
+        text = self.output_path.read_text(encoding="utf-8")
+        self.assertEqual(text.count("Unparsed Transaction Blocks"), 1)
+        self.assertEqual(text.count("Block 1:"), 1)
+        self.assertIn("Block 3: Fiskaljournal.txt lines 30-32", text)
+        self.assertNotIn("Zeile 40", text)
+        self.assertEqual(text.count("Total:"), 1)
+        self.assertTrue(
+            text.endswith(
+                "Total: 4 blocks (missing_date: 1, missing_uuid: 3), 1 not written\n\n"
+            )
+        )
+
+        # A resumed run without new blocks leaves the file as it is
+        with UnparsedBlockSink(self.output_path, max_blocks=3, previous=sink.summary()):
+            pass
+        self.assertEqual(self.output_path.read_text(encoding="utf-8"), text)
+
+        print("✅ Resumed run carries on with one set of totals")
+
+
+if __name__ == "__main__":
+    unittest.main()